@@ -0,0 +1,57 @@
+"""Modes that must not change play: spatial index, human motion, level of detail"""
+
+import random
+
+import pytest
+
+from vampire_game import (
+    INPUT_BAT, INPUT_DOWN, INPUT_FEED, INPUT_LEFT, INPUT_RIGHT, INPUT_UP, Simulation,
+)
+from vampire_lod import first_mismatch
+
+TICKS = 3000    # Over a whole day and into the night
+POPULATIONS = (300, 40, 200, 60)
+MOVES = (0, INPUT_UP, INPUT_DOWN, INPUT_LEFT, INPUT_RIGHT, INPUT_UP | INPUT_RIGHT,
+         INPUT_DOWN | INPUT_LEFT)
+
+
+def first_difference(first, second, seed, ticks=TICKS):
+    """First tick after which the two simulations' snapshots differ, or None
+
+    Both get the same random-walk inputs, and both vampires are kept fed
+    and healed so the run lasts.
+    """
+    inputs = random.Random(seed)
+    controls = 0
+    for tick in range(ticks):
+        if tick % 40 == 0:
+            controls = (inputs.choice(MOVES) | (INPUT_FEED if inputs.random() < 0.3 else 0)
+                        | (INPUT_BAT if inputs.random() < 0.05 else 0))
+        for sim in (first, second):
+            vampire = sim.vampire
+            vampire.blood, vampire.health = vampire.max_blood, vampire.max_health
+            sim.step(controls)
+        if first.snapshot() != second.snapshot():
+            return tick
+    return None
+
+
+@pytest.mark.parametrize("motion", ["tick", "event"])
+def test_grid_matches_brute_force(motion):
+    grid = Simulation(*POPULATIONS, index="grid", seed=1, motion=motion)
+    brute = Simulation(*POPULATIONS, index="brute", seed=1, motion=motion)
+    assert first_difference(grid, brute, seed=1) is None
+
+
+def test_event_motion_matches_tick_motion():
+    ticked = Simulation(*POPULATIONS, seed=2, motion="tick")
+    evented = Simulation(*POPULATIONS, seed=2, motion="event")
+    assert first_difference(ticked, evented, seed=2) is None
+
+
+def test_world_event_motion_matches_on_screen():
+    assert first_mismatch(0, TICKS, against="event") is None
+
+
+def test_world_lod_matches_on_screen():
+    assert first_mismatch(0, TICKS) is None
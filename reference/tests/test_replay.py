@@ -0,0 +1,65 @@
+"""Recordings made while rewinding replay the game that was actually played"""
+
+import pytest
+
+pygame = pytest.importorskip("pygame")
+
+from vampire_batch import forager
+from vampire_game import INPUT_BAT, Game, GameState, Simulation
+from vampire_replay import Recorder, Replay
+
+
+class HeldKeys:
+    """Stand-in for pygame.key.get_pressed() with the given keys down"""
+
+    def __init__(self, held):
+        self.held = held
+
+    def __getitem__(self, key):
+        return key in self.held
+
+
+# 3 ticks stay within the inputs not yet written; 10 go back across the keyframe at 300
+@pytest.mark.parametrize("rewind_ticks", [3, 10])
+def test_rewind_while_recording(tmp_path, monkeypatch, rewind_ticks):
+    held = set()
+    monkeypatch.setattr(pygame.key, "get_pressed", lambda: HeldKeys(held))
+    path = str(tmp_path / "session.vrep")
+    recorder = Recorder(path, keyframe_interval=100)
+    detour = False
+    states = {}
+
+    def policy(sim):
+        # After the rewind, play differently so the old inputs can't pass for the new ones
+        flags = forager(sim)
+        if detour:
+            states[sim.total_time] = sim.snapshot()
+            if sim.total_time % 7 == 0:
+                flags ^= INPUT_BAT
+        return flags
+
+    game = Game(Simulation(seed=3), controls=recorder.recording(policy))
+    try:
+        game.game_state = GameState.PLAYING
+        for _ in range(305):
+            game.update()
+        held.add(pygame.K_r)
+        for _ in range(rewind_ticks):
+            game.update()
+        held.clear()
+        detour = True
+        for _ in range(50):
+            game.update()
+        recorder.close()
+        assert not game.sim.game_over
+        assert game.sim.total_time == 355 - rewind_ticks
+
+        replay = Replay(path)
+        assert replay.start_time == 0
+        assert len(replay) == game.sim.total_time
+        sim = replay.simulation(0)
+        replay.play(sim)
+        assert sim.snapshot() == game.sim.snapshot()
+        assert replay.simulation(320).snapshot() == states[320]
+    finally:
+        game.close()
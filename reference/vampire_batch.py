@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Vampire Survival - Monte Carlo balance runner
+
+Plays thousands of seeded headless games with a scripted bot policy,
+spread over every core with a process pool, and summarizes survival time,
+score, hunter kills and cause of death. Game i uses seed base_seed + i, so
+any run can be reproduced exactly.
+
+Usage:
+  python vampire_batch.py --games 5000 --policy cautious
+  python vampire_batch.py --policy forager --set Enemy.NIGHT_SPEED=4.0 \\
+      --set Simulation.FEED_BLOOD=20 --json results.json
+
+Policies are callables policy(sim) -> INPUT_* flags. Use one of the names
+in POLICIES or "module:function" for a policy defined elsewhere.
+Balance knobs are the UPPER_CASE class attributes on Vampire, Enemy and
+Simulation, overridden per run with --set Class.NAME=value.
+"""
+
+import argparse
+import importlib
+import json
+import os
+import statistics
+import sys
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+import vampire_game
+from vampire_game import (
+    FEED_RANGE, FPS, TimeOfDay, VampireForm, Simulation,
+    INPUT_UP, INPUT_DOWN, INPUT_LEFT, INPUT_RIGHT, INPUT_BAT, INPUT_FEED,
+)
+
+TUNABLE_CLASSES = ("Vampire", "Enemy", "Simulation")
+
+
+# Bot policies
+
+def idle(sim):
+    """Stand still and never feed"""
+    return 0
+
+
+def stay_right(sim):
+    """Hold the shady right side of the map"""
+    return INPUT_RIGHT if sim.vampire.x < sim.width * 0.75 else 0
+
+
+def human_nearby(sim):
+    return bool(sim.human_index.query_radius(sim.vampire.x, sim.vampire.y, FEED_RANGE))
+
+
+def being_chased(sim):
+    return any(enemy.chasing for enemy in sim.enemies)
+
+
+def cautious(sim):
+    """Stay right, feed when a human is near, bat when chased"""
+    controls = stay_right(sim)
+    if human_nearby(sim):
+        controls |= INPUT_FEED
+    if being_chased(sim) and sim.vampire.form != VampireForm.BAT:
+        controls |= INPUT_BAT
+    return controls
+
+
+def forager(sim):
+    """Walk to the nearest human out of the sun, bat when chased"""
+    vampire = sim.vampire
+    day = sim.time_of_day == TimeOfDay.DAY
+    candidates = [h for h in sim.humans if not (day and h.x < sim.sun_width)]
+    controls = 0
+    if candidates:
+        target = min(candidates, key=lambda h: (h.x - vampire.x) ** 2 + (h.y - vampire.y) ** 2)
+        if target.x > vampire.x + 2:
+            controls |= INPUT_RIGHT
+        elif target.x < vampire.x - 2:
+            controls |= INPUT_LEFT
+        if target.y > vampire.y + 2:
+            controls |= INPUT_DOWN
+        elif target.y < vampire.y - 2:
+            controls |= INPUT_UP
+    elif day:
+        controls |= stay_right(sim)
+
+    # Never step into the sun, and get out of it if caught there
+    if day and vampire.x - vampire.get_speed() < sim.sun_width:
+        controls &= ~INPUT_LEFT
+        if vampire.x < sim.sun_width:
+            controls |= INPUT_RIGHT
+
+    if human_nearby(sim):
+        controls |= INPUT_FEED
+    if being_chased(sim) and vampire.form != VampireForm.BAT:
+        controls |= INPUT_BAT
+    return controls
+
+
+POLICIES = {
+    "idle": idle,
+    "stay_right": stay_right,
+    "cautious": cautious,
+    "forager": forager,
+}
+
+
+def load_policy(name):
+    """Policy by registry name or "module:function" path"""
+    if name in POLICIES:
+        return POLICIES[name]
+    module_name, sep, attr = name.partition(":")
+    if not sep:
+        raise ValueError(f"Unknown policy '{name}' (choose from {', '.join(POLICIES)} "
+                         "or use module:function)")
+    return getattr(importlib.import_module(module_name), attr)
+
+
+def parse_override(text):
+    """Parse 'Class.NAME=value' into (class name, attribute, float value)"""
+    target, sep, value = text.partition("=")
+    class_name, dot, attr = target.partition(".")
+    if not sep or not dot or class_name not in TUNABLE_CLASSES:
+        raise ValueError(f"Bad override '{text}' (expected e.g. Enemy.NIGHT_SPEED=4.0)")
+    if not hasattr(getattr(vampire_game, class_name), attr):
+        raise ValueError(f"{class_name} has no balance knob {attr}")
+    return class_name, attr, float(value)
+
+
+def apply_overrides(overrides):
+    """Set balance knobs in this process, returning the previous values"""
+    previous = []
+    for class_name, attr, value in overrides:
+        cls = getattr(vampire_game, class_name)
+        previous.append((class_name, attr, getattr(cls, attr)))
+        setattr(cls, attr, value)
+    return previous
+
+
+# Running games
+
+def play_game(seed, policy_name, max_ticks):
+    """Play one seeded game to the death (or max_ticks) and report how it went"""
+    sim = Simulation(seed=seed)
+    ticks = sim.fast_forward(max_ticks, policy=load_policy(policy_name))
+    return {
+        "seed": seed,
+        "ticks": ticks,
+        "score": sim.score,
+        "hunters_killed": sim.hunters_killed,
+        "cause_of_death": sim.cause_of_death or "survived",
+    }
+
+
+def play_games(seeds, policy_name, max_ticks, overrides):
+    """Worker task - play a chunk of games with the balance overrides applied"""
+    previous = apply_overrides(overrides)
+    try:
+        return [play_game(seed, policy_name, max_ticks) for seed in seeds]
+    finally:
+        apply_overrides(reversed(previous))
+
+
+def run_batch(games, policy_name="cautious", base_seed=0, max_ticks=FPS * 60 * 10,
+              overrides=(), workers=None):
+    """Play `games` seeded games across a process pool, results in seed order"""
+    load_policy(policy_name)  # Fail fast on a bad name
+    workers = workers or os.cpu_count() or 1
+    seeds = list(range(base_seed, base_seed + games))
+    # A few chunks per worker keeps cores busy without per-game IPC
+    chunk = max(1, games // (workers * 4))
+    chunks = [seeds[i:i + chunk] for i in range(0, games, chunk)]
+
+    if workers == 1:
+        return play_games(seeds, policy_name, max_ticks, overrides)
+
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(play_games, c, policy_name, max_ticks, overrides) for c in chunks]
+        for future in futures:
+            results.extend(future.result())
+    return results
+
+
+def describe(values):
+    """Summary statistics for one metric"""
+    ordered = sorted(values)
+
+    def pct(p):
+        return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))]
+
+    return {
+        "mean": statistics.fmean(ordered),
+        "stdev": statistics.stdev(ordered) if len(ordered) > 1 else 0.0,
+        "min": ordered[0],
+        "p5": pct(5),
+        "median": statistics.median(ordered),
+        "p95": pct(95),
+        "max": ordered[-1],
+    }
+
+
+def summarize(results):
+    """Aggregate per-game results into summary statistics"""
+    return {
+        "games": len(results),
+        "survival_seconds": describe([r["ticks"] / FPS for r in results]),
+        "score": describe([r["score"] for r in results]),
+        "hunters_killed": describe([r["hunters_killed"] for r in results]),
+        "cause_of_death": dict(Counter(r["cause_of_death"] for r in results).most_common()),
+    }
+
+
+def print_summary(summary):
+    print(f"Games: {summary['games']}")
+    print(f"{'metric':<18}{'mean':>10}{'stdev':>10}{'p5':>10}{'median':>10}{'p95':>10}{'max':>10}")
+    for metric in ("survival_seconds", "score", "hunters_killed"):
+        s = summary[metric]
+        print(f"{metric:<18}{s['mean']:>10.1f}{s['stdev']:>10.1f}{s['p5']:>10.1f}"
+              f"{s['median']:>10.1f}{s['p95']:>10.1f}{s['max']:>10.1f}")
+    print("Cause of death:")
+    for cause, count in summary["cause_of_death"].items():
+        print(f"  {cause:<10}{count:>7}  ({100 * count / summary['games']:.1f}%)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run seeded Vampire Survival games in parallel")
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--policy", default="cautious",
+                        help=f"{', '.join(POLICIES)} or module:function")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first game")
+    parser.add_argument("--max-seconds", type=float, default=600,
+                        help="stop games that survive this long (game time)")
+    parser.add_argument("--workers", type=int, default=None, help="default: all cores")
+    parser.add_argument("--set", dest="overrides", action="append", default=[],
+                        metavar="Class.NAME=value", help="override a balance knob")
+    parser.add_argument("--json", metavar="PATH", help="write summary and per-game results")
+    args = parser.parse_args(argv)
+
+    try:
+        overrides = [parse_override(text) for text in args.overrides]
+        load_policy(args.policy)
+    except (ValueError, ImportError, AttributeError) as e:
+        parser.error(str(e))
+
+    results = run_batch(args.games, args.policy, args.seed, int(args.max_seconds * FPS),
+                        overrides, args.workers)
+    summary = summarize(results)
+    print_summary(summary)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"policy": args.policy, "overrides": args.overrides,
+                       "summary": summary, "games": results}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
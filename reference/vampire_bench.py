@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+"""
+Vampire Survival - benchmark suite
+
+Measures Game.update ticks/second, entity updates per tick and Game.draw
+frames/second under SDL's dummy video driver for scaled scenarios, plus
+startup time and peak memory. Every scenario runs in a fresh subprocess so its peak RSS and
+import costs aren't shared with the others. The vampire is kept fed and
+healed while ticks are timed; if it dies anyway the game is restored to
+its start outside the timed region, and `resets` counts how often.
+
+Results are JSON. Save one run as a baseline, then compare later runs
+against it; any metric worse than the baseline by more than the threshold
+is flagged and the exit status is 1:
+
+    python vampire_bench.py --save-baseline
+    python vampire_bench.py --compare --threshold 0.15
+    python vampire_bench.py --scenarios default,crowd-10k --output run.json
+
+Some scenarios also have an absolute throughput floor (UPDATE_TPS_FLOORS)
+that needs no baseline. The floors were set on one machine, so they are
+only checked when asked for: --floor-scale 1 checks them as they are, and
+other values scale them for slower or faster machines. Falling below a
+checked floor exits 1 too:
+
+    python vampire_bench.py --scenarios default --floor-scale 0.8
+
+Crowd scenarios on the NumPy backends (numpy-*, sharded-*) are skipped
+when numpy isn't installed.
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+DEFAULT_BASELINE = "vampire_bench_baseline.json"
+DEFAULT_SECONDS = 2.0       # Measuring time per metric per scenario
+MIN_SAMPLES = 3             # Ticks/frames measured even for very slow scenarios
+BENCH_HEALTH = 10 ** 6      # Vampire health while timing ticks: more than any crowd deals in one
+
+# name -> simulation setup (see vampire_replay.build_simulation)
+SCENARIOS = {
+    "default": {"backend": "objects", "populations": (10, 3, 4, 6)},
+    "night": {"backend": "objects", "populations": (10, 3, 4, 6), "night": True},
+    # Same night drawn with dirty rects instead of full redraws
+    "night-dirty": {"backend": "objects", "populations": (10, 3, 4, 6), "night": True,
+                    "dirty_rects": True},
+    "crowd-1k": {"backend": "objects", "populations": (900, 100, 900, 100)},
+    "crowd-10k": {"backend": "objects", "populations": (9000, 1000, 9000, 1000)},
+    # Same crowd with humans on event-driven trajectories
+    "events-10k": {"backend": "objects", "populations": (9000, 1000, 9000, 1000),
+                   "motion": "event"},
+    "crowd-100k": {"backend": "objects", "populations": (90000, 10000, 90000, 10000)},
+    "numpy-10k": {"backend": "crowd", "populations": (9000, 1000, 9000, 1000)},
+    "numpy-100k": {"backend": "crowd", "populations": (90000, 10000, 90000, 10000)},
+    # NumPy crowd stepped by one worker process per CPU (experimental, see vampire_shard)
+    "sharded-100k": {"backend": "sharded", "populations": (90000, 10000, 90000, 10000)},
+    # Populations per chunk over a 50-screen world; only the awake chunks cost anything
+    "world": {"backend": "world", "populations": (4, 1, 2, 2), "world": (7000, 5000)},
+}
+
+# Metrics where a bigger number is an improvement; everything else is a cost
+HIGHER_IS_BETTER = ("update_tps", "draw_fps")
+# Results that describe a run rather than measure it; never compared
+COUNTS = ("entities", "resets")
+
+# name -> ticks/s the scenario must keep with --floor-scale 1, baseline or
+# not. The plain single screen does about 94k on the machine these were set
+# on; per-tick bookkeeping it doesn't need once cost it about a third.
+UPDATE_TPS_FLOORS = {"default": 80000}
+
+WORKER_ENV = {
+    "SDL_VIDEODRIVER": "dummy",
+    "SDL_AUDIODRIVER": "dummy",
+    "PYGAME_HIDE_SUPPORT_PROMPT": "1",
+}
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process, or None where unsupported"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def timed_loop(body, seconds):
+    """Call body() for at least `seconds` (and MIN_SAMPLES times); calls/second
+
+    body() may return seconds it spent on work that isn't being measured
+    (e.g. putting a finished game back); they don't count towards either.
+    """
+    clock = time.perf_counter
+    start = clock()
+    untimed = 0.0
+    count = 0
+    while count < MIN_SAMPLES or clock() - start - untimed < seconds:
+        untimed += body() or 0.0
+        count += 1
+    return count / (clock() - start - untimed)
+
+
+# Worker side - runs in the subprocess
+
+def scenario_setup(name):
+    """Simulation setup of a scenario (see vampire_replay.build_simulation)"""
+    scenario = SCENARIOS[name]
+    day_humans, day_hunters, night_humans, night_hunters = scenario["populations"]
+    setup = {"backend": scenario["backend"], "seed": 0, "index": "auto",
+             "day_humans": day_humans, "day_hunters": day_hunters,
+             "night_humans": night_humans, "night_hunters": night_hunters,
+             "motion": scenario.get("motion", "tick")}
+    if "world" in scenario:
+        setup["world"] = list(scenario["world"])
+    return setup
+
+
+def run_scenario(name, seconds):
+    """Measure one scenario in this process"""
+    from vampire_game import Game, GameState, TimeOfDay
+    from vampire_replay import build_simulation
+
+    scenario = SCENARIOS[name]
+    started = time.perf_counter()
+    sim = build_simulation(scenario_setup(name))
+    if scenario.get("night"):
+        sim.time_cycle = sim.day_duration
+        sim.advance_clock()
+        assert sim.time_of_day == TimeOfDay.NIGHT
+    game = Game(sim, controls=lambda sim: 0, rewind_seconds=0,
+                dirty_rects=scenario.get("dirty_rects", False))
+    game.game_state = GameState.PLAYING
+    setup_ms = (time.perf_counter() - started) * 1000
+
+    # The vampire is kept fed and healed, with room for a whole crowd's
+    # blows in one tick, so the run reaches the ticks a real game does (crowd
+    # hunters would otherwise win within a few dozen, before a single
+    # event-driven human turns). If it dies anyway the game goes back to its
+    # start; a restore can cost more than many ticks, so it isn't timed
+    sim.vampire.max_health = sim.vampire.health = BENCH_HEALTH
+    start_state = sim.snapshot()
+    updates = [0, 0, 0]     # Entity updates, ticks, resets
+
+    def tick():
+        game.update()
+        updates[0] += sim.entity_updates
+        updates[1] += 1
+        vampire = sim.vampire
+        vampire.blood, vampire.health = vampire.max_blood, vampire.max_health
+        if sim.game_over:
+            started = time.perf_counter()
+            sim.restore(start_state)
+            game.game_state = GameState.PLAYING
+            updates[2] += 1
+            return time.perf_counter() - started
+        return None
+
+    update_tps = timed_loop(tick, seconds)
+    draw_fps = timed_loop(lambda: game.draw(0.5), seconds)
+
+    return {
+        "entities": sim.human_count + sim.enemy_count,
+        "setup_ms": setup_ms,
+        "update_tps": update_tps,
+        "updates_per_tick": updates[0] / updates[1],
+        "resets": updates[2],
+        "draw_fps": draw_fps,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def run_startup():
+    """Cold import, window creation and first menu frame, in this process"""
+    clock = time.perf_counter
+    started = clock()
+    import vampire_game
+    imported = clock()
+    game = vampire_game.Game()
+    created = clock()
+    game.draw()
+    drawn = clock()
+    return {
+        "import_ms": (imported - started) * 1000,
+        "init_ms": (created - imported) * 1000,
+        "first_frame_ms": (drawn - created) * 1000,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+# Driver side
+
+def numpy_available():
+    try:
+        import numpy  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def run_worker(task, seconds):
+    """Run one task in a fresh interpreter and return its result dict"""
+    env = dict(os.environ, **WORKER_ENV)
+    command = [sys.executable, os.path.abspath(__file__), "--worker", task,
+               "--seconds", str(seconds)]
+    started = time.perf_counter()
+    done = subprocess.run(command, env=env, capture_output=True, text=True,
+                          cwd=os.path.dirname(os.path.abspath(__file__)))
+    elapsed = (time.perf_counter() - started) * 1000
+    if done.returncode != 0:
+        raise RuntimeError(f"Benchmark '{task}' failed:\n{done.stderr}")
+    result = json.loads(done.stdout.strip().splitlines()[-1])
+    if task == "startup":
+        result["process_ms"] = elapsed
+    return result
+
+
+def best_of(runs):
+    """Merge repeated runs, keeping each metric's best value"""
+    merged = dict(runs[0])
+    for run in runs[1:]:
+        for metric, value in run.items():
+            if metric in COUNTS or value is None or merged.get(metric) is None:
+                continue
+            better = max if metric in HIGHER_IS_BETTER else min
+            merged[metric] = better(merged[metric], value)
+    return merged
+
+
+def run_suite(names, seconds, repeat=1):
+    """Benchmark the named scenarios plus startup; the results document"""
+    results = {"startup": best_of([run_worker("startup", seconds) for _ in range(repeat)])}
+    for name in names:
+        if SCENARIOS[name]["backend"] in ("crowd", "sharded") and not numpy_available():
+            print(f"  {name:<12} skipped (numpy not installed)")
+            continue
+        results[name] = best_of([run_worker(name, seconds) for _ in range(repeat)])
+        r = results[name]
+        print(f"  {name:<12}{r['entities']:>8} entities  {r['updates_per_tick']:>8.1f} updates"
+              f"  {r['update_tps']:>10.1f} ticks/s  {r['draw_fps']:>8.1f} fps"
+              f"  {r['peak_rss_mb'] or 0:>7.1f} MB  {r.get('resets', 0):>5} resets")
+    return {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "machine": {"platform": platform.platform(), "python": platform.python_version(),
+                    "processor": platform.processor() or platform.machine()},
+        "seconds": seconds,
+        "results": results,
+    }
+
+
+def compare(current, baseline, threshold):
+    """(benchmark, metric, baseline, current, change) for every regression
+
+    `change` is the relative slowdown: a 0.2 change means 20% fewer
+    ticks/frames per second, or 20% more time/memory, than the baseline.
+    """
+    regressions = []
+    for name, metrics in current["results"].items():
+        base = baseline["results"].get(name)
+        if base is None:
+            continue
+        for metric, value in metrics.items():
+            old = base.get(metric)
+            if metric in COUNTS or not value or not old:
+                continue
+            if metric in HIGHER_IS_BETTER:
+                change = (old - value) / old
+            else:
+                change = (value - old) / old
+            if change > threshold:
+                regressions.append((name, metric, old, value, change))
+    return regressions
+
+
+def below_floors(current, scale=1.0):
+    """(benchmark, floor, current ticks/s) for every scenario under its floor"""
+    misses = []
+    if not scale:
+        return misses
+    for name, floor in UPDATE_TPS_FLOORS.items():
+        result = current["results"].get(name)
+        if result is not None and result["update_tps"] < floor * scale:
+            misses.append((name, floor * scale, result["update_tps"]))
+    return misses
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark Vampire Survival")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS),
+                        help=f"comma-separated subset of: {', '.join(SCENARIOS)}")
+    parser.add_argument("--seconds", type=float, default=DEFAULT_SECONDS,
+                        help="measuring time per metric per scenario")
+    parser.add_argument("--repeat", type=int, default=1, help="runs per scenario, best kept")
+    parser.add_argument("--output", metavar="PATH", help="write the results JSON here")
+    parser.add_argument("--save-baseline", nargs="?", const=DEFAULT_BASELINE, metavar="PATH",
+                        help=f"store the results as a baseline (default {DEFAULT_BASELINE})")
+    parser.add_argument("--compare", nargs="?", const=DEFAULT_BASELINE, metavar="PATH",
+                        help="flag regressions against a saved baseline")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="relative slowdown that counts as a regression (default 0.10)")
+    parser.add_argument("--floor-scale", type=float, default=0.0,
+                        help="check the absolute throughput floors, multiplied by this"
+                             " (default 0: not checked)")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        if args.worker == "startup":
+            result = run_startup()
+        else:
+            result = run_scenario(args.worker, args.seconds)
+        print(json.dumps(result))
+        return 0
+
+    names = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"Unknown scenario(s): {', '.join(unknown)}")
+
+    print("Benchmarking:")
+    current = run_suite(names, args.seconds, args.repeat)
+    startup = current["results"]["startup"]
+    print(f"  startup: import {startup['import_ms']:.0f} ms, init {startup['init_ms']:.0f} ms, "
+          f"first frame {startup['first_frame_ms']:.0f} ms, process {startup['process_ms']:.0f} ms")
+
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, "w") as f:
+                json.dump(current, f, indent=2)
+            print(f"Wrote {path}")
+
+    status = 0
+    misses = below_floors(current, args.floor_scale)
+    for name, floor, value in misses:
+        print(f"  {name:<12}update_tps {value:.1f} is below its floor of {floor:.1f}")
+        status = 1
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(current, baseline, args.threshold)
+        if not regressions:
+            print(f"No regressions beyond {args.threshold:.0%} against {args.compare}")
+            return status
+        print(f"Regressions beyond {args.threshold:.0%} against {args.compare}:")
+        for name, metric, old, value, change in regressions:
+            print(f"  {name:<12}{metric:<16}{old:>12.1f} -> {value:<12.1f}({change:+.0%})")
+        return 1
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
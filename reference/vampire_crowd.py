@@ -0,0 +1,406 @@
+#!/usr/bin/env python3
+"""
+Vampire Survival - NumPy crowd backend
+
+EntityStore keeps every human and hunter in contiguous struct-of-arrays
+NumPy buffers and updates the random walk, wall bounces, patrol
+retargeting, chase and flow-field steering as whole-array operations.
+CrowdSimulation plugs the store into the regular Simulation tick, so the
+vampire, feeding and scoring rules are unchanged:
+
+    sim = CrowdSimulation(day_humans=50000, day_hunters=5000, seed=1)
+    sim.fast_forward(600)
+
+Movement follows the same rules as Human.update and Enemy.update, but random
+draws come from a NumPy generator, so runs are not bit-identical to the
+object backend.
+"""
+
+import struct
+
+import numpy as np
+
+from vampire_game import (
+    SCREEN_WIDTH, SCREEN_HEIGHT, HUMAN_RADIUS, ENEMY_RADIUS, FEED_RANGE,
+    TimeOfDay, VampireForm, Enemy, Simulation,
+    hunter_color, paint_human, paint_hunter, paint_vampire,
+    human_sprite, hunter_sprite, vampire_sprite,
+)
+
+HUMAN_SPEED = 1
+HUMAN_TURN_TICKS = 120      # Random walk picks a new heading after this
+ENEMY_MAX_HEALTH = 30
+ENEMY_PATROL_TICKS = 60     # Patrol target is replaced after this
+
+# Snapshot entity section: PCG64 state and increment (16 bytes each), this
+# tail, then every store array's raw bytes in this order
+CROWD_RNG_TAIL = struct.Struct("<BI")   # has_uint32, uinteger
+STORE_ARRAYS = (
+    ("hx", np.float64), ("hy", np.float64), ("hdir", np.float64),
+    ("hstep_x", np.float64), ("hstep_y", np.float64), ("htimer", np.int32),
+    ("ex", np.float64), ("ey", np.float64), ("ehealth", np.float64),
+    ("echasing", np.bool_), ("epatrol_timer", np.int32),
+    ("epatrol_x", np.float64), ("epatrol_y", np.float64),
+)
+
+
+class EntityStore:
+    """Struct-of-arrays storage for all humans and hunters"""
+
+    def __init__(self, rng):
+        self.rng = rng
+
+        # Humans: position, heading, cached per-tick step, turn timer
+        self.hx = np.empty(0)
+        self.hy = np.empty(0)
+        self.hdir = np.empty(0)
+        self.hstep_x = np.empty(0)
+        self.hstep_y = np.empty(0)
+        self.htimer = np.empty(0, dtype=np.int32)
+
+        # Hunters: position, health, chase state, patrol timer and target
+        self.ex = np.empty(0)
+        self.ey = np.empty(0)
+        self.ehealth = np.empty(0)
+        self.echasing = np.empty(0, dtype=bool)
+        self.epatrol_timer = np.empty(0, dtype=np.int32)
+        self.epatrol_x = np.empty(0)
+        self.epatrol_y = np.empty(0)
+
+        # Navigator steering tables as NumPy columns: kind -> (table, steered, dx, dy)
+        self.steer_cache = {}
+
+    @property
+    def human_count(self):
+        return len(self.hx)
+
+    @property
+    def enemy_count(self):
+        return len(self.ex)
+
+    def random_positions(self, n):
+        """n random spawn points away from the walls (like random.randint)"""
+        x = self.rng.integers(50, SCREEN_WIDTH - 50, n, endpoint=True).astype(float)
+        y = self.rng.integers(50, SCREEN_HEIGHT - 50, n, endpoint=True).astype(float)
+        return x, y
+
+    def spawn_humans(self, n):
+        """Replace all humans with n fresh ones"""
+        self.hx, self.hy = self.random_positions(n)
+        self.hdir = self.rng.uniform(0, 2 * np.pi, n)
+        self.hstep_x = np.cos(self.hdir) * HUMAN_SPEED
+        self.hstep_y = np.sin(self.hdir) * HUMAN_SPEED
+        self.htimer = np.zeros(n, dtype=np.int32)
+
+    def keep_humans(self, n):
+        """Keep only the first n humans"""
+        self.hx = self.hx[:n].copy()
+        self.hy = self.hy[:n].copy()
+        self.hdir = self.hdir[:n].copy()
+        self.hstep_x = self.hstep_x[:n].copy()
+        self.hstep_y = self.hstep_y[:n].copy()
+        self.htimer = self.htimer[:n].copy()
+
+    def respawn_human(self, i):
+        """Reuse slot i for a brand new human (feeding replacement)"""
+        x, y = self.random_positions(1)
+        direction = self.rng.uniform(0, 2 * np.pi)
+        self.hx[i] = x[0]
+        self.hy[i] = y[0]
+        self.hdir[i] = direction
+        self.hstep_x[i] = np.cos(direction) * HUMAN_SPEED
+        self.hstep_y[i] = np.sin(direction) * HUMAN_SPEED
+        self.htimer[i] = 0
+
+    def spawn_hunters(self, n):
+        """Replace all hunters with n fresh ones"""
+        self.ex, self.ey = self.random_positions(n)
+        self.ehealth = np.full(n, float(ENEMY_MAX_HEALTH))
+        self.echasing = np.zeros(n, dtype=bool)
+        self.epatrol_timer = np.zeros(n, dtype=np.int32)
+        # Patrol starts at the spawn point, like Enemy.patrol_target
+        self.epatrol_x = self.ex.copy()
+        self.epatrol_y = self.ey.copy()
+
+    def remove_hunters(self, dead):
+        """Drop hunters flagged in the boolean mask `dead`"""
+        alive = ~dead
+        self.ex = self.ex[alive]
+        self.ey = self.ey[alive]
+        self.ehealth = self.ehealth[alive]
+        self.echasing = self.echasing[alive]
+        self.epatrol_timer = self.epatrol_timer[alive]
+        self.epatrol_x = self.epatrol_x[alive]
+        self.epatrol_y = self.epatrol_y[alive]
+
+    def update_humans(self):
+        """Random walk with wall bounces for every human at once"""
+        self.htimer += 1
+        turning = np.flatnonzero(self.htimer > HUMAN_TURN_TICKS)
+        if len(turning):
+            direction = self.rng.uniform(0, 2 * np.pi, len(turning))
+            self.hdir[turning] = direction
+            self.hstep_x[turning] = np.cos(direction) * HUMAN_SPEED
+            self.hstep_y[turning] = np.sin(direction) * HUMAN_SPEED
+            self.htimer[turning] = 0
+
+        self.hx += self.hstep_x
+        self.hy += self.hstep_y
+
+        # Bounce off walls: mirror the heading and the matching step component
+        lo, hi = HUMAN_RADIUS, SCREEN_WIDTH - HUMAN_RADIUS
+        hit = np.flatnonzero((self.hx < lo) | (self.hx > hi))
+        if len(hit):
+            self.hdir[hit] = np.pi - self.hdir[hit]
+            self.hstep_x[hit] = -self.hstep_x[hit]
+            np.clip(self.hx, lo, hi, out=self.hx)
+
+        lo, hi = HUMAN_RADIUS, SCREEN_HEIGHT - HUMAN_RADIUS
+        hit = np.flatnonzero((self.hy < lo) | (self.hy > hi))
+        if len(hit):
+            self.hdir[hit] = -self.hdir[hit]
+            self.hstep_y[hit] = -self.hstep_y[hit]
+            np.clip(self.hy, lo, hi, out=self.hy)
+
+    def steer_columns(self, kind, table):
+        """(steered, dx, dy) arrays for a Navigator steering table"""
+        cached = self.steer_cache.get(kind)
+        if cached is None or cached[0] is not table:
+            steered = np.array([s is not None for s in table])
+            dx = np.array([s[0] if s else 0.0 for s in table])
+            dy = np.array([s[1] if s else 0.0 for s in table])
+            cached = self.steer_cache[kind] = (table, steered, dx, dy)
+        return cached[1:]
+
+    def hunter_cells(self, grid):
+        """NavGrid cell of every hunter"""
+        size = grid.cell_size
+        cols = np.clip(((self.ex - grid.left) // size).astype(np.intp), 0, grid.cols - 1)
+        rows = np.clip(((self.ey - grid.top) // size).astype(np.intp), 0, grid.rows - 1)
+        return rows * grid.cols + cols
+
+    def update_hunters(self, vampire_x, vampire_y, is_night, nav):
+        """Patrol, chase and flow-field steering for every hunter at once"""
+        speed = Enemy.speed_for(is_night)
+        detection_range = Enemy.detection_range_for(is_night)
+
+        dist = np.hypot(self.ex - vampire_x, self.ey - vampire_y)
+        chasing = dist < detection_range
+        self.echasing = chasing
+
+        # Patrolling hunters pick a new random point every ENEMY_PATROL_TICKS
+        patrolling = ~chasing
+        self.epatrol_timer += patrolling
+        retarget = np.flatnonzero(patrolling & (self.epatrol_timer > ENEMY_PATROL_TICKS))
+        if len(retarget):
+            self.epatrol_timer[retarget] = 0
+            self.epatrol_x[retarget] = self.rng.integers(
+                100, SCREEN_WIDTH - 100, len(retarget), endpoint=True)
+            self.epatrol_y[retarget] = self.rng.integers(
+                100, SCREEN_HEIGHT - 100, len(retarget), endpoint=True)
+
+        target_x = np.where(chasing, vampire_x, self.epatrol_x)
+        target_y = np.where(chasing, vampire_y, self.epatrol_y)
+
+        angle = np.arctan2(target_y - self.ey, target_x - self.ex)
+        step_x = np.cos(angle)
+        step_y = np.sin(angle)
+
+        # Chasers follow the chase field, and by day patrollers the way out
+        # of the sun, wherever the Navigator has a steer for their cell
+        cells = None
+        for kind, movers in (("chase", chasing), ("shade", patrolling)):
+            if (kind == "shade" and is_night) or not movers.any():
+                continue
+            table = nav.chase_table() if kind == "chase" else nav.shade_table()
+            steered, dx, dy = self.steer_columns(kind, table)
+            if cells is None:
+                cells = self.hunter_cells(nav.grid)
+            use = np.flatnonzero(movers & steered[cells])
+            step_x[use] = dx[cells[use]]
+            step_y[use] = dy[cells[use]]
+
+        self.ex += step_x * speed
+        self.ey += step_y * speed
+
+        np.clip(self.ex, ENEMY_RADIUS, SCREEN_WIDTH - ENEMY_RADIUS, out=self.ex)
+        np.clip(self.ey, ENEMY_RADIUS, SCREEN_HEIGHT - ENEMY_RADIUS, out=self.ey)
+
+    def hunters_touching(self, x, y, radius):
+        """Boolean mask of hunters overlapping a circle at (x, y)"""
+        return np.hypot(self.ex - x, self.ey - y) < radius + ENEMY_RADIUS
+
+    def first_human_within(self, x, y, radius):
+        """Index of the first human closer than radius to (x, y), or -1"""
+        near = np.flatnonzero(np.hypot(self.hx - x, self.hy - y) < radius)
+        return int(near[0]) if len(near) else -1
+
+
+class CrowdSimulation(Simulation):
+    """Simulation whose humans and hunters live in an EntityStore"""
+
+    backend = "crowd"
+
+    def __init__(self, day_humans=10, day_hunters=3, night_humans=4, night_hunters=6,
+                 seed=None):
+        super().__init__(day_humans, day_hunters, night_humans, night_hunters, seed=seed)
+
+    def reset(self):
+        self.store = EntityStore(np.random.default_rng(self.seed))
+        self.previous_arrays = None
+        super().reset()
+
+    @property
+    def human_count(self):
+        return self.store.human_count
+
+    @property
+    def enemy_count(self):
+        return self.store.enemy_count
+
+    def spawn_day(self):
+        self.store.spawn_humans(self.day_humans)
+        self.store.spawn_hunters(self.day_hunters)
+
+    def spawn_night(self):
+        self.store.keep_humans(self.night_humans)
+        self.store.spawn_hunters(self.night_hunters)
+
+    def update_humans(self):
+        self.store.update_humans()
+        self.entity_updates += self.store.human_count
+
+    def update_enemies(self):
+        vampire = self.vampire
+        is_night = self.time_of_day == TimeOfDay.NIGHT
+        self.nav.set_goal(vampire.x, vampire.y, is_night)
+        self.store.update_hunters(vampire.x, vampire.y, is_night, self.nav)
+        self.entity_updates += self.store.enemy_count
+
+    def resolve_collisions(self):
+        store = self.store
+        vampire = self.vampire
+        hits = store.hunters_touching(vampire.x, vampire.y, vampire.radius)
+        hit_count = int(hits.sum())
+        if not hit_count:
+            return
+
+        # Same per-collision damage as Simulation.hit_enemy, applied at once
+        store.ehealth[hits] -= 2 if vampire.form == VampireForm.BAT else 0.5
+        vampire.health -= 0.5 * hit_count
+
+        dead = hits & (store.ehealth <= 0)
+        kills = int(dead.sum())
+        if kills:
+            store.remove_hunters(dead)
+            self.score += 50 * kills
+            self.hunters_killed += kills
+
+    def feed(self):
+        i = self.store.first_human_within(self.vampire.x, self.vampire.y, FEED_RANGE)
+        if i >= 0:
+            self.vampire.feed(self.FEED_BLOOD)
+            self.store.respawn_human(i)
+            self.score += 10
+            if self.previous_arrays is not None:
+                # Don't interpolate the replacement from the eaten human
+                self.previous_arrays[0][i] = self.store.hx[i]
+                self.previous_arrays[1][i] = self.store.hy[i]
+
+    def pack_entities(self):
+        # Generator state first, then each store array's raw bytes
+        state = self.store.rng.bit_generator.state
+        rng = (state["state"]["state"].to_bytes(16, "little")
+               + state["state"]["inc"].to_bytes(16, "little")
+               + CROWD_RNG_TAIL.pack(state["has_uint32"], state["uinteger"]))
+        return [rng] + [getattr(self.store, name).tobytes() for name, _ in STORE_ARRAYS]
+
+    def unpack_entities(self, view, offset, human_count, enemy_count):
+        store = self.store
+        bit_generator = store.rng.bit_generator
+        has_uint32, uinteger = CROWD_RNG_TAIL.unpack_from(view, offset + 32)
+        bit_generator.state = {
+            "bit_generator": bit_generator.state["bit_generator"],
+            "state": {"state": int.from_bytes(view[offset:offset + 16], "little"),
+                      "inc": int.from_bytes(view[offset + 16:offset + 32], "little")},
+            "has_uint32": has_uint32,
+            "uinteger": uinteger,
+        }
+        offset += 32 + CROWD_RNG_TAIL.size
+
+        for name, dtype in STORE_ARRAYS:
+            count = human_count if name.startswith("h") else enemy_count
+            values = np.frombuffer(view, dtype, count, offset).copy()
+            setattr(store, name, values)
+            offset += values.nbytes
+        self.previous_arrays = None
+        return offset
+
+    def save_positions(self):
+        store = self.store
+        self.previous_positions = {self.vampire: (self.vampire.x, self.vampire.y)}
+        self.previous_arrays = (store.hx.copy(), store.hy.copy(), store.ex.copy(), store.ey.copy())
+
+    def interpolated(self, alpha):
+        """Human and hunter positions `alpha` of the way from the previous tick"""
+        store = self.store
+        hx, hy, ex, ey = store.hx, store.hy, store.ex, store.ey
+        if alpha < 1.0 and self.previous_positions is not None:
+            phx, phy, pex, pey = self.previous_arrays
+            if len(phx) == len(hx):
+                hx = phx + (hx - phx) * alpha
+                hy = phy + (hy - phy) * alpha
+            # Hunters that died this tick shift the arrays; skip them then
+            if len(pex) == len(ex):
+                ex = pex + (ex - pex) * alpha
+                ey = pey + (ey - pey) * alpha
+        return hx, hy, ex, ey
+
+    def render_entities(self):
+        store = self.store
+        start = [a.astype(int).tolist() for a in self.interpolated(0.0)]
+        end = [a.astype(int).tolist() for a in (store.hx, store.hy, store.ex, store.ey)]
+        colors = [hunter_color(ratio, chasing) for ratio, chasing in
+                  zip((store.ehealth / ENEMY_MAX_HEALTH).tolist(), store.echasing.tolist())]
+        return (list(zip(start[0], start[1], end[0], end[1])),
+                list(zip(start[2], start[3], end[2], end[3], colors, store.echasing.tolist())))
+
+    def entity_columns(self):
+        store = self.store
+        return store.hx, store.hy, store.ex, store.ey, store.ehealth, store.echasing
+
+    def draw_entities(self, screen, sprites=None, alpha=1.0, camera=(0, 0)):
+        # The crowd playfield is the screen, so the camera never moves
+        store = self.store
+        hx, hy, ex, ey = (a.astype(int) for a in self.interpolated(alpha))
+        ratios = store.ehealth / ENEMY_MAX_HEALTH
+        vampire_pos = self.draw_position(self.vampire, alpha)
+
+        if sprites is None:
+            for center in zip(hx.tolist(), hy.tolist()):
+                paint_human(screen, center, HUMAN_RADIUS)
+            for center, ratio, chasing in zip(zip(ex.tolist(), ey.tolist()), ratios.tolist(),
+                                              store.echasing.tolist()):
+                paint_hunter(screen, center, ENEMY_RADIUS, hunter_color(ratio, chasing), chasing)
+            paint_vampire(screen, vampire_pos, self.vampire.radius, self.vampire.form)
+            return
+
+        surface, offset = human_sprite(sprites)
+        batch = [(surface, pos) for pos in zip((hx + offset).tolist(), (hy + offset).tolist())]
+
+        # Hunter look = health band x chase state; pick a sprite per hunter
+        # from a small table instead of calling hunter_color() per entity
+        variants = []
+        for ratio in (1.0, 0.5, 0.0):
+            for chasing in (False, True):
+                variants.append(hunter_sprite(sprites, hunter_color(ratio, chasing), chasing))
+        band = np.where(ratios > 0.6, 0, np.where(ratios > 0.3, 1, 2))
+        codes = (band * 2 + store.echasing).tolist()
+        offset = variants[0][1]  # All hunter variants share one size
+        batch.extend((variants[code][0], pos) for code, pos in
+                     zip(codes, zip((ex + offset).tolist(), (ey + offset).tolist())))
+
+        surface, offset = vampire_sprite(sprites, self.vampire)
+        batch.append((surface, (vampire_pos[0] + offset, vampire_pos[1] + offset)))
+
+        screen.blits(batch, False)
@@ -0,0 +1,610 @@
+#!/usr/bin/env python3
+"""
+Vampire Survival - reset/step environments for training agents
+
+VampireEnv wraps one Simulation in the usual agent loop:
+
+    env = VampireEnv(seed=1)
+    obs, info = env.reset()
+    obs, reward, terminated, truncated, info = env.step(INPUT_RIGHT | INPUT_FEED)
+
+An action is an INPUT_* bitmask, so the six controls make ACTION_COUNT
+discrete actions. An observation is a float32 vector of OBSERVATION_SIZE
+values: the vampire's VAMPIRE_FEATURES, then the NEARBY_HUMANS nearest
+humans as HUMAN_FEATURES and the NEARBY_HUNTERS nearest hunters as
+HUNTER_FEATURES, nearest first, with offsets from the vampire in screen
+widths and empty slots all zero. The reward is the score gained in the
+tick (feeding and kills) plus ALIVE_REWARD, or DEATH_REWARD on the tick
+the vampire dies; episodes are truncated after max_ticks.
+
+VectorEnv steps N independent games in lockstep. Each game is a row of
+fixed-shape NumPy arrays (humans and hunters that aren't around are masked
+out), every phase of the tick runs as whole-array operations over all the
+games, and the observation, reward and done arrays are allocated once and
+overwritten by every step. Finished games restart by themselves, so for
+them step() returns the first observation of the next episode. Like the
+crowd backend it follows the Simulation rules with a NumPy random
+generator, so its games are not bit-identical to the object backend.
+
+Usage:
+  python vampire_env.py [--envs 4096] [--seconds 3] [--seed N]
+"""
+
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from vampire_game import (
+    SCREEN_WIDTH, SCREEN_HEIGHT, FPS, HUMAN_RADIUS, HUMAN_TURN_TICKS, ENEMY_RADIUS,
+    FEED_RANGE, NAV_CELL_SIZE, SUN_ZONE_WIDTH,
+    INPUT_UP, INPUT_DOWN, INPUT_LEFT, INPUT_RIGHT, INPUT_BAT, INPUT_FEED,
+    TimeOfDay, VampireForm, Vampire, Enemy, Simulation,
+)
+from vampire_crowd import HUMAN_SPEED, ENEMY_MAX_HEALTH, ENEMY_PATROL_TICKS
+from vampire_nav import NavGrid, Navigator
+
+ACTION_COUNT = 64   # Every combination of the six INPUT_* flags
+
+VAMPIRE_FEATURES = ("blood", "energy", "health", "bat", "bat_time",
+                    "night", "day_time", "x", "y", "in_sun")
+HUMAN_FEATURES = ("dx", "dy", "present")
+HUNTER_FEATURES = ("dx", "dy", "chasing", "health", "present")
+NEARBY_HUMANS = 8
+NEARBY_HUNTERS = 8
+HUMANS_START = len(VAMPIRE_FEATURES)
+HUNTERS_START = HUMANS_START + NEARBY_HUMANS * len(HUMAN_FEATURES)
+OBSERVATION_SIZE = HUNTERS_START + NEARBY_HUNTERS * len(HUNTER_FEATURES)
+OFFSET_SCALE = SCREEN_WIDTH     # Pixels per unit of a dx/dy feature
+
+ALIVE_REWARD = 0.01
+DEATH_REWARD = -10.0
+MAX_EPISODE_TICKS = FPS * 60 * 10   # Ten minutes of game time
+
+
+def observation_views(observations):
+    """(vampire, human slots, hunter slots) views into a (games, OBSERVATION_SIZE) array"""
+    games = len(observations)
+    vampire = observations[:, :HUMANS_START]
+    humans = observations[:, HUMANS_START:HUNTERS_START].reshape(
+        games, NEARBY_HUMANS, len(HUMAN_FEATURES))
+    hunters = observations[:, HUNTERS_START:].reshape(
+        games, NEARBY_HUNTERS, len(HUNTER_FEATURES))
+    # Writes through the slot views must land in the observations
+    assert np.shares_memory(humans, observations) and np.shares_memory(hunters, observations)
+    return vampire, humans, hunters
+
+
+def fill_nearest(slots, dx, dy, present, extras=()):
+    """Write the nearest entities into slots[game, k] as (dx, dy, *extras, present)
+
+    dx, dy, the `present` mask and extras are (games, entities) arrays, with
+    offsets in pixels from each game's vampire; absent entities are skipped.
+    """
+    games, count = dx.shape
+    distance = np.where(present, dx * dx + dy * dy, np.inf)
+    order = distance.argsort(axis=1)[:, :slots.shape[1]]
+    nearest = order.shape[1]
+    # Flat indexes make the gathers plain takes on the (contiguous) arrays
+    flat = order + np.arange(games)[:, None] * count
+    found = present.take(flat)
+    scale = found / OFFSET_SCALE
+    slots[:, :nearest, 0] = dx.take(flat) * scale
+    slots[:, :nearest, 1] = dy.take(flat) * scale
+    for feature, values in enumerate(extras, 2):
+        slots[:, :nearest, feature] = values.take(flat) * found
+    slots[:, :nearest, -1] = found
+    slots[:, nearest:] = 0
+
+
+def observe(sim, out=None):
+    """Observation vector of a Simulation's current state (written into `out` if given)"""
+    if out is None:
+        out = np.zeros(OBSERVATION_SIZE, dtype=np.float32)
+    vampire_part, human_slots, hunter_slots = observation_views(out.reshape(1, -1))
+    vampire = sim.vampire
+    night = sim.time_of_day == TimeOfDay.NIGHT
+    vampire_part[0] = (
+        vampire.blood / vampire.max_blood, vampire.energy / vampire.max_energy,
+        vampire.health / vampire.max_health, vampire.form == VampireForm.BAT,
+        vampire.bat_duration / vampire.max_bat_duration,
+        night, sim.time_cycle / sim.day_duration,
+        vampire.x / sim.width, vampire.y / sim.height,
+        not night and vampire.x < sim.sun_width,
+    )
+
+    humans, enemies = sim.humans, sim.enemies
+    hx = np.fromiter((h.x for h in humans), float, len(humans))
+    hy = np.fromiter((h.y for h in humans), float, len(humans))
+    fill_nearest(human_slots, (hx - vampire.x)[None], (hy - vampire.y)[None],
+                 np.ones((1, len(humans)), dtype=bool))
+
+    ex = np.fromiter((e.x for e in enemies), float, len(enemies))
+    ey = np.fromiter((e.y for e in enemies), float, len(enemies))
+    chasing = np.fromiter((e.chasing for e in enemies), float, len(enemies))
+    health = np.fromiter((e.health / e.max_health for e in enemies), float, len(enemies))
+    fill_nearest(hunter_slots, (ex - vampire.x)[None], (ey - vampire.y)[None],
+                 np.ones((1, len(enemies)), dtype=bool), (chasing[None], health[None]))
+    return out
+
+
+class VampireEnv:
+    """reset/step environment over one Simulation
+
+    `sim` defaults to a regular Simulation seeded with `seed`; any backend
+    works, and Game(env.sim) shows the episode being played.
+    """
+
+    observation_shape = (OBSERVATION_SIZE,)
+    action_count = ACTION_COUNT
+
+    def __init__(self, sim=None, seed=None, max_ticks=MAX_EPISODE_TICKS):
+        self.sim = sim if sim is not None else Simulation(seed=seed)
+        self.max_ticks = max_ticks
+        self.start_time = self.sim.total_time
+
+    def reset(self, seed=None):
+        """Start a new episode; (observation, info)"""
+        if seed is not None:
+            self.sim.seed = seed
+        self.sim.reset()
+        self.start_time = self.sim.total_time
+        return observe(self.sim), self.info()
+
+    def step(self, action):
+        """Play one tick; (observation, reward, terminated, truncated, info)"""
+        if not 0 <= action < ACTION_COUNT:
+            raise ValueError(f"Action {action} is not an INPUT_* bitmask")
+        sim = self.sim
+        if sim.game_over:
+            raise RuntimeError("The episode is over; call reset() first")
+        score = sim.score
+        sim.step(int(action))
+        terminated = sim.game_over
+        reward = sim.score - score + (DEATH_REWARD if terminated else ALIVE_REWARD)
+        truncated = not terminated and sim.total_time - self.start_time >= self.max_ticks
+        return observe(sim), float(reward), terminated, truncated, self.info()
+
+    def info(self):
+        sim = self.sim
+        return {"score": sim.score, "ticks": sim.total_time - self.start_time,
+                "hunters_killed": sim.hunters_killed, "cause_of_death": sim.cause_of_death}
+
+
+class VectorEnv:
+    """N independent games stepped in lockstep as NumPy arrays
+
+    step() takes one action per game and returns the same observations,
+    rewards, terminated and truncated arrays every time, updated in place;
+    copy them to keep a step's values. For games that just finished,
+    infos["final_score"] and infos["final_ticks"] hold the episode's result.
+    """
+
+    observation_shape = (OBSERVATION_SIZE,)
+    action_count = ACTION_COUNT
+
+    def __init__(self, num_envs, day_humans=10, day_hunters=3, night_humans=4, night_hunters=6,
+                 seed=None, max_ticks=MAX_EPISODE_TICKS):
+        self.num_envs = num_envs
+        self.day_humans = day_humans
+        self.day_hunters = day_hunters
+        self.night_humans = night_humans
+        self.night_hunters = night_hunters
+        self.max_ticks = max_ticks
+        self.day_duration = Simulation.DAY_DURATION
+        self.rng = np.random.default_rng(seed)
+        # Starting resources, speeds and size, from the object backend's Vampire
+        self.template = Vampire(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2)
+
+        n = num_envs
+        humans = max(day_humans, night_humans)
+        hunters = max(day_hunters, night_hunters)
+        self.human_slots = np.arange(humans)
+        self.hunter_slots = np.arange(hunters)
+
+        # Vampires, clocks and scores: one entry per game
+        self.vx = np.zeros(n)
+        self.vy = np.zeros(n)
+        self.blood = np.zeros(n)
+        self.energy = np.zeros(n)
+        self.health = np.zeros(n)
+        self.bat = np.zeros(n, dtype=bool)
+        self.bat_duration = np.zeros(n, dtype=np.int32)
+        self.night = np.zeros(n, dtype=bool)
+        self.time_cycle = np.zeros(n, dtype=np.int32)
+        self.ticks = np.zeros(n, dtype=np.int32)
+        self.score = np.zeros(n, dtype=np.int64)
+        self.last_score = np.zeros(n, dtype=np.int64)
+
+        # Humans: position, per-tick step, turn timer; (games, slots)
+        self.hx = np.zeros((n, humans))
+        self.hy = np.zeros((n, humans))
+        self.hstep_x = np.zeros((n, humans))
+        self.hstep_y = np.zeros((n, humans))
+        self.htimer = np.zeros((n, humans), dtype=np.int32)
+        self.halive = np.zeros((n, humans), dtype=bool)
+
+        # Hunters: position, health, chase state, patrol timer and target
+        self.ex = np.zeros((n, hunters))
+        self.ey = np.zeros((n, hunters))
+        self.ehealth = np.zeros((n, hunters))
+        self.echasing = np.zeros((n, hunters), dtype=bool)
+        self.epatrol_timer = np.zeros((n, hunters), dtype=np.int32)
+        self.epatrol_x = np.zeros((n, hunters))
+        self.epatrol_y = np.zeros((n, hunters))
+        self.ealive = np.zeros((n, hunters), dtype=bool)
+
+        # Every game shares the map, so one Navigator serves them all. Its
+        # chase tables become rows of (daytime * cells + goal cell, cell)
+        # arrays, filled the first time a game chases from that goal.
+        self.nav = Navigator(NavGrid(SCREEN_WIDTH, SCREEN_HEIGHT, NAV_CELL_SIZE, SUN_ZONE_WIDTH))
+        grid = self.nav.grid
+        cells = grid.cols * grid.rows
+        self.chase_ready = np.zeros(2 * cells, dtype=bool)
+        self.chase_steered = np.zeros((2 * cells, cells), dtype=bool)
+        self.chase_dx = np.zeros((2 * cells, cells))
+        self.chase_dy = np.zeros((2 * cells, cells))
+        shade = self.nav.shade_table()
+        self.shade_steered = np.array([s is not None for s in shade])
+        self.shade_dx = np.array([s[0] if s else 0.0 for s in shade])
+        self.shade_dy = np.array([s[1] if s else 0.0 for s in shade])
+
+        # Outputs, overwritten in place by every step()
+        self.observations = np.zeros((n, OBSERVATION_SIZE), dtype=np.float32)
+        self.rewards = np.zeros(n, dtype=np.float32)
+        self.terminated = np.zeros(n, dtype=bool)
+        self.truncated = np.zeros(n, dtype=bool)
+        self.final_score = np.zeros(n, dtype=np.int64)
+        self.final_ticks = np.zeros(n, dtype=np.int32)
+        self.infos = {"final_score": self.final_score, "final_ticks": self.final_ticks}
+        self.views = observation_views(self.observations)
+
+        self.reset()
+
+    def reset(self, seed=None):
+        """Restart every game; (observations, infos)"""
+        if seed is not None:
+            self.rng = np.random.default_rng(seed)
+        self.restart(np.arange(self.num_envs))
+        self.terminated[:] = False
+        self.truncated[:] = False
+        self.observe()
+        return self.observations, self.infos
+
+    def step(self, actions):
+        """Play one tick of every game; (observations, rewards, terminated, truncated, infos)"""
+        actions = np.asarray(actions)
+        if actions.shape != (self.num_envs,):
+            raise ValueError(f"Expected {self.num_envs} actions, got shape {actions.shape}")
+
+        self.update_vampires(actions)
+        self.update_humans()
+        self.update_hunters()
+        self.resolve_collisions()
+        self.feed((actions & INPUT_FEED) != 0)
+        self.update_bat_form()
+        self.advance_clock()
+
+        terminated, truncated, rewards = self.terminated, self.truncated, self.rewards
+        np.less_equal(self.health, 0, out=terminated)
+        np.greater_equal(self.ticks, self.max_ticks, out=truncated)
+        truncated &= ~terminated
+        np.subtract(self.score, self.last_score, out=rewards, casting="unsafe")
+        rewards += ALIVE_REWARD
+        rewards[terminated] += DEATH_REWARD - ALIVE_REWARD
+
+        finished = np.flatnonzero(terminated | truncated)
+        if len(finished):
+            self.final_score[finished] = self.score[finished]
+            self.final_ticks[finished] = self.ticks[finished]
+            self.restart(finished)
+        np.copyto(self.last_score, self.score)
+        self.observe()
+        return self.observations, rewards, terminated, truncated, self.infos
+
+    # Game setup
+
+    def restart(self, games):
+        """Put the given games back to the start of an episode"""
+        template = self.template
+        self.vx[games] = template.x
+        self.vy[games] = template.y
+        self.blood[games] = template.blood
+        self.energy[games] = template.energy
+        self.health[games] = template.health
+        self.bat[games] = False
+        self.bat_duration[games] = 0
+        self.night[games] = False
+        self.time_cycle[games] = 0
+        self.ticks[games] = 0
+        self.score[games] = 0
+        self.last_score[games] = 0
+        self.spawn_humans(games, self.day_humans)
+        self.spawn_hunters(games, self.day_hunters)
+
+    def random_points(self, shape):
+        """Random spawn spots away from the walls"""
+        x = self.rng.integers(50, SCREEN_WIDTH - 50, shape, endpoint=True)
+        y = self.rng.integers(50, SCREEN_HEIGHT - 50, shape, endpoint=True)
+        return x, y
+
+    def spawn_humans(self, games, count):
+        """Fresh humans in the first `count` slots of the given games"""
+        shape = (len(games), len(self.human_slots))
+        self.hx[games], self.hy[games] = self.random_points(shape)
+        direction = self.rng.uniform(0, 2 * np.pi, shape)
+        self.hstep_x[games] = np.cos(direction) * HUMAN_SPEED
+        self.hstep_y[games] = np.sin(direction) * HUMAN_SPEED
+        self.htimer[games] = 0
+        self.halive[games] = self.human_slots < count
+
+    def spawn_hunters(self, games, count):
+        """Fresh hunters in the first `count` slots of the given games"""
+        shape = (len(games), len(self.hunter_slots))
+        x, y = self.random_points(shape)
+        self.ex[games] = self.epatrol_x[games] = x
+        self.ey[games] = self.epatrol_y[games] = y
+        self.ehealth[games] = ENEMY_MAX_HEALTH
+        self.echasing[games] = False
+        self.epatrol_timer[games] = 0
+        self.ealive[games] = self.hunter_slots < count
+
+    # Tick phases, in Simulation.step order
+
+    def update_vampires(self, actions):
+        """Bat transformation, movement, sunlight and hunger for every vampire"""
+        template = self.template
+        activate = (((actions & INPUT_BAT) != 0) & (self.energy >= 20) & (self.blood >= 10))
+        if activate.any():
+            self.bat |= activate
+            self.bat_duration[activate] = template.max_bat_duration
+            self.energy[activate] -= 20
+            self.blood[activate] -= 5
+
+        speed = np.where(self.bat, template.bat_speed,
+                         np.where(self.blood < 20, template.speed * 0.5, template.speed))
+        dx = ((actions & INPUT_RIGHT) != 0).astype(np.int8) - ((actions & INPUT_LEFT) != 0)
+        dy = ((actions & INPUT_DOWN) != 0).astype(np.int8) - ((actions & INPUT_UP) != 0)
+        self.vx += dx * speed
+        self.vy += dy * speed
+        radius = template.radius
+        np.clip(self.vx, radius, SCREEN_WIDTH - radius, out=self.vx)
+        np.clip(self.vy, radius, SCREEN_HEIGHT - radius, out=self.vy)
+
+        night = self.night
+        self.health -= (~night & (self.vx < SUN_ZONE_WIDTH)) * 0.5
+        np.minimum(self.energy + night * 0.3, template.max_energy, out=self.energy)
+        self.blood -= np.where(night, Vampire.NIGHT_BLOOD_DRAIN, Vampire.DAY_BLOOD_DRAIN)
+        self.health -= (self.blood < 30) * 0.2
+        np.maximum(self.health, 0, out=self.health)
+
+    def update_humans(self):
+        """Random walk with wall bounces for every human slot"""
+        self.htimer += 1
+        turning = self.htimer > HUMAN_TURN_TICKS
+        count = np.count_nonzero(turning)
+        if count:
+            direction = self.rng.uniform(0, 2 * np.pi, count)
+            self.hstep_x[turning] = np.cos(direction) * HUMAN_SPEED
+            self.hstep_y[turning] = np.sin(direction) * HUMAN_SPEED
+            self.htimer[turning] = 0
+
+        self.hx += self.hstep_x
+        self.hy += self.hstep_y
+
+        # Bounce off walls by mirroring the matching step component
+        for pos, step, size in ((self.hx, self.hstep_x, SCREEN_WIDTH),
+                                (self.hy, self.hstep_y, SCREEN_HEIGHT)):
+            lo, hi = HUMAN_RADIUS, size - HUMAN_RADIUS
+            hit = (pos < lo) | (pos > hi)
+            if hit.any():
+                step[hit] = -step[hit]
+                np.clip(pos, lo, hi, out=pos)
+
+    def cells(self, x, y):
+        """NavGrid cells of (x, y) arrays; everything is clamped inside the screen"""
+        grid = self.nav.grid
+        scale = 1 / grid.cell_size
+        return (y * scale).astype(np.intp) * grid.cols + (x * scale).astype(np.intp)
+
+    def build_chase_tables(self, keys):
+        """Fill the chase table rows for (daytime * cells + goal cell) keys not built yet"""
+        missing = keys[~self.chase_ready[keys]]
+        if not len(missing):
+            return
+        nav = self.nav
+        grid = nav.grid
+        cells = grid.cols * grid.rows
+        for key in np.unique(missing).tolist():
+            daytime, goal = divmod(key, cells)
+            nav.set_goal((goal % grid.cols + 0.5) * grid.cell_size,
+                         (goal // grid.cols + 0.5) * grid.cell_size, not daytime)
+            table = nav.chase_table()
+            self.chase_steered[key] = [s is not None for s in table]
+            self.chase_dx[key] = [s[0] if s else 0.0 for s in table]
+            self.chase_dy[key] = [s[1] if s else 0.0 for s in table]
+            self.chase_ready[key] = True
+        nav.chase_cache.clear()     # The rows above are the only copy needed
+
+    def update_hunters(self):
+        """Patrol, chase and flow-field steering for every hunter slot"""
+        night = self.night[:, None]
+        speed = np.where(night, Enemy.NIGHT_SPEED, Enemy.DAY_SPEED)
+        detection_range = np.where(night, Enemy.NIGHT_DETECTION_RANGE, Enemy.DAY_DETECTION_RANGE)
+        vx, vy = self.vx[:, None], self.vy[:, None]
+
+        offset_x = self.ex - vx
+        offset_y = self.ey - vy
+        chasing = offset_x * offset_x + offset_y * offset_y < detection_range * detection_range
+        self.echasing = chasing
+
+        # Patrolling hunters pick a new random point every ENEMY_PATROL_TICKS
+        patrolling = ~chasing
+        self.epatrol_timer += patrolling
+        retarget = patrolling & (self.epatrol_timer > ENEMY_PATROL_TICKS)
+        count = np.count_nonzero(retarget)
+        if count:
+            self.epatrol_timer[retarget] = 0
+            self.epatrol_x[retarget] = self.rng.integers(
+                100, SCREEN_WIDTH - 100, count, endpoint=True)
+            self.epatrol_y[retarget] = self.rng.integers(
+                100, SCREEN_HEIGHT - 100, count, endpoint=True)
+
+        # Unit steps towards the target (as cos/sin of the angle, but cheaper)
+        step_x = np.where(chasing, vx, self.epatrol_x) - self.ex
+        step_y = np.where(chasing, vy, self.epatrol_y) - self.ey
+        length = np.sqrt(step_x * step_x + step_y * step_y)
+        arrived = length == 0
+        length[arrived] = 1
+        step_x /= length
+        step_y /= length
+        step_x[arrived] = 1     # atan2(0, 0) is 0: a hunter on its target heads right
+
+        # Chasers follow their game's chase field, and by day patrollers the
+        # way out of the sun, wherever the field has a steer for their cell
+        cells = self.cells(self.ex, self.ey)
+        chasers = chasing & self.ealive
+        if chasers.any():
+            grid_cells = self.chase_steered.shape[1]
+            keys = (~self.night) * grid_cells + self.cells(self.vx, self.vy)
+            self.build_chase_tables(keys[chasers.any(axis=1)])
+            flat = keys[:, None] * grid_cells + cells
+            use = chasers & self.chase_steered.take(flat)
+            step_x = np.where(use, self.chase_dx.take(flat), step_x)
+            step_y = np.where(use, self.chase_dy.take(flat), step_y)
+        use = patrolling & ~night & self.shade_steered.take(cells)
+        step_x = np.where(use, self.shade_dx.take(cells), step_x)
+        step_y = np.where(use, self.shade_dy.take(cells), step_y)
+
+        step_x *= speed
+        step_y *= speed
+        self.ex += step_x
+        self.ey += step_y
+        np.clip(self.ex, ENEMY_RADIUS, SCREEN_WIDTH - ENEMY_RADIUS, out=self.ex)
+        np.clip(self.ey, ENEMY_RADIUS, SCREEN_HEIGHT - ENEMY_RADIUS, out=self.ey)
+
+    def resolve_collisions(self):
+        """Ramming damage both ways, as Simulation.hit_enemy for each touching hunter"""
+        reach = self.template.radius + ENEMY_RADIUS
+        dx = self.ex - self.vx[:, None]
+        dy = self.ey - self.vy[:, None]
+        hits = self.ealive & (dx * dx + dy * dy < reach * reach)
+        if not hits.any():
+            return
+        self.ehealth -= hits * np.where(self.bat, 2, 0.5)[:, None]
+        self.health -= 0.5 * np.count_nonzero(hits, axis=1)
+        dead = hits & (self.ehealth <= 0)
+        if dead.any():
+            self.ealive &= ~dead
+            self.score += 50 * np.count_nonzero(dead, axis=1)
+
+    def feed(self, feeding):
+        """Each feeding vampire drinks from its first human in reach, who is replaced"""
+        if not feeding.any():
+            return
+        dx = self.hx - self.vx[:, None]
+        dy = self.hy - self.vy[:, None]
+        near = self.halive & feeding[:, None] & (dx * dx + dy * dy < FEED_RANGE * FEED_RANGE)
+        games = np.flatnonzero(near.any(axis=1))
+        if not len(games):
+            return
+        template = self.template
+        self.blood[games] = np.minimum(template.max_blood, self.blood[games] + Simulation.FEED_BLOOD)
+        self.health[games] = np.minimum(template.max_health, self.health[games] + 10)
+        self.score[games] += 10
+
+        slots = near[games].argmax(axis=1)
+        self.hx[games, slots], self.hy[games, slots] = self.random_points(len(games))
+        direction = self.rng.uniform(0, 2 * np.pi, len(games))
+        self.hstep_x[games, slots] = np.cos(direction) * HUMAN_SPEED
+        self.hstep_y[games, slots] = np.sin(direction) * HUMAN_SPEED
+        self.htimer[games, slots] = 0
+
+    def update_bat_form(self):
+        """Count down bat form and end it when the duration expires"""
+        self.bat_duration -= self.bat
+        self.bat &= self.bat_duration > 0
+
+    def advance_clock(self):
+        """Day/night cycle, swapping populations at dusk and dawn"""
+        self.time_cycle += 1
+        self.ticks += 1
+        games = np.flatnonzero(self.time_cycle > self.day_duration)
+        if not len(games):
+            return
+        self.time_cycle[games] = 0
+        self.night[games] = ~self.night[games]
+        dusk = games[self.night[games]]
+        dawn = games[~self.night[games]]
+        if len(dusk):
+            # People go inside: only the first night_humans stay out
+            self.halive[dusk, self.night_humans:] = False
+            self.spawn_hunters(dusk, self.night_hunters)
+        if len(dawn):
+            self.spawn_humans(dawn, self.day_humans)
+            self.spawn_hunters(dawn, self.day_hunters)
+
+    def observe(self):
+        """Write every game's observation into self.observations"""
+        vampire, human_slots, hunter_slots = self.views
+        template = self.template
+        night = self.night
+        vampire[:, 0] = self.blood / template.max_blood
+        vampire[:, 1] = self.energy / template.max_energy
+        vampire[:, 2] = self.health / template.max_health
+        vampire[:, 3] = self.bat
+        vampire[:, 4] = self.bat_duration / template.max_bat_duration
+        vampire[:, 5] = night
+        vampire[:, 6] = self.time_cycle / self.day_duration
+        vampire[:, 7] = self.vx / SCREEN_WIDTH
+        vampire[:, 8] = self.vy / SCREEN_HEIGHT
+        vampire[:, 9] = ~night & (self.vx < SUN_ZONE_WIDTH)
+
+        vx, vy = self.vx[:, None], self.vy[:, None]
+        fill_nearest(human_slots, self.hx - vx, self.hy - vy, self.halive)
+        fill_nearest(hunter_slots, self.ex - vx, self.ey - vy, self.ealive,
+                     (self.echasing, self.ehealth / ENEMY_MAX_HEALTH))
+
+
+def run_random(env, seconds, rng):
+    """Step `env` with random actions for `seconds`; (env-steps/s, episodes, mean score)"""
+    vector = isinstance(env, VectorEnv)
+    actions = rng.integers(0, ACTION_COUNT, (256, env.num_envs) if vector else 256)
+    scores = []
+    env.reset()
+    clock = time.perf_counter
+    start = clock()
+    steps = 0
+    while clock() - start < seconds:
+        for action in actions:
+            _, _, terminated, truncated, info = env.step(action)
+            if vector:
+                done = terminated | truncated
+                scores.extend(env.final_score[done].tolist())
+            elif terminated or truncated:
+                scores.append(info["score"])
+                env.reset()
+        steps += len(actions) * (env.num_envs if vector else 1)
+    rate = steps / (clock() - start)
+    return rate, len(scores), sum(scores) / len(scores) if scores else 0.0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure Vampire Survival environment throughput")
+    parser.add_argument("--envs", type=int, default=4096, help="games in the VectorEnv")
+    parser.add_argument("--seconds", type=float, default=3.0, help="measuring time per env")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(args.seed)
+    for name, env in (("VampireEnv", VampireEnv(seed=args.seed)),
+                      (f"VectorEnv x{args.envs}", VectorEnv(args.envs, seed=args.seed))):
+        rate, episodes, score = run_random(env, args.seconds, rng)
+        print(f"{name:<18}{rate:>12,.0f} env-steps/s  {episodes:>7} episodes"
+              f"  mean score {score:.1f} (random actions)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -8,21 +8,105 @@ Controls:
   W/A/D/S - Movement (W=up, A=left, D=right, S=down)
   E - Switch to a bat (costs energy, flies fast)
   F - Feed on nearby human
+  R - Rewind (hold)
+  F3 - Frame profiler overlay
   ESC - Quit
+
+The simulation (Simulation) is display-free and advances one tick per call
+to step() with an explicit bitmask of INPUT_* flags, so it can be stepped
+headlessly as fast as the CPU allows:
+
+    sim = Simulation()
+    sim.fast_forward(100000, policy=lambda sim: INPUT_RIGHT | INPUT_FEED)
+
+Game is the optional pygame layer on top: it reads the keyboard, steps the
+simulation once per frame and renders it.
+
+Simulation.snapshot() packs the whole game state into a compact binary
+blob and restore() puts it back exactly; Game keeps the last few seconds
+of snapshots in a SnapshotRing to rewind and to dump after a crash.
+
+pygame is imported lazily: headless use never loads it, and Game only
+initializes the display and font subsystems, when it needs them.
 """
 
-import pygame
+import argparse
+import importlib.util
 import random
 import math
+import struct
+import sys
+import time
+from array import array
 from enum import Enum
 
-# Initialize Pygame
-pygame.init()
+from vampire_render import DirtyScreen, RenderCache, SpriteCache
+from vampire_lod import LodScheduler
+from vampire_nav import Navigator, NavGrid
+from vampire_spatial import BruteForceIndex, SpatialGrid, TrajectoryIndex
+
+
+def lazy_import(name):
+    """Module whose code only runs when one of its attributes is first used"""
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ImportError(f"No module named '{name}'", name=name)
+    spec.loader = importlib.util.LazyLoader(spec.loader)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+# Rendering and keyboard input need pygame; the simulation never touches it
+pygame = lazy_import("pygame")
 
 # Constants
 SCREEN_WIDTH = 1000
 SCREEN_HEIGHT = 700
-FPS = 60
+FPS = 60                # Simulation ticks per second (all tuning assumes this)
+RENDER_FPS = 144        # Render rate cap, independent of the tick rate (0 = uncapped)
+MAX_CATCH_UP_TICKS = 5  # Most ticks run in one frame before game time slows down
+MENU_BUILD_BUDGET = 0.004   # Seconds per frame spent rendering the menu page
+
+# Entity sizes and ranges
+HUMAN_RADIUS = 8
+HUMAN_TURN_TICKS = 120  # Random walk picks a new heading after this
+HUMAN_LEG_REACH = HUMAN_TURN_TICKS + 1  # Farthest a human walks between turns (1 px a tick)
+ENEMY_RADIUS = 10
+FEED_RANGE = 40
+GRID_CELL_SIZE = 50     # Spatial grid cell edge, in pixels
+GRID_MIN_ENTITIES = 64  # Below this a plain scan beats maintaining a grid
+NAV_CELL_SIZE = 50      # Hunter flow field cell edge, in pixels
+SUN_ZONE_WIDTH = SCREEN_WIDTH // 2  # Daylight burns everything left of this
+
+# Per-tick input flags (one bit per control)
+INPUT_UP = 1
+INPUT_DOWN = 2
+INPUT_LEFT = 4
+INPUT_RIGHT = 8
+INPUT_BAT = 16
+INPUT_FEED = 32
+
+# Rewind history kept by Game, and where it goes if the game crashes
+REWIND_SECONDS = 10
+CRASH_DUMP_PATH = "vampire_crash.snaps"
+
+# State snapshot layout (little-endian): a fixed-size header, the Mersenne
+# Twister state, then the entity section sized by the header's counts
+SNAPSHOT_MAGIC = b"VS"
+SNAPSHOT_VERSION = 3
+SNAPSHOT_HEADER = struct.Struct(
+    "<2sB"          # magic, version
+    "BIIIiIBB"      # time of day, time cycle, day duration, total time, score,
+                    # hunters killed, game over, cause of death
+    "dddddiBB"      # vampire x, y, blood, energy, health, bat duration, form, last damage
+    "II"            # human count, hunter count
+)
+SNAPSHOT_RNG = struct.Struct("<625I?d")    # MT words + position, has gauss, gauss
+DAMAGE_CAUSES = (None, "sun", "hunger", "hunters")   # Codes for last damage / cause of death
 
 # Game states
 class TimeOfDay(Enum):
@@ -52,6 +136,14 @@ COLOR_TEXT = (255, 255, 255)        # White
 class Vampire:
     """Player character - the vampire"""
 
+    __slots__ = ("x", "y", "radius", "speed", "form", "bat_speed",
+                 "blood", "max_blood", "energy", "max_energy", "health", "max_health",
+                 "bat_duration", "max_bat_duration", "last_damage")
+
+    # Balance knobs (class attributes so balance runs can override them)
+    DAY_BLOOD_DRAIN = 0.08      # Faster drain during day (more activity)
+    NIGHT_BLOOD_DRAIN = 0.03    # Slower drain at night (vampires rest)
+
     def __init__(self, x, y):
         self.x = x
         self.y = y
@@ -72,39 +164,42 @@ class Vampire:
         self.bat_duration = 0
         self.max_bat_duration = 300  # 5 seconds at 60 FPS
 
-    def update(self, keys, mouse_pos, time_of_day):
-        """Update vampire based on input and state"""
-
-        # Movement
-        if keys[pygame.K_w]:
-            self.y -= self.get_speed()
-        if keys[pygame.K_s]:
-            self.y += self.get_speed()
-        if keys[pygame.K_a]:
-            self.x -= self.get_speed()
-        if keys[pygame.K_d]:
-            self.x += self.get_speed()
-
-        # Keep in bounds
-        self.x = max(self.radius, min(SCREEN_WIDTH - self.radius, self.x))
-        self.y = max(self.radius, min(SCREEN_HEIGHT - self.radius, self.y))
+        # What last hurt us ("sun" or "hunger"), for cause of death
+        self.last_damage = None
 
-        # Sunlight damage during day
-        if time_of_day == TimeOfDay.DAY:
-            self.take_sun_damage()
+    def update(self, controls, time_of_day, width=SCREEN_WIDTH, height=SCREEN_HEIGHT,
+               sun_width=SUN_ZONE_WIDTH):
+        """Update vampire based on input flags and state, in a width x height world"""
 
-        # Regenerate energy slightly at night (vampires rest)
-        if time_of_day == TimeOfDay.NIGHT:
-            self.energy = min(self.max_energy, self.energy + 0.3)
+        # Movement
+        if controls & (INPUT_UP | INPUT_DOWN | INPUT_LEFT | INPUT_RIGHT):
+            speed = self.get_speed()
+            if controls & INPUT_UP:
+                self.y -= speed
+            if controls & INPUT_DOWN:
+                self.y += speed
+            if controls & INPUT_LEFT:
+                self.x -= speed
+            if controls & INPUT_RIGHT:
+                self.x += speed
+
+            # Keep in bounds
+            self.x = max(self.radius, min(width - self.radius, self.x))
+            self.y = max(self.radius, min(height - self.radius, self.y))
 
-        # Blood drains based on time of day
         if time_of_day == TimeOfDay.DAY:
-            self.blood -= 0.08  # Faster drain during day (more activity)
+            # Sunlight damage during day, and blood drains faster
+            self.take_sun_damage(sun_width)
+            self.blood -= self.DAY_BLOOD_DRAIN
         else:
-            self.blood -= 0.03  # Slower drain at night (vampires rest)
+            # Regenerate energy slightly at night (vampires rest)
+            self.energy = min(self.max_energy, self.energy + 0.3)
+            self.blood -= self.NIGHT_BLOOD_DRAIN
 
         # Hunger severely drains health
         if self.blood < 30:
+            if self.health > 0:
+                self.last_damage = "hunger"
             self.health -= 0.2  # Health loss when very hungry
 
         self.health = max(0, self.health)
@@ -117,10 +212,11 @@ class Vampire:
             # Slower if hungry
             return self.speed * (0.5 if self.blood < 20 else 1.0)
 
-    def take_sun_damage(self):
+    def take_sun_damage(self, sun_width=SUN_ZONE_WIDTH):
         """Check if in sunlight and take damage"""
-        # Sunlight zone is left HALF of screen (much bigger)
-        if self.x < SCREEN_WIDTH // 2:
+        # Sunlight zone is left HALF of the world (much bigger)
+        if self.x < sun_width:
+            self.last_damage = "sun"
             self.health -= 0.5
             if self.health <= 0:
                 self.health = 0
@@ -138,72 +234,364 @@ class Vampire:
         self.blood = min(self.max_blood, self.blood + blood_amount)
         self.health = min(self.max_health, self.health + 10)
 
-    def draw(self, screen):
-        """Draw the vampire"""
+    def update_bat_form(self):
+        """Count down bat form and end it when the duration expires"""
         if self.form == VampireForm.BAT:
-            # Show bat transformation effect
-            pygame.draw.circle(screen, COLOR_BAT, (int(self.x), int(self.y)), self.radius + 2)
-            pygame.draw.circle(screen, (150, 50, 255), (int(self.x), int(self.y)), self.radius)
-            # End bat form if duration expired
             self.bat_duration -= 1
             if self.bat_duration <= 0:
                 self.form = VampireForm.HUMAN
-        else:
-            pygame.draw.circle(screen, COLOR_VAMPIRE, (int(self.x), int(self.y)), self.radius)
-            # Draw eyes
-            eye_offset = 4
-            pygame.draw.circle(screen, (255, 0, 0), (int(self.x - eye_offset), int(self.y - 3)), 2)
-            pygame.draw.circle(screen, (255, 0, 0), (int(self.x + eye_offset), int(self.y - 3)), 2)
+
+    def draw(self, screen):
+        """Draw the vampire"""
+        paint_vampire(screen, (int(self.x), int(self.y)), self.radius, self.form)
+
+
+def paint_vampire(surface, center, radius, form):
+    """Vampire body (with eyes) or bat form around an integer center"""
+    x, y = center
+    if form == VampireForm.BAT:
+        # Show bat transformation effect
+        pygame.draw.circle(surface, COLOR_BAT, center, radius + 2)
+        pygame.draw.circle(surface, (150, 50, 255), center, radius)
+    else:
+        pygame.draw.circle(surface, COLOR_VAMPIRE, center, radius)
+        # Draw eyes
+        eye_offset = 4
+        pygame.draw.circle(surface, (255, 0, 0), (x - eye_offset, y - 3), 2)
+        pygame.draw.circle(surface, (255, 0, 0), (x + eye_offset, y - 3), 2)
+
+
+class EntityRandom:
+    """One entity's own random stream: a 48-bit linear congruential generator
+
+    Humans and hunters draw their turns and patrol points from one of these
+    rather than the simulation's generator, so how often an entity is
+    updated (see LodScheduler) can't change what any other entity draws.
+    The state is a single integer below 2 ** 48, cheap to keep per entity
+    and stored exactly in a snapshot or a double.
+    """
+
+    __slots__ = ("state",)
+
+    MULTIPLIER = 0x5DEECE66D    # drand48's constants
+    INCREMENT = 0xB
+    BITS = 48
+    MASK = (1 << BITS) - 1
+
+    def __init__(self, state):
+        self.state = state & self.MASK
+
+    @classmethod
+    def spawn(cls, rng):
+        """New stream seeded by a draw from another generator"""
+        return cls(rng.getrandbits(cls.BITS))
+
+    def random(self):
+        """Next float in [0, 1)"""
+        self.state = state = (self.state * self.MULTIPLIER + self.INCREMENT) & self.MASK
+        return state / 281474976710656.0  # 2 ** 48
+
+    def uniform(self, a, b):
+        return a + (b - a) * self.random()
+
+    def randint(self, a, b):
+        """Integer in [a, b], both included"""
+        return a + int(self.random() * (b - a + 1))
 
 
 class Human:
-    """NPCs that can be fed on"""
+    """NPCs that can be fed on
 
-    def __init__(self, x, y):
+    Humans walk in straight legs: a turn or a wall bounce starts a new leg,
+    and the position is the leg's start plus the step times the ticks
+    walked along it. LazyHuman works positions out from the same formula,
+    so both give identical positions.
+    """
+
+    __slots__ = ("x", "y", "rng", "radius", "speed", "direction", "step_x", "step_y",
+                 "change_direction_timer", "leg_x", "leg_y", "leg_ticks", "lod_due", "lod_ticks")
+
+    def __init__(self, x, y, rng=random, direction=None):
+        self.reset(x, y, rng, direction)
+
+    def reset(self, x, y, rng=random, direction=None):
+        """(Re)initialize as a fresh human - lets an EntityPool recycle us"""
         self.x = x
         self.y = y
-        self.radius = 8
+        self.rng = rng
+        self.radius = HUMAN_RADIUS
         self.speed = 1
-        self.direction = random.uniform(0, 2 * math.pi)
+        self.set_direction(rng.uniform(0, 2 * math.pi) if direction is None else direction)
         self.change_direction_timer = 0
-
-    def update(self):
-        """Update human movement (random walk)"""
-        self.change_direction_timer += 1
+        self.lod_due = 0        # LodScheduler: next tick to update on, ticks it covers
+        self.lod_ticks = 1
+
+    def set_direction(self, direction):
+        """Set heading and cache the per-tick step; a new leg starts here"""
+        self.direction = direction
+        self.step_x = math.cos(direction) * self.speed
+        self.step_y = math.sin(direction) * self.speed
+        self.leg_x, self.leg_y, self.leg_ticks = self.x, self.y, 0
+
+    def resume(self, timer, walked):
+        """Continue the current leg as if `walked` ticks along it, turn timer at `timer`"""
+        self.change_direction_timer = timer
+        self.leg_ticks = walked
+        self.x = self.leg_x + self.step_x * walked
+        self.y = self.leg_y + self.step_y * walked
+
+    def update(self, width=SCREEN_WIDTH, height=SCREEN_HEIGHT, ticks=1):
+        """Update human movement (random walk) in a width x height world
+
+        `ticks` above 1 covers that many ticks in one go, for entities a
+        LodScheduler updates less often (see catch_up()).
+        """
+        if ticks > 1:
+            self.catch_up(width, height, ticks)
+            return
 
         # Randomly change direction
-        if self.change_direction_timer > 120:
-            self.direction = random.uniform(0, 2 * math.pi)
-            self.change_direction_timer = 0
+        timer = self.change_direction_timer + 1
+        if timer > HUMAN_TURN_TICKS:
+            self.set_direction(self.rng.uniform(0, 2 * math.pi))
+            timer = 0
+        self.change_direction_timer = timer
 
         # Move
-        self.x += math.cos(self.direction) * self.speed
-        self.y += math.sin(self.direction) * self.speed
+        walked = self.leg_ticks = self.leg_ticks + 1
+        x = self.x = self.leg_x + self.step_x * walked
+        y = self.y = self.leg_y + self.step_y * walked
 
         # Bounce off walls
-        if self.x < self.radius or self.x > SCREEN_WIDTH - self.radius:
-            self.direction = math.pi - self.direction
-            self.x = max(self.radius, min(SCREEN_WIDTH - self.radius, self.x))
+        radius = self.radius
+        if x < radius or x > width - radius:
+            self.x = max(radius, min(width - radius, x))
+            self.set_direction(math.pi - self.direction)
+
+        if y < radius or y > height - radius:
+            self.y = max(radius, min(height - radius, y))
+            self.set_direction(-self.direction)
+
+    def catch_up(self, width, height, ticks):
+        """Walk `ticks` ticks, updating tick by tick only where a turn or bounce is due
+
+        Straight stretches are skipped in one go, the way LazyHuman does,
+        so the walk ends exactly where `ticks` single updates would.
+        """
+        radius = self.radius
+        while ticks:
+            walked = self.leg_ticks
+            limit = walked + min(ticks, HUMAN_TURN_TICKS + 1 - self.change_direction_timer)
+            event = min(leg_exit(self.leg_x, self.step_x, walked + 1, limit, radius, width - radius),
+                        leg_exit(self.leg_y, self.step_y, walked + 1, limit, radius, height - radius))
+            straight = event - walked - 1
+            if straight:
+                self.change_direction_timer += straight
+                self.leg_ticks = walked = walked + straight
+                self.x = self.leg_x + self.step_x * walked
+                self.y = self.leg_y + self.step_y * walked
+            self.update(width, height)
+            ticks -= straight + 1
+
+    def draw(self, screen):
+        """Draw the human"""
+        paint_human(screen, (int(self.x), int(self.y)), self.radius)
+
+
+class Clock:
+    """Tick counter a LazyHuman reads its position against"""
+
+    __slots__ = ("now",)
 
-        if self.y < self.radius or self.y > SCREEN_HEIGHT - self.radius:
-            self.direction = -self.direction
-            self.y = max(self.radius, min(SCREEN_HEIGHT - self.radius, self.y))
+    def __init__(self, now=0):
+        self.now = now
+
+
+STOPPED = Clock()   # Humans outside a TrajectoryIndex stand still on this
+
+
+class LazyHuman:
+    """Human whose position is worked out from its leg only when asked for
+
+    Same walk as Human, but nothing is stepped per tick: the current leg's
+    start, step, start tick and turn timer are kept, and x/y are evaluated
+    against `clock` (the TrajectoryIndex the human is in) when read. The
+    index calls advance() only on the ticks next_event() predicts a turn or
+    a wall bounce, and advance() does exactly what Human.update() would on
+    that tick, so positions match the per-tick walk bit for bit.
+    """
+
+    __slots__ = ("rng", "radius", "speed", "direction", "step_x", "step_y",
+                 "leg_x", "leg_y", "leg_start", "leg_timer", "clock", "event")
+
+    def __init__(self, x, y, rng=random, direction=None):
+        self.reset(x, y, rng, direction)
+
+    def reset(self, x, y, rng=random, direction=None):
+        """(Re)initialize as a fresh human - lets an EntityPool recycle us"""
+        self.rng = rng
+        self.radius = HUMAN_RADIUS
+        self.speed = 1
+        self.clock = STOPPED
+        self.event = None       # Sequence number of our pending TrajectoryIndex event
+        self.start_leg(x, y, STOPPED.now, 0,
+                       rng.uniform(0, 2 * math.pi) if direction is None else direction)
+
+    def start_leg(self, x, y, tick, timer, direction):
+        """Head off in `direction` from (x, y) at `tick`, the turn timer then at `timer`"""
+        self.direction = direction
+        self.step_x = math.cos(direction) * self.speed
+        self.step_y = math.sin(direction) * self.speed
+        self.leg_x, self.leg_y = x, y
+        self.leg_start = tick
+        self.leg_timer = timer      # Turn timer at the leg's start
+
+    @property
+    def leg_ticks(self):
+        return self.clock.now - self.leg_start
+
+    @property
+    def x(self):
+        return self.leg_x + self.step_x * (self.clock.now - self.leg_start)
+
+    @property
+    def y(self):
+        return self.leg_y + self.step_y * (self.clock.now - self.leg_start)
+
+    @property
+    def change_direction_timer(self):
+        return self.leg_timer + self.clock.now - self.leg_start
+
+    @change_direction_timer.setter
+    def change_direction_timer(self, timer):
+        self.leg_timer = timer - (self.clock.now - self.leg_start)
+
+    def resume(self, timer, walked):
+        """Continue the current leg as if `walked` ticks along it, turn timer at `timer`"""
+        self.leg_start = self.clock.now - walked
+        self.leg_timer = timer - walked
+
+    def rebase(self, clock):
+        """Read positions against another clock from now on, without moving"""
+        walked = self.clock.now - self.leg_start
+        self.clock = clock
+        self.leg_start = clock.now - walked
+
+    def next_event(self, width, height):
+        """Tick of the next turn or wall bounce, when advance() has to run"""
+        walked = self.clock.now - self.leg_start
+        # Leg ticks at which the turn timer runs out
+        turn = max(walked + 1, HUMAN_TURN_TICKS + 1 - self.leg_timer)
+        bounce = min(leg_exit(self.leg_x, self.step_x, walked + 1, turn,
+                              self.radius, width - self.radius),
+                     leg_exit(self.leg_y, self.step_y, walked + 1, turn,
+                              self.radius, height - self.radius))
+        return self.leg_start + bounce
+
+    def advance(self, width=SCREEN_WIDTH, height=SCREEN_HEIGHT):
+        """Run Human.update() for the current tick, which next_event() said is due"""
+        now = self.clock.now
+        walked = now - self.leg_start
+
+        # Randomly change direction, turning where we stood last tick
+        if self.leg_timer + walked > HUMAN_TURN_TICKS:
+            self.start_leg(self.leg_x + self.step_x * (walked - 1),
+                           self.leg_y + self.step_y * (walked - 1),
+                           now - 1, -1, self.rng.uniform(0, 2 * math.pi))
+            walked = 1
+
+        x = self.leg_x + self.step_x * walked
+        y = self.leg_y + self.step_y * walked
+
+        # Bounce off walls
+        if x < self.radius or x > width - self.radius:
+            x = max(self.radius, min(width - self.radius, x))
+            self.start_leg(x, y, now, self.leg_timer + walked, math.pi - self.direction)
+            walked = 0
+
+        if y < self.radius or y > height - self.radius:
+            y = max(self.radius, min(height - self.radius, y))
+            self.start_leg(x, y, now, self.leg_timer + walked, -self.direction)
+
+    def draw_position(self, alpha):
+        """Integer draw position, `alpha` of the way from the previous tick"""
+        walked = self.clock.now - self.leg_start
+        if alpha < 1.0 and walked >= 1:
+            walked += alpha - 1     # A leg that only began this tick has no previous point
+        return int(self.leg_x + self.step_x * walked), int(self.leg_y + self.step_y * walked)
 
     def draw(self, screen):
         """Draw the human"""
-        pygame.draw.circle(screen, COLOR_HUMAN, (int(self.x), int(self.y)), self.radius)
-        pygame.draw.circle(screen, (50, 150, 50), (int(self.x), int(self.y)), self.radius - 1)
+        paint_human(screen, (int(self.x), int(self.y)), self.radius)
+
+
+def leg_exit(start, step, first, limit, low, high):
+    """First leg tick from `first` whose position is outside [low, high], or `limit`
+
+    Positions are evaluated exactly as the walk computes them, so the answer
+    is the tick a per-tick walk would bounce on. Only ticks below `limit`
+    are looked at.
+    """
+    def outside(ticks):
+        position = start + step * ticks
+        return position < low or position > high
+
+    if outside(first):
+        return first
+    if step == 0:
+        return limit
+    # Moving away from one wall, the other is hit first; guess the tick, then fix up rounding
+    guess = ((high if step > 0 else low) - start) / step
+    if guess >= limit:
+        return limit
+    ticks = max(first, math.floor(guess))
+    while ticks > first and outside(ticks):
+        ticks -= 1
+    while not outside(ticks):
+        ticks += 1
+    return min(ticks, limit)
+
+
+def paint_human(surface, center, radius):
+    """Human body around an integer center"""
+    pygame.draw.circle(surface, COLOR_HUMAN, center, radius)
+    pygame.draw.circle(surface, (50, 150, 50), center, radius - 1)
+
+
+def hunter_color(health_ratio, chasing):
+    """Hunter body color for a health ratio and chase state"""
+    if health_ratio > 0.6:
+        return (255, 0, 0) if chasing else COLOR_ENEMY
+    elif health_ratio > 0.3:
+        return (255, 150, 0)  # Orange when damaged
+    else:
+        return (255, 200, 0)  # Yellow when almost dead
 
 
 class Enemy:
     """Hunters that chase the vampire"""
 
-    def __init__(self, x, y, vampire_x, vampire_y, is_night=False):
+    __slots__ = ("x", "y", "rng", "radius", "speed", "detection_range", "target_x", "target_y",
+                 "chasing", "is_night", "patrol_timer", "patrol_target", "health", "max_health",
+                 "lod_due", "lod_ticks")
+
+    # Balance knobs (class attributes so balance runs can override them)
+    DAY_SPEED = 2.8
+    NIGHT_SPEED = 3.5               # Much faster
+    DAY_DETECTION_RANGE = 200
+    NIGHT_DETECTION_RANGE = 350     # Much better detection
+
+    def __init__(self, x, y, vampire_x, vampire_y, is_night=False, rng=random):
+        self.reset(x, y, vampire_x, vampire_y, is_night, rng)
+
+    def reset(self, x, y, vampire_x, vampire_y, is_night=False, rng=random):
+        """(Re)initialize as a fresh hunter - lets an EntityPool recycle us"""
         self.x = x
         self.y = y
-        self.radius = 10
-        self.speed = 3.5 if is_night else 2.8  # Much faster
-        self.detection_range = 350 if is_night else 200  # Much better detection
+        self.rng = rng
+        self.radius = ENEMY_RADIUS
+        self.speed = self.speed_for(is_night)
+        self.detection_range = self.detection_range_for(is_night)
         self.target_x = vampire_x
         self.target_y = vampire_y
         self.chasing = False
@@ -212,17 +600,54 @@ class Enemy:
         self.patrol_target = (self.x, self.y)
         self.health = 30  # Hunters can be killed
         self.max_health = 30
-
-    def update(self, vampire_x, vampire_y, is_night, time_of_day):
-        """Update enemy - patrol or chase"""
-        # Update speed and detection based on time of day
-        self.speed = 3.5 if is_night else 2.8
-        self.detection_range = 350 if is_night else 200
+        self.lod_due = 0        # LodScheduler: next tick to update on, ticks it covers
+        self.lod_ticks = 1
+
+    @classmethod
+    def speed_for(cls, is_night):
+        """Hunter movement speed"""
+        return cls.NIGHT_SPEED if is_night else cls.DAY_SPEED
+
+    @classmethod
+    def detection_range_for(cls, is_night):
+        """How far hunters can spot the vampire"""
+        return cls.NIGHT_DETECTION_RANGE if is_night else cls.DAY_DETECTION_RANGE
+
+    def update(self, vampire_x, vampire_y, is_night, time_of_day, sees_vampire=None, nav=None,
+               width=SCREEN_WIDTH, height=SCREEN_HEIGHT, patrol_range=None, ticks=1):
+        """Update enemy - patrol or chase
+
+        `sees_vampire` can be passed in when a spatial index has already
+        answered the detection range check for this tick. With a `nav`
+        Navigator, hunters steer around obstacles and the sun by its flow
+        fields; without one they head straight for their target. Patrol
+        points are anywhere in the width x height world, or within
+        `patrol_range` of the hunter when given. `ticks` above 1 covers
+        that many ticks in one go, for hunters a LodScheduler updates less
+        often: the ticks before the last are run one by one as patrolling
+        out of the vampire's sight, exactly as they would have been.
+        """
+        if ticks > 1:
+            for _ in range(ticks - 1):
+                self.update(vampire_x, vampire_y, is_night, time_of_day, False, nav,
+                            width, height, patrol_range)
+
+        # Update speed and detection based on time of day (speed_for() and
+        # detection_range_for(), inlined: this runs for every hunter every tick)
+        if is_night:
+            self.speed = speed = self.NIGHT_SPEED
+            self.detection_range = self.NIGHT_DETECTION_RANGE
+        else:
+            self.speed = speed = self.DAY_SPEED
+            self.detection_range = self.DAY_DETECTION_RANGE
+        x, y = self.x, self.y
 
         # Check if can see vampire
-        dist_to_vampire = math.sqrt((self.x - vampire_x) ** 2 + (self.y - vampire_y) ** 2)
+        if sees_vampire is None:
+            dist_to_vampire = math.sqrt((x - vampire_x) ** 2 + (y - vampire_y) ** 2)
+            sees_vampire = dist_to_vampire < self.detection_range
 
-        if dist_to_vampire < self.detection_range:
+        if sees_vampire:
             self.chasing = True
             self.target_x = vampire_x
             self.target_y = vampire_y
@@ -233,219 +658,1007 @@ class Enemy:
             if self.patrol_timer > 60:
                 self.patrol_timer = 0
                 # Pick random patrol point
-                self.patrol_target = (random.randint(100, SCREEN_WIDTH - 100),
-                                     random.randint(100, SCREEN_HEIGHT - 100))
+                if patrol_range is None:
+                    self.patrol_target = (self.rng.randint(100, width - 100),
+                                          self.rng.randint(100, height - 100))
+                else:
+                    col, row = int(x), int(y)
+                    reach = patrol_range
+                    self.patrol_target = (
+                        self.rng.randint(max(100, col - reach), min(width - 100, col + reach)),
+                        self.rng.randint(max(100, row - reach), min(height - 100, row + reach)))
             self.target_x, self.target_y = self.patrol_target
 
-        # During day, hunters try to stay out of sunlight
-        if not is_night and self.x < SCREEN_WIDTH // 2 - 50:
-            # If in sunlight zone, move toward right side
-            self.target_x = SCREEN_WIDTH * 0.7
-            self.target_y = self.y
-
-        # Move towards target
-        angle = math.atan2(self.target_y - self.y, self.target_x - self.x)
-        self.x += math.cos(angle) * self.speed
-        self.y += math.sin(angle) * self.speed
+        # One flow field lookup: around obstacles, and out of sunlight by day
+        steer = nav.steer(x, y, self.chasing, is_night) if nav is not None else None
+        if steer is not None:
+            x += steer[0] * speed
+            y += steer[1] * speed
+        else:
+            # Move towards target
+            angle = math.atan2(self.target_y - y, self.target_x - x)
+            x += math.cos(angle) * speed
+            y += math.sin(angle) * speed
 
         # Keep in bounds
-        self.x = max(self.radius, min(SCREEN_WIDTH - self.radius, self.x))
-        self.y = max(self.radius, min(SCREEN_HEIGHT - self.radius, self.y))
+        radius = self.radius
+        self.x = max(radius, min(width - radius, x))
+        self.y = max(radius, min(height - radius, y))
 
     def draw(self, screen):
         """Draw the enemy"""
-        # Color based on health
-        health_ratio = self.health / self.max_health
-        if health_ratio > 0.6:
-            color = (255, 0, 0) if self.chasing else COLOR_ENEMY
-        elif health_ratio > 0.3:
-            color = (255, 150, 0)  # Orange when damaged
+        color = hunter_color(self.health / self.max_health, self.chasing)
+        paint_hunter(screen, (int(self.x), int(self.y)), self.radius, color, self.chasing)
+
+
+def paint_hunter(surface, center, radius, color, chasing):
+    """Hunter body, with the alert ring while chasing"""
+    pygame.draw.circle(surface, color, center, radius)
+    if chasing:
+        pygame.draw.circle(surface, (255, 100, 0), center, radius + 3, 2)
+
+
+class EntityPool:
+    """Free list of retired entities, recycled through their reset() method
+
+    Feeding, kills and every dawn and dusk retire entities and spawn new
+    ones; reusing the objects keeps long sessions from churning memory.
+    """
+
+    def __init__(self, cls):
+        self.cls = cls
+        self.free = []
+
+    def acquire(self, *args):
+        """An entity initialized with `args`, recycled if one is free"""
+        if self.free:
+            entity = self.free.pop()
+            entity.reset(*args)
+            return entity
+        return self.cls(*args)
+
+    def release(self, entity):
+        self.free.append(entity)
+
+    def release_all(self, entities):
+        self.free.extend(entities)
+
+
+def human_sprite(sprites):
+    return sprites.get("human", HUMAN_RADIUS, paint_human, HUMAN_RADIUS)
+
+
+def hunter_sprite(sprites, color, chasing):
+    return sprites.get(("hunter", color, chasing), ENEMY_RADIUS + 3, paint_hunter,
+                       ENEMY_RADIUS, color, chasing)
+
+
+def vampire_sprite(sprites, vampire):
+    return sprites.get(("vampire", vampire.form), vampire.radius + 2, paint_vampire,
+                       vampire.radius, vampire.form)
+
+
+class Simulation:
+    """Display-free game simulation, advanced one tick at a time
+
+    step() runs the tick as a fixed sequence of phases (vampire, humans,
+    enemies, collisions, feeding, clock) so crowd backends can replace the
+    entity phases while keeping the vampire and scoring rules, and a
+    profiler can time each phase.
+
+    All randomness comes from self.rng, which reset() seeds from `seed`, so
+    a seeded simulation replays identically for the same inputs. Each
+    human and hunter draws from an EntityRandom of its own, seeded from
+    self.rng when it spawns.
+
+    Humans and hunters are listed by their spatial indexes (self.humans is
+    human_index.items), removed by swap-remove and recycled through
+    EntityPools. On a playfield bigger than the screen a LodScheduler
+    (self.lod) updates the distant ones less often; with motion="event"
+    humans are LazyHumans, stepped only at their turns and bounces.
+    entity_updates counts the entity updates performed in the latest tick.
+    """
+
+    # Balance knobs (class attributes so balance runs can override them)
+    DAY_DURATION = 1800     # 30 seconds at 60 FPS
+    FEED_BLOOD = 30         # Blood gained per feed
+
+    backend = "objects"     # Setup name used by replays and benchmarks
+
+    # Playfield: the screen, unless a WorldSimulation sets a bigger world
+    width = SCREEN_WIDTH
+    height = SCREEN_HEIGHT
+    sun_width = SUN_ZONE_WIDTH
+    patrol_range = None     # Hunters patrol the whole playfield
+    backdrop = None         # draw(screen, camera, time_of_day) under the entities, if any
+
+    def __init__(self, day_humans=10, day_hunters=3, night_humans=4, night_hunters=6,
+                 index="auto", seed=None, motion="tick"):
+        # Population sizes for each half of the day/night cycle
+        self.day_humans = day_humans
+        self.day_hunters = day_hunters
+        self.night_humans = night_humans
+        self.night_hunters = night_hunters
+        # Range checks go through a spatial index: "grid", "brute" (the
+        # original scan-everything checks, kept as a reference) or "auto",
+        # which picks the grid once a population is big enough to pay off.
+        # Both give identical results.
+        if index not in ("auto", "grid", "brute"):
+            raise ValueError(f"Unknown spatial index: {index}")
+        self.index = index
+        self.seed = seed
+        # Humans are stepped every tick ("tick"), or are LazyHumans in a
+        # TrajectoryIndex that only steps them at turns and bounces
+        # ("event"). Both give identical results; under a LodScheduler,
+        # per-tick humans off screen lag until their next update, so there
+        # the two agree on everything on screen (see vampire_lod).
+        if motion not in ("tick", "event"):
+            raise ValueError(f"Unknown human motion: {motion}")
+        self.motion = motion
+        humans = max(day_humans, night_humans)
+        if motion == "event":
+            self.human_index = TrajectoryIndex(self.new_index(humans, HUMAN_LEG_REACH),
+                                               self.width, self.height)
+            self.human_pool = EntityPool(LazyHuman)
         else:
-            color = (255, 200, 0)  # Yellow when almost dead
-
-        pygame.draw.circle(screen, color, (int(self.x), int(self.y)), self.radius)
-
-        # Draw alert indicator if chasing
-        if self.chasing:
-            pygame.draw.circle(screen, (255, 100, 0), (int(self.x), int(self.y)), self.radius + 3, 2)
+            self.human_index = self.new_index(humans)
+            self.human_pool = EntityPool(Human)
+        self.enemy_index = self.new_index(max(day_hunters, night_hunters))
+        self.enemy_pool = EntityPool(Enemy)
+        self.lod = self.new_scheduler()
+        self.reset()
+        # Shared hunter pathfinding; obstacles are map setup, not game state
+        self.nav = self.new_navigator()
 
+    def new_index(self, population, reach=0):
+        """Empty spatial index for one kind of entity (see SpatialGrid for `reach`)"""
+        if self.index == "grid" or (self.index == "auto" and population >= GRID_MIN_ENTITIES):
+            return SpatialGrid(self.width, self.height, GRID_CELL_SIZE, reach)
+        return BruteForceIndex()
 
-class Game:
-    """Main game class"""
+    def new_navigator(self):
+        """Hunter flow fields over the whole playfield"""
+        return Navigator(NavGrid(self.width, self.height, NAV_CELL_SIZE, self.sun_width))
 
-    def __init__(self):
-        self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-        pygame.display.set_caption("Vampire Survival - Feed or Die")
-        self.clock = pygame.time.Clock()
-        self.font = pygame.font.Font(None, 24)
-        self.big_font = pygame.font.Font(None, 36)
-        self.title_font = pygame.font.Font(None, 60)
-
-        self.game_state = GameState.MENU
-        self.reset()
+    def new_scheduler(self):
+        """LodScheduler for a playfield bigger than the screen, else None"""
+        if self.width <= SCREEN_WIDTH and self.height <= SCREEN_HEIGHT:
+            return None     # Everything is always on screen
+        return LodScheduler(SCREEN_WIDTH, SCREEN_HEIGHT)
 
     def reset(self):
         """Reset game state"""
-        self.vampire = Vampire(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2)
-        # More humans during day
-        self.humans = [Human(random.randint(50, SCREEN_WIDTH - 50),
-                            random.randint(50, SCREEN_HEIGHT - 50)) for _ in range(10)]
-        # 3 hunters during day
-        self.enemies = [Enemy(random.randint(50, SCREEN_WIDTH - 50),
-                             random.randint(50, SCREEN_HEIGHT - 50),
-                             self.vampire.x, self.vampire.y, is_night=False) for _ in range(3)]
+        self.rng = random.Random(self.seed)
+        self.vampire = Vampire(self.width // 2, self.height // 2)
+        self.spawn_day()
 
         self.time_of_day = TimeOfDay.DAY
         self.time_cycle = 0
-        self.day_duration = 1800  # 30 seconds at 60 FPS
+        self.day_duration = self.DAY_DURATION
         self.total_time = 0
+        self.entity_updates = 0
+
+        # Entity positions before the latest tick, for render interpolation
+        self.previous_positions = None
 
         self.game_over = False
+        self.cause_of_death = None  # "sun", "hunger" or "hunters"
         self.score = 0
-
-    def update(self):
-        """Update game state"""
-        if self.game_state == GameState.MENU:
-            return  # Menu doesn't need updates
-
+        self.hunters_killed = 0
+
+    @property
+    def humans(self):
+        return self.human_index.items
+
+    @property
+    def enemies(self):
+        return self.enemy_index.items
+
+    @property
+    def human_count(self):
+        return len(self.humans)
+
+    @property
+    def enemy_count(self):
+        return len(self.enemies)
+
+    def random_human(self):
+        """New human at a random spot away from the walls"""
+        return self.human_pool.acquire(self.rng.randint(50, self.width - 50),
+                                       self.rng.randint(50, self.height - 50),
+                                       EntityRandom.spawn(self.rng))
+
+    def random_enemy(self, is_night):
+        """New hunter at a random spot away from the walls"""
+        return self.enemy_pool.acquire(self.rng.randint(50, self.width - 50),
+                                       self.rng.randint(50, self.height - 50),
+                                       self.vampire.x, self.vampire.y, is_night,
+                                       EntityRandom.spawn(self.rng))
+
+    def spawn_day(self):
+        """Daytime population - many humans, few hunters"""
+        self.human_pool.release_all(self.humans)
+        self.enemy_pool.release_all(self.enemies)
+        self.human_index.rebuild([self.random_human() for _ in range(self.day_humans)])
+        self.enemy_index.rebuild([self.random_enemy(False) for _ in range(self.day_hunters)])
+
+    def spawn_night(self):
+        """Nighttime population - people go inside, more aggressive hunters"""
+        humans = self.humans
+        while len(humans) > self.night_humans:
+            human = humans[-1]
+            self.human_index.remove(human)
+            self.human_pool.release(human)
+        self.enemy_pool.release_all(self.enemies)
+        self.enemy_index.rebuild([self.random_enemy(True) for _ in range(self.night_hunters)])
+
+    def step(self, controls=0):
+        """Advance the simulation one tick using INPUT_* flags"""
         if self.game_over:
             return
 
-        keys = pygame.key.get_pressed()
+        self.entity_updates = 0
+        self.update_vampire(controls)
+        # Past this point only hunters can drain health (feeding only heals)
+        killer = self.vampire.last_damage if self.vampire.health <= 0 else "hunters"
 
-        # Handle bat transformation
-        if keys[pygame.K_e]:
-            self.vampire.activate_bat_form()
+        self.update_humans()
+        self.update_enemies()
+        self.resolve_collisions()
 
-        # Update vampire
-        self.vampire.update(keys, None, self.time_of_day)
-
-        # Update humans
-        for human in self.humans:
-            human.update()
-
-        # Update enemies (more at night, more aggressive)
-        for enemy in self.enemies[:]:
-            is_night = self.time_of_day == TimeOfDay.NIGHT
-            enemy.update(self.vampire.x, self.vampire.y, is_night, self.time_of_day)
-            # Check collision with vampire
-            dist = math.sqrt((enemy.x - self.vampire.x) ** 2 + (enemy.y - self.vampire.y) ** 2)
-            if dist < self.vampire.radius + enemy.radius:
-                # Vampire damages enemy on collision
-                if self.vampire.form == VampireForm.BAT:
-                    enemy.health -= 2  # Bat form does more damage
-                else:
-                    enemy.health -= 0.5  # Human form does less damage
+        # Handle feeding (F key)
+        if controls & INPUT_FEED:
+            self.feed()
 
-                # Enemy damages vampire
-                self.vampire.health -= 0.5
+        # Bat form runs out after the tick's collisions have used it
+        self.vampire.update_bat_form()
 
-                # If enemy is dead, remove and award points
-                if enemy.health <= 0:
-                    self.enemies.remove(enemy)
-                    self.score += 50  # Bonus points for killing hunters
+        self.advance_clock()
 
-        # Handle feeding (F key)
-        if keys[pygame.K_f]:
-            for human in self.humans[:]:
-                dist = math.sqrt((human.x - self.vampire.x) ** 2 + (human.y - self.vampire.y) ** 2)
-                if dist < 40:
-                    self.vampire.feed(30)
-                    self.humans.remove(human)
-                    self.score += 10
-                    # Spawn new human
-                    self.humans.append(Human(random.randint(50, SCREEN_WIDTH - 50),
-                                           random.randint(50, SCREEN_HEIGHT - 50)))
-                    break
-
-        # Update day/night cycle
+        # Check if dead
+        if self.vampire.health <= 0:
+            self.game_over = True
+            self.cause_of_death = killer
+
+    def update_vampire(self, controls):
+        """Bat transformation, movement, sunlight and hunger"""
+        if controls & INPUT_BAT:
+            self.vampire.activate_bat_form()
+        self.vampire.update(controls, self.time_of_day, self.width, self.height, self.sun_width)
+
+    def update_humans(self):
+        """Random-walk every human (just the ones due, with events or a LodScheduler)"""
+        if self.motion == "event":
+            self.entity_updates += self.human_index.advance()
+            return
+        if self.lod is not None:
+            self.entity_updates += self.lod.update_humans(self)
+            return
+        index = self.human_index
+        humans = index.items
+        width, height = self.width, self.height
+        if index.tracks_moves:
+            move = index.move
+            for human in humans:
+                human.update(width, height)
+                move(human)
+        else:
+            for human in humans:
+                human.update(width, height)
+        self.entity_updates += len(humans)
+
+    def update_enemies(self):
+        """Patrol or chase with every hunter (just the ones due, with a LodScheduler)"""
+        vampire = self.vampire
+        index = self.enemy_index
+        is_night = self.time_of_day == TimeOfDay.NIGHT
+        detection_range = Enemy.detection_range_for(is_night)
+        nav = self.nav
+
+        if self.lod is not None:
+            # Hunters within detection range before anyone moves this tick
+            spotted = set(index.query_radius(vampire.x, vampire.y, detection_range))
+            nav.set_goal(vampire.x, vampire.y, is_night)
+            self.entity_updates += self.lod.update_enemies(self, spotted, is_night)
+            return
+
+        # A brute-force scan is no cheaper than each hunter checking its own
+        # distance, and on an open map every hunter heads straight for its
+        # target, so the plain single screen skips both
+        if index.tracks_moves:
+            spotted = set(index.query_radius(vampire.x, vampire.y, detection_range))
+            move = index.move
+        else:
+            spotted = move = None
+        if nav.grid.uniform(not is_night):
+            nav = None
+        else:
+            nav.set_goal(vampire.x, vampire.y, is_night)
+
+        enemies = index.items
+        vampire_x, vampire_y = vampire.x, vampire.y
+        time_of_day = self.time_of_day
+        bounds = (self.width, self.height, self.patrol_range)
+        for enemy in enemies:
+            enemy.update(vampire_x, vampire_y, is_night, time_of_day,
+                         None if spotted is None else enemy in spotted, nav, *bounds)
+            if move is not None:
+                move(enemy)
+        self.entity_updates += len(enemies)
+
+    def resolve_collisions(self):
+        """Ramming damage both ways between the vampire and touching hunters"""
+        # Hunters never react to the damage within a tick, so resolving
+        # hits after all moves is equivalent to checking as each one moves
+        vampire = self.vampire
+        for enemy in self.enemy_index.query_radius(vampire.x, vampire.y,
+                                                   vampire.radius + ENEMY_RADIUS):
+            self.hit_enemy(enemy)
+
+    def hit_enemy(self, enemy):
+        """Apply one tick of collision damage between vampire and hunter"""
+        # Vampire damages enemy on collision
+        if self.vampire.form == VampireForm.BAT:
+            enemy.health -= 2  # Bat form does more damage
+        else:
+            enemy.health -= 0.5  # Human form does less damage
+
+        # Enemy damages vampire
+        self.vampire.health -= 0.5
+
+        # If enemy is dead, remove and award points
+        if enemy.health <= 0:
+            self.enemy_index.remove(enemy)
+            self.enemy_pool.release(enemy)
+            self.score += 50  # Bonus points for killing hunters
+            self.hunters_killed += 1
+
+    def feed(self):
+        """Feed on the first human within reach and spawn a replacement"""
+        # Index results come back in list order, so this is the same human
+        # a front-to-back scan of self.humans would pick
+        for human in self.human_index.query_radius(self.vampire.x, self.vampire.y, FEED_RANGE):
+            self.vampire.feed(self.FEED_BLOOD)
+            self.human_index.remove(human)
+            self.human_pool.release(human)
+            self.score += 10
+            # Spawn new human (likely the same object, recycled)
+            new_human = self.random_human()
+            self.human_index.insert(new_human)
+            if self.previous_positions is not None:
+                # Don't interpolate the replacement from the eaten human
+                self.previous_positions.pop(new_human, None)
+            break
+
+    def advance_clock(self):
+        """Advance the day/night cycle, swapping populations at dusk and dawn"""
         self.time_cycle += 1
         self.total_time += 1
 
         if self.time_cycle > self.day_duration:
             self.time_cycle = 0
+            # New populations have nothing to interpolate from
+            self.previous_positions = None
             # Toggle day/night
             if self.time_of_day == TimeOfDay.DAY:
-                # TRANSITION TO NIGHT
                 self.time_of_day = TimeOfDay.NIGHT
-                # Reduce humans (people go inside)
-                self.humans = self.humans[:4]
-                # Spawn more aggressive enemies at night
-                self.enemies = []
-                for _ in range(6):  # 6 hunters at night
-                    self.enemies.append(Enemy(random.randint(50, SCREEN_WIDTH - 50),
-                                            random.randint(50, SCREEN_HEIGHT - 50),
-                                            self.vampire.x, self.vampire.y, is_night=True))
+                self.spawn_night()
             else:
-                # TRANSITION TO DAY
                 self.time_of_day = TimeOfDay.DAY
-                # Spawn more humans during day
-                self.humans = [Human(random.randint(50, SCREEN_WIDTH - 50),
-                                    random.randint(50, SCREEN_HEIGHT - 50)) for _ in range(10)]
-                # 3 hunters during day
-                self.enemies = [Enemy(random.randint(50, SCREEN_WIDTH - 50),
-                                     random.randint(50, SCREEN_HEIGHT - 50),
-                                     self.vampire.x, self.vampire.y, is_night=False) for _ in range(3)]
+                self.spawn_day()
 
-        # Check if dead
-        if self.vampire.health <= 0:
-            self.game_over = True
+    def save_positions(self):
+        """Remember where everything is before a tick, for interpolation"""
+        # LazyHumans interpolate along their legs instead (LazyHuman.draw_position)
+        positions = {} if self.motion == "event" else {
+            human: (human.x, human.y) for human in self.humans}
+        for enemy in self.enemies:
+            positions[enemy] = (enemy.x, enemy.y)
+        positions[self.vampire] = (self.vampire.x, self.vampire.y)
+        self.previous_positions = positions
+
+    def draw_position(self, entity, alpha):
+        """Integer draw position, `alpha` of the way from the previous tick"""
+        x, y = entity.x, entity.y
+        if alpha < 1.0 and self.previous_positions is not None:
+            previous = self.previous_positions.get(entity)
+            if previous is not None:
+                x = previous[0] + (x - previous[0]) * alpha
+                y = previous[1] + (y - previous[1]) * alpha
+        return int(x), int(y)
+
+    def camera(self, alpha=1.0):
+        """World position of the screen's top-left corner (the screen is the world)"""
+        return 0, 0
+
+    def visible_entities(self, left, top):
+        """(humans, hunters) that may be on screen with the camera at (left, top)"""
+        return self.humans, self.enemies
+
+    def draw_entities(self, screen, sprites=None, alpha=1.0, camera=(0, 0)):
+        """Draw humans, hunters and the vampire onto a surface
+
+        With a SpriteCache everything goes out as one Surface.blits() call;
+        without one each entity is painted with pygame.draw. `alpha` below
+        1.0 interpolates positions between the previous and current tick.
+        `camera` is the world position drawn at the surface's top-left.
+        """
+        position = self.draw_position
+        human_position = LazyHuman.draw_position if self.motion == "event" else position
+        vampire = self.vampire
+        left, top = camera
+        humans, enemies = self.visible_entities(left, top)
+
+        if sprites is None:
+            for human in humans:
+                x, y = human_position(human, alpha)
+                paint_human(screen, (x - left, y - top), human.radius)
+            for enemy in enemies:
+                color = hunter_color(enemy.health / enemy.max_health, enemy.chasing)
+                x, y = position(enemy, alpha)
+                paint_hunter(screen, (x - left, y - top), enemy.radius, color, enemy.chasing)
+            x, y = position(vampire, alpha)
+            paint_vampire(screen, (x - left, y - top), vampire.radius, vampire.form)
+            return
+
+        surface, offset = human_sprite(sprites)
+        batch = []
+        for human in humans:
+            x, y = human_position(human, alpha)
+            batch.append((surface, (x - left + offset, y - top + offset)))
+
+        for enemy in enemies:
+            color = hunter_color(enemy.health / enemy.max_health, enemy.chasing)
+            surface, offset = hunter_sprite(sprites, color, enemy.chasing)
+            x, y = position(enemy, alpha)
+            batch.append((surface, (x - left + offset, y - top + offset)))
+
+        surface, offset = vampire_sprite(sprites, vampire)
+        x, y = position(vampire, alpha)
+        batch.append((surface, (x - left + offset, y - top + offset)))
+
+        screen.blits(batch, False)
+
+    def render_entities(self):
+        """Visible humans and hunters as plain tuples, for drawing on another thread
+
+        Humans are (x0, y0, x1, y1): draw positions at the start and the end
+        of the latest tick. Hunters add their color and chase state.
+        """
+        position = self.draw_position
+        human_position = LazyHuman.draw_position if self.motion == "event" else position
+        humans, enemies = self.visible_entities(*self.camera())
+        return ([human_position(human, 0.0) + human_position(human, 1.0) for human in humans],
+                [position(enemy, 0.0) + position(enemy, 1.0)
+                 + (hunter_color(enemy.health / enemy.max_health, enemy.chasing), enemy.chasing)
+                 for enemy in enemies])
+
+    def entity_columns(self):
+        """Human x, y and hunter x, y, health, chasing, one sequence each (for telemetry)"""
+        humans, enemies = self.humans, self.enemies
+        if self.motion == "event":
+            # LazyHuman.x/y inlined against the index clock: same floats, no property calls
+            now = self.human_index.now
+            human_x = [h.leg_x + h.step_x * (now - h.leg_start) for h in humans]
+            human_y = [h.leg_y + h.step_y * (now - h.leg_start) for h in humans]
+        else:
+            human_x = [human.x for human in humans]
+            human_y = [human.y for human in humans]
+        return (human_x, human_y,
+                [enemy.x for enemy in enemies], [enemy.y for enemy in enemies],
+                [enemy.health for enemy in enemies], [enemy.chasing for enemy in enemies])
+
+    def close(self):
+        """Release what the simulation holds outside this process (see vampire_shard)"""
+
+    def fast_forward(self, ticks, policy=None, controls=0):
+        """Step up to `ticks` ticks as fast as possible, stopping at game over
+
+        `policy` is an optional callable(sim) returning the INPUT_* flags for
+        each tick; otherwise `controls` is held for every tick. Returns the
+        number of ticks actually simulated.
+        """
+        step = self.step
+        for tick in range(ticks):
+            if self.game_over:
+                return tick
+            step(policy(self) if policy else controls)
+        return ticks
+
+    def snapshot(self):
+        """Entire game state as a compact binary blob (see SNAPSHOT_HEADER)
+
+        Holds everything the next tick depends on - clock, score, vampire,
+        every entity and the RNG - so restore() continues bit-identically.
+        Population sizes and the index choice are setup, not state: restore
+        into a simulation built with the same arguments.
+        """
+        vampire = self.vampire
+        header = SNAPSHOT_HEADER.pack(
+            SNAPSHOT_MAGIC, SNAPSHOT_VERSION,
+            self.time_of_day.value, self.time_cycle, self.day_duration, self.total_time,
+            self.score, self.hunters_killed, self.game_over,
+            DAMAGE_CAUSES.index(self.cause_of_death),
+            vampire.x, vampire.y, vampire.blood, vampire.energy, vampire.health,
+            vampire.bat_duration, vampire.form.value, DAMAGE_CAUSES.index(vampire.last_damage),
+            self.human_count, self.enemy_count)
+        _, words, gauss = self.rng.getstate()
+        rng = SNAPSHOT_RNG.pack(*words, gauss is not None, gauss or 0.0)
+        return b"".join([header, rng, *self.pack_entities()])
+
+    def pack_entities(self):
+        """Entity section of a snapshot, as a list of byte strings"""
+        humans = array("d", [v for h in self.humans for v in (h.leg_x, h.leg_y, h.direction)])
+        human_timers = array("i", [v for h in self.humans
+                                   for v in (h.change_direction_timer, h.leg_ticks)])
+        enemies = array("d", [v for e in self.enemies for v in (
+            e.x, e.y, e.target_x, e.target_y, *e.patrol_target,
+            e.speed, e.detection_range, e.health)])
+        enemy_timers = array("i", [e.patrol_timer for e in self.enemies])
+        enemy_flags = bytes([e.chasing | e.is_night << 1 for e in self.enemies])
+        streams = array("q", [e.rng.state for e in (*self.humans, *self.enemies)])
+        parts = [humans.tobytes(), human_timers.tobytes(), enemies.tobytes(),
+                 enemy_timers.tobytes(), enemy_flags, streams.tobytes()]
+        if self.lod is not None:
+            # Update schedules: (next tick due, ticks it covers) per scheduled entity
+            parts.append(array("i", [v for e in self.scheduled_entities()
+                                     for v in (e.lod_due, e.lod_ticks)]).tobytes())
+        return parts
+
+    def scheduled_entities(self):
+        """Entities the LodScheduler updates (humans on trajectories need none)"""
+        if self.motion == "event":
+            return self.enemies
+        return (*self.humans, *self.enemies)
+
+    def restore(self, blob):
+        """Put the simulation back into the state of a snapshot() blob"""
+        view = memoryview(blob)
+        (magic, version, time_of_day, self.time_cycle, self.day_duration, self.total_time,
+         self.score, self.hunters_killed, game_over, cause,
+         x, y, blood, energy, health, bat_duration, form, last_damage,
+         human_count, enemy_count) = SNAPSHOT_HEADER.unpack_from(view)
+        if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+            raise ValueError("Not a Vampire Survival snapshot (or an unsupported version)")
+
+        self.time_of_day = TimeOfDay(time_of_day)
+        self.game_over = bool(game_over)
+        self.cause_of_death = DAMAGE_CAUSES[cause]
+
+        vampire = self.vampire
+        vampire.x, vampire.y = x, y
+        vampire.blood, vampire.energy, vampire.health = blood, energy, health
+        vampire.bat_duration = bat_duration
+        vampire.form = VampireForm(form)
+        vampire.last_damage = DAMAGE_CAUSES[last_damage]
+
+        offset = SNAPSHOT_HEADER.size
+        *words, has_gauss, gauss = SNAPSHOT_RNG.unpack_from(view, offset)
+        self.rng.setstate((3, tuple(words), gauss if has_gauss else None))
+
+        self.unpack_entities(view, offset + SNAPSHOT_RNG.size, human_count, enemy_count)
+        # Positions from before the snapshot belong to other entities
+        self.previous_positions = None
+
+    def unpack_entities(self, view, offset, human_count, enemy_count):
+        """Rebuild entities (and their spatial indexes) from a snapshot section
+
+        Returns the offset just past the section.
+        """
+        def take(typecode, count):
+            nonlocal offset
+            values = array(typecode)
+            end = offset + count * values.itemsize
+            values.frombytes(view[offset:end])
+            offset = end
+            return values
+
+        humans = take("d", 3 * human_count)
+        human_timers = take("i", 2 * human_count)
+        enemies = take("d", 9 * enemy_count)
+        enemy_timers = take("i", enemy_count)
+        enemy_flags = take("B", enemy_count)
+        streams = take("q", human_count + enemy_count)
+        scheduled = enemy_count + (human_count if self.motion == "tick" else 0)
+        schedules = take("i", 2 * scheduled) if self.lod is not None else None
+
+        self.human_pool.release_all(self.humans)
+        restored = []
+        for i in range(human_count):
+            leg_x, leg_y, direction = humans[3 * i:3 * i + 3]
+            human = self.human_pool.acquire(leg_x, leg_y, EntityRandom(streams[i]), direction)
+            human.resume(*human_timers[2 * i:2 * i + 2])
+            restored.append(human)
+        self.human_index.rebuild(restored)
+
+        self.enemy_pool.release_all(self.enemies)
+        restored = []
+        for i, (timer, flags) in enumerate(zip(enemy_timers, enemy_flags)):
+            x, y, target_x, target_y, patrol_x, patrol_y, speed, detection_range, health = \
+                enemies[9 * i:9 * i + 9]
+            enemy = self.enemy_pool.acquire(x, y, target_x, target_y, bool(flags & 2),
+                                            EntityRandom(streams[human_count + i]))
+            enemy.chasing = bool(flags & 1)
+            enemy.patrol_timer = timer
+            enemy.patrol_target = (patrol_x, patrol_y)
+            enemy.speed = speed
+            enemy.detection_range = detection_range
+            enemy.health = health
+            restored.append(enemy)
+        self.enemy_index.rebuild(restored)
+
+        if schedules is not None:
+            for i, entity in enumerate(self.scheduled_entities()):
+                entity.lod_due, entity.lod_ticks = schedules[2 * i:2 * i + 2]
+        return offset
+
+
+class SnapshotRing:
+    """Fixed-capacity history of (tick, snapshot) pairs, oldest dropped first
+
+    Memory is bounded by `capacity` snapshots. Dumps are a simple stream:
+    b"VSRING", a uint32 count, then per entry a uint32 tick, a uint32
+    length and the snapshot bytes.
+    """
+
+    MAGIC = b"VSRING"
+    ENTRY = struct.Struct("<II")    # tick, snapshot length
+
+    def __init__(self, capacity):
+        if capacity < 1:
+            raise ValueError("SnapshotRing needs room for at least one snapshot")
+        self.capacity = capacity
+        self.clear()
+
+    def __len__(self):
+        return self.count
+
+    def clear(self):
+        self.entries = [None] * self.capacity
+        self.head = 0       # Slot the next push goes into
+        self.count = 0
+
+    def push(self, tick, snapshot):
+        """Add the newest snapshot, overwriting the oldest when full"""
+        self.entries[self.head] = (tick, snapshot)
+        self.head = (self.head + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def pop(self):
+        """Remove and return the newest (tick, snapshot), or None if empty"""
+        if not self.count:
+            return None
+        self.head = (self.head - 1) % self.capacity
+        self.count -= 1
+        entry, self.entries[self.head] = self.entries[self.head], None
+        return entry
+
+    def latest(self):
+        return self.entries[(self.head - 1) % self.capacity] if self.count else None
+
+    def __iter__(self):
+        """Entries from oldest to newest"""
+        start = self.head - self.count
+        for i in range(start, self.head):
+            yield self.entries[i % self.capacity]
+
+    @property
+    def nbytes(self):
+        return sum(len(snapshot) for _, snapshot in self)
+
+    def dump(self, path):
+        """Write every entry to a file, oldest first"""
+        with open(path, "wb") as f:
+            f.write(self.MAGIC + struct.pack("<I", self.count))
+            for tick, snapshot in self:
+                f.write(self.ENTRY.pack(tick, len(snapshot)))
+                f.write(snapshot)
+
+    @classmethod
+    def load(cls, path):
+        """Ring holding the entries of a dump() file"""
+        with open(path, "rb") as f:
+            if f.read(len(cls.MAGIC)) != cls.MAGIC:
+                raise ValueError(f"{path} is not a snapshot dump")
+            (count,) = struct.unpack("<I", f.read(4))
+            ring = cls(max(1, count))
+            for _ in range(count):
+                tick, length = cls.ENTRY.unpack(f.read(cls.ENTRY.size))
+                ring.push(tick, f.read(length))
+        return ring
+
+
+def read_controls(keys):
+    """Map pygame key state to INPUT_* flags"""
+    controls = 0
+    if keys[pygame.K_w]:
+        controls |= INPUT_UP
+    if keys[pygame.K_s]:
+        controls |= INPUT_DOWN
+    if keys[pygame.K_a]:
+        controls |= INPUT_LEFT
+    if keys[pygame.K_d]:
+        controls |= INPUT_RIGHT
+    if keys[pygame.K_e]:
+        controls |= INPUT_BAT
+    if keys[pygame.K_f]:
+        controls |= INPUT_FEED
+    return controls
+
+
+class Game:
+    """Main game class - renders a Simulation and feeds it keyboard input
+
+    `controls` replaces the keyboard with a callable(sim) returning INPUT_*
+    flags each tick, e.g. a bot policy or a recorded replay.
+
+    The last `rewind_seconds` of play are kept as snapshots: holding R
+    steps back through them, and if the game crashes they are dumped to
+    CRASH_DUMP_PATH (load with SnapshotRing.load, then Simulation.restore).
+
+    F3 toggles the frame profiler (see vampire_profile). With
+    `profile_path` it starts on and its trace is written there on exit.
+
+    With `telemetry_path`, the state after every tick is recorded there
+    (see vampire_telemetry; needs numpy). That slows ticks down by 20% or
+    more, so it is off unless asked for.
+
+    With `dirty_rects`, frames in play only repaint and push the rects
+    that entities, HUD lines and the profiler overlay covered in the last
+    frame or cover now (see DirtyScreen). The menu, game over, a day/night
+    change, a scrolling camera, a world backdrop or too many entities fall
+    back to a full redraw.
+    """
+
+    def __init__(self, sim=None, render_fps=RENDER_FPS, controls=None,
+                 rewind_seconds=REWIND_SECONDS, profile_path=None, telemetry_path=None,
+                 dirty_rects=False):
+        # Display (which also brings up events and the keyboard) is the only
+        # subsystem needed before the first frame; fonts load on first use
+        pygame.display.init()
+        self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+        pygame.display.set_caption("Vampire Survival - Feed or Die")
+        self.clock = pygame.time.Clock()
+        self.render_fps = render_fps
+        self.controls = controls
+        self.fonts = {}
+
+        # Cached text and static layers; HUD lines keep (values, surface)
+        # and are re-rendered only when a displayed value changes
+        self.cache = RenderCache()
+        self.hud_labels = {}
+        self.sprites = SpriteCache()
+        self.dirty = DirtyScreen(self.screen) if dirty_rects else None
+
+        self.sim = sim if sim is not None else Simulation()
+        self.game_state = GameState.MENU
+        self.history = SnapshotRing(rewind_seconds * FPS) if rewind_seconds else None
+
+        # Created on first use; while off, no phase is instrumented
+        self.profiler = None
+        self.profiling = False
+        self.profile_path = profile_path
+        if profile_path:
+            self.toggle_profiler()
+
+        self.telemetry = None
+        if telemetry_path:
+            from vampire_telemetry import TelemetryWriter
+            self.telemetry = TelemetryWriter(telemetry_path, self.sim)
+
+    def load_font(self, size):
+        """Default font at `size`, loaded (and the font module started) once"""
+        font = self.fonts.get(size)
+        if font is None:
+            if not pygame.font.get_init():
+                pygame.font.init()
+            font = self.fonts[size] = pygame.font.Font(None, size)
+        return font
+
+    @property
+    def font(self):
+        return self.load_font(24)
+
+    @property
+    def big_font(self):
+        return self.load_font(36)
+
+    @property
+    def title_font(self):
+        return self.load_font(60)
+
+    def reset(self):
+        """Reset game state"""
+        self.sim.reset()
+        if self.history is not None:
+            self.history.clear()
+
+    def update(self):
+        """Step the simulation with the current keyboard state"""
+        if self.game_state == GameState.MENU:
+            return  # Menu screen doesn't need updates
+
+        # Scripted controls without rewind never look at the keyboard
+        keys = None
+        if self.history is not None or self.controls is None:
+            keys = pygame.key.get_pressed()
+        if self.history is not None and keys[pygame.K_r]:
+            self.rewind()
+            return
+
+        if self.game_state != GameState.PLAYING:
+            return  # Game over screen waits for a restart or rewind
+
+        if self.controls is not None:
+            controls = self.controls(self.sim)
+        else:
+            controls = read_controls(keys)
+
+        if self.history is not None:
+            self.history.push(self.sim.total_time, self.sim.snapshot())
+        self.sim.save_positions()
+        self.sim.step(controls)
+        if self.telemetry is not None:
+            self.telemetry.record(self.sim)
+
+        if self.sim.game_over:
             self.game_state = GameState.GAME_OVER
 
-    def draw(self):
-        """Draw everything"""
+    def rewind(self):
+        """Go back one tick in the history (no-op once it runs out)"""
+        entry = self.history.pop()
+        if entry is not None:
+            self.sim.restore(entry[1])
+            self.game_state = GameState.PLAYING
+
+    def toggle_profiler(self):
+        """Start or stop timing frame phases (and showing the overlay)"""
+        if self.profiler is None:
+            from vampire_profile import FrameProfiler
+            self.profiler = FrameProfiler()
+        if self.profiling:
+            self.profiler.detach()
+        else:
+            self.profiler.attach(self)
+        self.profiling = not self.profiling
+
+    def dump_history(self, path=CRASH_DUMP_PATH):
+        """Write the rewind history to a file, e.g. after a crash"""
+        if self.history is not None and len(self.history):
+            self.history.dump(path)
+            print(f"Dumped the last {len(self.history)} ticks to {path}", file=sys.stderr)
+
+    def close(self):
+        """Write out the profile and telemetry and shut pygame down"""
+        if self.profile_path and self.profiler is not None:
+            self.profiler.dump(self.profile_path)
+        if self.telemetry is not None:
+            self.telemetry.close()
+        self.sim.close()
+        pygame.quit()
+
+    def draw(self, alpha=1.0, view=None, state=None):
+        """Draw everything, entities `alpha` of the way into the latest tick
+
+        `view` is what gets drawn: the simulation, or a RenderFrame of it
+        captured in game `state` (see vampire_pipeline).
+        """
+        view = self.sim if view is None else view
+        state = self.game_state if state is None else state
+
         # Draw menu screen
-        if self.game_state == GameState.MENU:
+        if state == GameState.MENU:
+            if self.dirty is not None:
+                self.dirty.invalidate()
             self.draw_menu()
+            if self.profiling:
+                self.profiler.draw_overlay(self.screen)
             pygame.display.flip()
             return
 
-        # Background color based on time of day
-        if self.time_of_day == TimeOfDay.DAY:
-            self.screen.fill(COLOR_BG_DAY)
-            # Draw sunlight danger zone on left HALF of screen
-            sun_overlay = pygame.Surface((SCREEN_WIDTH // 2, SCREEN_HEIGHT))
-            sun_overlay.set_alpha(80)
-            sun_overlay.fill((255, 255, 100))
-            self.screen.blit(sun_overlay, (0, 0))
+        camera = view.camera(alpha)
+
+        # Dirty rects only while playing over a fixed background
+        dirty = self.dirty
+        if dirty is not None:
+            key = (view.time_of_day, camera)
+            if state != GameState.PLAYING or view.backdrop is not None:
+                dirty.invalidate()
+                dirty = None
+            elif dirty.current(key):
+                self.draw_dirty(view, alpha, camera)
+                return
+
+        # Background based on time of day (day includes the sun zone)
+        if view.time_of_day == TimeOfDay.DAY:
+            self.draw_day_background(view.sun_width - camera[0])
         else:
             self.screen.fill(COLOR_BG_NIGHT)
 
         # Draw time indicator
-        time_text = f"{'DAY' if self.time_of_day == TimeOfDay.DAY else 'NIGHT'}"
-        time_color = (255, 200, 0) if self.time_of_day == TimeOfDay.DAY else (100, 150, 255)
-        time_label = self.big_font.render(time_text, True, time_color)
+        time_text = f"{'DAY' if view.time_of_day == TimeOfDay.DAY else 'NIGHT'}"
+        time_color = (255, 200, 0) if view.time_of_day == TimeOfDay.DAY else (100, 150, 255)
+        time_label = self.cache.text(self.big_font, time_text, time_color)
         self.screen.blit(time_label, (SCREEN_WIDTH - 150, 20))
 
-        # Draw all entities
-        for human in self.humans:
-            human.draw(self.screen)
-
-        for enemy in self.enemies:
-            enemy.draw(self.screen)
-
-        self.vampire.draw(self.screen)
+        # Draw all entities (noting where, for the next frame in dirty-rect mode)
+        if dirty is not None:
+            dirty.start(key)
+        view.draw_entities(self.screen if dirty is None else dirty, self.sprites, alpha, camera)
 
         # Draw HUD
-        self.draw_hud()
+        hud = self.draw_hud(view)
 
         # Draw game over screen
-        if self.game_over:
-            self.draw_game_over()
+        if state == GameState.GAME_OVER:
+            self.draw_game_over(view)
+
+        if self.profiling:
+            overlay = self.profiler.draw_overlay(self.screen)
+            if dirty is not None:
+                dirty.rects.append(overlay)
+        if dirty is not None:
+            dirty.hud = hud
 
         pygame.display.flip()
 
+    def draw_dirty(self, view, alpha, camera):
+        """Repaint only what changed since the last frame over the saved background"""
+        dirty = self.dirty
+        hud = self.hud_elements(view)
+        dirty.erase(hud)
+        view.draw_entities(dirty, self.sprites, alpha, camera)
+        self.screen.blits(hud, False)
+        if self.profiling:
+            dirty.rects.append(self.profiler.draw_overlay(self.screen))
+        pygame.display.update(dirty.updates())
+
+    def draw_day_background(self, sun_right):
+        """Day sky with the sunlight zone ending at screen x `sun_right`"""
+        if sun_right == SUN_ZONE_WIDTH:
+            self.screen.blit(self.cache.layer("day_background", self.build_day_background), (0, 0))
+            return
+        # Scrolled: the sun edge moves, so compose the sky every frame
+        self.screen.fill(COLOR_BG_DAY)
+        if sun_right > 0:
+            self.screen.blit(self.cache.layer("sun_overlay", self.build_sun_overlay), (0, 0),
+                             (0, 0, min(sun_right, SCREEN_WIDTH), SCREEN_HEIGHT))
+
+    def build_day_background(self):
+        """Day sky with the sunlight danger zone on the left HALF of screen"""
+        background = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT)).convert()
+        background.fill(COLOR_BG_DAY)
+        background.blit(self.build_sun_overlay(), (0, 0), (0, 0, SUN_ZONE_WIDTH, SCREEN_HEIGHT))
+        return background
+
+    def build_sun_overlay(self):
+        sun_overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+        sun_overlay.set_alpha(80)
+        sun_overlay.fill((255, 255, 100))
+        return sun_overlay
+
     def draw_menu(self):
-        """Draw the how-to-play menu"""
-        self.screen.fill((20, 20, 40))  # Dark background
+        """Draw the how-to-play menu, filling it in over the first frames"""
+        page = self.cache.layer_in_steps("menu", self.build_menu, MENU_BUILD_BUDGET)
+        self.screen.blit(page, (0, 0))
+
+    def build_menu(self):
+        """Render the static how-to-play page, yielding it after each piece
+
+        The first piece is just the background and title, so the window
+        shows something right away on slow machines.
+        """
+        page = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT)).convert()
+        page.fill((20, 20, 40))  # Dark background
 
         # Title
         title = self.title_font.render("VAMPIRE SURVIVAL", True, (255, 0, 0))
-        self.screen.blit(title, (SCREEN_WIDTH // 2 - 300, 30))
+        page.blit(title, (SCREEN_WIDTH // 2 - 300, 30))
+        yield page
 
         # Subtitle
         subtitle = self.big_font.render("How to Play", True, (200, 100, 100))
-        self.screen.blit(subtitle, (SCREEN_WIDTH // 2 - 100, 100))
+        page.blit(subtitle, (SCREEN_WIDTH // 2 - 100, 100))
 
         # Game instructions
         y_pos = 160
@@ -457,6 +1670,7 @@ class Game:
             "  W/A/D/S     - Move (W=up, A=left, D=right, S=down)",
             "  E           - Switch to a bat (costs blood and energy)",
             "  F           - Feed on nearby human to restore blood",
+            "  R           - Hold to rewind time",
             "  ESC         - Quit game",
             "",
             "GAMEPLAY:",
@@ -497,99 +1711,185 @@ class Game:
                     color = (255, 255, 255)
 
                 label = self.font.render(line, True, color)
-                self.screen.blit(label, (30, y_pos))
+                page.blit(label, (30, y_pos))
                 y_pos += line_height
+                yield page
 
         # Start instruction
         start_text = self.big_font.render("Press SPACE to Start", True, (0, 255, 0))
-        self.screen.blit(start_text, (SCREEN_WIDTH // 2 - 180, SCREEN_HEIGHT - 50))
+        page.blit(start_text, (SCREEN_WIDTH // 2 - 180, SCREEN_HEIGHT - 50))
+        yield page
 
-    def draw_hud(self):
-        """Draw heads-up display"""
+    def draw_hud(self, sim):
+        """Draw heads-up display for a simulation (or a RenderFrame of one)
+
+        Returns what was drawn, as hud_elements() does.
+        """
+        hud = self.hud_elements(sim)
+        self.screen.blits(hud, False)
+        return hud
+
+    def hud_elements(self, sim):
+        """(surface, position) of every HUD element; surfaces are reused while unchanged"""
         # Position HUD on RIGHT side to avoid yellow sunlight overlay
         hud_x = SCREEN_WIDTH - 250
         hud_y = 10
 
         # Color based on danger level
-        blood_color = (255, 0, 0) if self.vampire.blood < 30 else (100, 255, 100)
-        health_color = (255, 0, 0) if self.vampire.health < 30 else (100, 255, 100)
-        energy_color = (255, 200, 0) if self.vampire.energy < 30 else (100, 255, 100)
+        blood_color = (255, 0, 0) if sim.vampire.blood < 30 else (100, 255, 100)
+        health_color = (255, 0, 0) if sim.vampire.health < 30 else (100, 255, 100)
+        energy_color = (255, 200, 0) if sim.vampire.energy < 30 else (100, 255, 100)
 
+        # (template, integer values, color) - text only changes with the values
         hud_data = [
-            (f"Blood: {int(self.vampire.blood)}/{int(self.vampire.max_blood)}", blood_color),
-            (f"Energy: {int(self.vampire.energy)}/{int(self.vampire.max_energy)}", energy_color),
-            (f"Health: {int(self.vampire.health)}/{int(self.vampire.max_health)}", health_color),
-            (f"Score: {self.score}", COLOR_TEXT),
-            (f"Humans: {len(self.humans)}", COLOR_TEXT),
-            (f"Enemies: {len(self.enemies)}", (255, 100, 100) if len(self.enemies) > 4 else COLOR_TEXT),
-            (f"Time: {self.total_time // 60}s", COLOR_TEXT),
+            ("Blood: {}/{}", (int(sim.vampire.blood), int(sim.vampire.max_blood)), blood_color),
+            ("Energy: {}/{}", (int(sim.vampire.energy), int(sim.vampire.max_energy)), energy_color),
+            ("Health: {}/{}", (int(sim.vampire.health), int(sim.vampire.max_health)), health_color),
+            ("Score: {}", (sim.score,), COLOR_TEXT),
+            ("Humans: {}", (sim.human_count,), COLOR_TEXT),
+            ("Enemies: {}", (sim.enemy_count,), (255, 100, 100) if sim.enemy_count > 4 else COLOR_TEXT),
+            ("Time: {}s", (sim.total_time // 60,), COLOR_TEXT),
         ]
 
-        for i, (text, color) in enumerate(hud_data):
-            label = self.font.render(text, True, color)
-            self.screen.blit(label, (hud_x, hud_y + i * 25))
+        hud = []
+        for i, (template, values, color) in enumerate(hud_data):
+            key = (values, color)
+            cached = self.hud_labels.get(i)
+            if cached is None or cached[0] != key:
+                cached = self.hud_labels[i] = (key, self.font.render(template.format(*values), True, color))
+            hud.append((cached[1], (hud_x, hud_y + i * 25)))
+
+        # Controls hint at bottom left
+        hud.append((self.cache.layer("controls_hint", self.build_controls_hint),
+                    (10, SCREEN_HEIGHT - 30)))
+        return hud
 
-        # Draw controls hint at bottom left
-        controls = "W/A/D/S-Move  E-Bat  F-Feed  ESC-Quit"
-        label = self.font.render(controls, True, (200, 200, 200))
-        self.screen.blit(label, (10, SCREEN_HEIGHT - 30))
+    def build_controls_hint(self):
+        controls = "W/A/D/S-Move  E-Bat  F-Feed  R-Rewind  ESC-Quit"
+        return self.font.render(controls, True, (200, 200, 200))
 
-    def draw_game_over(self):
+    def draw_game_over(self, sim):
         """Draw game over screen"""
+
         # Semi-transparent overlay
-        overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
-        overlay.set_alpha(200)
-        overlay.fill((0, 0, 0))
-        self.screen.blit(overlay, (0, 0))
+        self.screen.blit(self.cache.layer("game_over_overlay", self.build_game_over_overlay), (0, 0))
 
         # Game over text
-        game_over_text = self.big_font.render("VAMPIRE DEFEATED", True, (255, 0, 0))
-        score_text = self.font.render(f"Final Score: {self.score}", True, COLOR_TEXT)
-        time_text = self.font.render(f"Survived: {self.total_time // 60} seconds", True, COLOR_TEXT)
-        restart_text = self.font.render("Press SPACE to restart or ESC to quit", True, COLOR_TEXT)
+        text = self.cache.text
+        game_over_text = text(self.big_font, "VAMPIRE DEFEATED", (255, 0, 0))
+        score_text = text(self.font, f"Final Score: {sim.score}", COLOR_TEXT)
+        time_text = text(self.font, f"Survived: {sim.total_time // 60} seconds", COLOR_TEXT)
+        restart_text = text(self.font, "Press SPACE to restart or ESC to quit", COLOR_TEXT)
 
         self.screen.blit(game_over_text, (SCREEN_WIDTH // 2 - 200, SCREEN_HEIGHT // 2 - 80))
         self.screen.blit(score_text, (SCREEN_WIDTH // 2 - 100, SCREEN_HEIGHT // 2))
         self.screen.blit(time_text, (SCREEN_WIDTH // 2 - 120, SCREEN_HEIGHT // 2 + 40))
         self.screen.blit(restart_text, (SCREEN_WIDTH // 2 - 200, SCREEN_HEIGHT // 2 + 100))
 
+    def build_game_over_overlay(self):
+        overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT)).convert()
+        overlay.set_alpha(200)
+        overlay.fill((0, 0, 0))
+        return overlay
+
     def handle_events(self):
         """Handle input events"""
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 return False
 
+            # The window was uncovered or resized: its contents may be gone
+            if event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED) and self.dirty is not None:
+                self.dirty.invalidate()
+
             if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_ESCAPE:
                     return False
 
+                if event.key == pygame.K_F3:
+                    self.toggle_profiler()
+
                 # Start game from menu
                 if event.key == pygame.K_SPACE and self.game_state == GameState.MENU:
                     self.game_state = GameState.PLAYING
                     self.reset()
 
                 # Restart after game over
-                if event.key == pygame.K_SPACE and self.game_over:
+                if event.key == pygame.K_SPACE and self.game_state == GameState.GAME_OVER:
                     self.game_state = GameState.PLAYING
                     self.reset()
 
         return True
 
     def run(self):
-        """Main game loop"""
+        """Main game loop - fixed-rate simulation, free-running rendering
+
+        Real time is accumulated and spent in whole FPS-rate ticks, so game
+        speed doesn't depend on how fast frames render. Each frame draws the
+        world interpolated by the leftover fraction of a tick. If more than
+        MAX_CATCH_UP_TICKS are owed (a stall, a slow machine), the backlog
+        is dropped and the game slows down instead of spiraling.
+        """
+        tick_seconds = 1.0 / FPS
+        accumulator = 0.0
+        last_time = time.perf_counter()
         running = True
 
-        while running:
-            running = self.handle_events()
+        try:
+            while running:
+                running = self.handle_events()
 
-            self.update()
-            self.draw()
+                now = time.perf_counter()
+                accumulator += now - last_time
+                last_time = now
 
-            self.clock.tick(FPS)
+                ticks = 0
+                while accumulator >= tick_seconds and ticks < MAX_CATCH_UP_TICKS:
+                    self.update()
+                    accumulator -= tick_seconds
+                    ticks += 1
+                if accumulator >= tick_seconds:
+                    accumulator = 0.0
 
-        pygame.quit()
+                self.draw(accumulator / tick_seconds)
+
+                self.clock.tick(self.render_fps)
+
+                if self.profiling:
+                    sim = self.sim
+                    self.profiler.end_frame(ticks, sim.human_count, sim.enemy_count,
+                                            sim.entity_updates)
+        except Exception:
+            self.dump_history()
+            raise
+        finally:
+            self.close()
 
 
 if __name__ == "__main__":
-    game = Game()
+    parser = argparse.ArgumentParser(description="Vampire Survival - Feed or Die")
+    parser.add_argument("--profile", metavar="PATH",
+                        help="profile every frame and write the trace (.csv or .json) on exit")
+    parser.add_argument("--world", action="store_true",
+                        help="play in a large scrolling world instead of a single screen")
+    parser.add_argument("--telemetry", metavar="PATH",
+                        help="record every tick's full state to a trace (see vampire_telemetry)."
+                             " Costs about 20%% of tick time with 10k entities and over 50%% at"
+                             " the default population")
+    parser.add_argument("--shards", type=int, metavar="N",
+                        help="experimental: step the crowd in N worker processes. Runs don't"
+                             " match the crowd backend (each worker has its own random stream)"
+                             " and scaling with cores is unmeasured (see vampire_shard)")
+    parser.add_argument("--dirty-rects", action="store_true",
+                        help="repaint and push only the screen areas that changed")
+    args = parser.parse_args()
+    sim = None
+    if args.world:
+        from vampire_world import WorldSimulation
+        sim = WorldSimulation()
+    elif args.shards:
+        from vampire_shard import ShardedSimulation
+        sim = ShardedSimulation(shards=args.shards)
+    game = Game(sim, profile_path=args.profile, telemetry_path=args.telemetry,
+                dirty_rects=args.dirty_rects)
     game.run()
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Vampire Survival - level-of-detail tick scheduling
+
+On a playfield bigger than the screen most humans and hunters are far from
+anything the player can see or touch. LodScheduler updates each of them at
+a rate picked from its "gap": how far it is outside the camera's view or,
+for a hunter, beyond the range at which it would spot the vampire. Hunters
+that are chasing, and everything within LOD_BANDS[0] of relevance, update
+every tick exactly as before; the rest update every 2nd, 4th or 8th tick
+and move that many ticks' worth at once.
+
+The bands are wide enough that nothing on a reduced rate can reach the
+screen or a hunter's detection range before its next update, even with
+the vampire flying straight at it. A hunter that is spotted anyway is
+updated straight away.
+
+A reduced-rate update is exact, not an approximation: humans catch up on
+their straight legs and stop at each turn and bounce, hunters replay the
+skipped ticks as patrolling, and every entity draws from its own random
+stream, so skipping far updates can't change what anything else draws.
+Before a WorldSimulation puts chunks to sleep or swaps its flow fields,
+flush() brings everything up to date. On-screen play is identical to
+running without a scheduler, and the same with per-tick and event-driven
+humans (which the scheduler leaves alone), as main() checks:
+
+    python vampire_lod.py --seeds 5 --ticks 3000
+    python vampire_lod.py --against event
+
+Each entity carries its schedule: the tick of its next update (lod_due) and
+how many ticks that update covers (lod_ticks). Updates are staggered by
+list position so the reduced-rate work is spread evenly over the ticks.
+"""
+
+import argparse
+import math
+import random
+import sys
+
+# (gap below which, update every this many ticks), nearest first; the
+# fastest the vampire and a hunter close on each other is about 15 px a tick
+LOD_BANDS = ((120, 1), (240, 2), (480, 4))
+LOD_MAX_INTERVAL = 8        # Update interval beyond the last band
+
+
+class LodScheduler:
+    """Picks which humans and hunters a Simulation updates each tick"""
+
+    def __init__(self, view_width, view_height):
+        self.view_width = view_width
+        self.view_height = view_height
+
+    def full_rate_area(self, sim):
+        """(left, top, right, bottom) of the camera's view widened by LOD_BANDS[0]"""
+        left, top = sim.camera()
+        margin = LOD_BANDS[0][0]
+        return (left - margin, top - margin,
+                left + self.view_width + margin, top + self.view_height + margin)
+
+    def schedule(self, entity, tick, stagger, gap):
+        """Set when `entity`, just updated at `tick`, is next due"""
+        for limit, interval in LOD_BANDS:
+            if gap < limit:
+                break
+        else:
+            interval = LOD_MAX_INTERVAL
+        wait = interval - (tick + stagger) % interval
+        entity.lod_due = tick + wait
+        entity.lod_ticks = wait
+
+    def update_humans(self, sim):
+        """Random-walk the humans due this tick; returns how many were updated"""
+        tick = sim.total_time
+        next_tick = tick + 1
+        x_lo, y_lo, x_hi, y_hi = area = self.full_rate_area(sim)
+        width, height = sim.width, sim.height
+        move = sim.human_index.move
+        updates = 0
+        for i, human in enumerate(sim.humans):
+            if human.lod_due > tick:
+                continue
+            human.update(width, height, human.lod_ticks)
+            move(human)
+            updates += 1
+            if x_lo < human.x < x_hi and y_lo < human.y < y_hi:
+                human.lod_due = next_tick
+                human.lod_ticks = 1
+            else:
+                self.schedule(human, tick, i, view_gap(human, area))
+        return updates
+
+    def update_enemies(self, sim, spotted, is_night):
+        """Patrol or chase with the hunters due this tick; returns how many were updated
+
+        `spotted` is the set of hunters within detection range this tick.
+        """
+        tick = sim.total_time
+        next_tick = tick + 1
+        vampire = sim.vampire
+        vampire_x, vampire_y = vampire.x, vampire.y
+        x_lo, y_lo, x_hi, y_hi = area = self.full_rate_area(sim)
+        time_of_day, nav = sim.time_of_day, sim.nav
+        bounds = (sim.width, sim.height, sim.patrol_range)
+        move = sim.enemy_index.move
+        updates = 0
+        for i, enemy in enumerate(sim.enemies):
+            sees_vampire = enemy in spotted
+            ticks = enemy.lod_ticks
+            if enemy.lod_due > tick:
+                if not sees_vampire:
+                    continue
+                ticks -= enemy.lod_due - tick   # Called up early: only the ticks so far
+            enemy.update(vampire_x, vampire_y, is_night, time_of_day, sees_vampire, nav,
+                         *bounds, ticks)
+            move(enemy)
+            updates += 1
+            if enemy.chasing or (x_lo < enemy.x < x_hi and y_lo < enemy.y < y_hi):
+                enemy.lod_due = next_tick
+                enemy.lod_ticks = 1
+                continue
+            detection_gap = (math.hypot(enemy.x - vampire_x, enemy.y - vampire_y)
+                             - enemy.detection_range)
+            self.schedule(enemy, tick, i, min(view_gap(enemy, area), detection_gap))
+        return updates
+
+    def flush(self, sim, is_night):
+        """Update every entity that is behind up to the end of the previous tick
+
+        Their next scheduled update then covers only the ticks left until
+        it. Entities not yet scheduled (due before this tick) were spawned
+        since the last one and have nothing to catch up. Returns how many
+        entities were updated.
+        """
+        tick = sim.total_time
+        done = tick - 1
+        width, height = sim.width, sim.height
+        updates = 0
+        if sim.motion == "tick":
+            move = sim.human_index.move
+            for human in sim.humans:
+                behind = done - (human.lod_due - human.lod_ticks)
+                if behind > 0 and human.lod_due >= tick:
+                    human.update(width, height, behind)
+                    human.lod_ticks -= behind
+                    move(human)
+                    updates += 1
+
+        vampire = sim.vampire
+        time_of_day, nav = sim.time_of_day, sim.nav
+        bounds = (width, height, sim.patrol_range)
+        move = sim.enemy_index.move
+        for enemy in sim.enemies:
+            behind = done - (enemy.lod_due - enemy.lod_ticks)
+            if behind > 0 and enemy.lod_due >= tick:
+                enemy.update(vampire.x, vampire.y, is_night, time_of_day, False, nav,
+                             *bounds, behind)
+                enemy.lod_ticks -= behind
+                move(enemy)
+                updates += 1
+        return updates
+
+
+def view_gap(entity, area):
+    """How far an entity is outside the full-rate area, plus LOD_BANDS[0]"""
+    x_lo, y_lo, x_hi, y_hi = area
+    return max(x_lo - entity.x, entity.x - x_hi, y_lo - entity.y, entity.y - y_hi) + LOD_BANDS[0][0]
+
+
+# Checking - compare a world with a reference one on the same inputs
+
+def visible_state(sim, view_width, view_height, margin=20):
+    """What the player sees: the vampire, score and every entity within `margin` of the view"""
+    left, top = sim.camera()
+    x_lo, y_lo = left - margin, top - margin
+    x_hi, y_hi = left + view_width + margin, top + view_height + margin
+    vampire = sim.vampire
+    return ((vampire.x, vampire.y, vampire.health, vampire.blood, sim.score),
+            sorted((h.x, h.y) for h in sim.humans if x_lo <= h.x <= x_hi and y_lo <= h.y <= y_hi),
+            sorted((e.x, e.y, e.health, e.chasing) for e in sim.enemies
+                   if x_lo <= e.x <= x_hi and y_lo <= e.y <= y_hi))
+
+
+def first_mismatch(seed, ticks, motion="tick", against="unscheduled"):
+    """First tick a seeded world plays differently on screen from a reference world
+
+    The reference is the same world without its LodScheduler
+    ("unscheduled") or with event-driven humans ("event"). Both get the
+    same random-walk inputs, and both vampires are kept fed and healed so
+    the run goes through whole days and nights. Returns None when every
+    tick matches.
+    """
+    from vampire_game import INPUT_DOWN, INPUT_FEED, INPUT_LEFT, INPUT_RIGHT, INPUT_UP
+    from vampire_world import WorldSimulation
+
+    scheduled = WorldSimulation(seed=seed, motion=motion)
+    if against == "event":
+        reference = WorldSimulation(seed=seed, motion="event")
+    else:
+        reference = WorldSimulation(seed=seed, motion=motion)
+        reference.lod = None
+    view = (scheduled.lod.view_width, scheduled.lod.view_height)
+    inputs = random.Random(seed)
+    moves = (0, INPUT_UP, INPUT_DOWN, INPUT_LEFT, INPUT_RIGHT, INPUT_UP | INPUT_RIGHT,
+             INPUT_DOWN | INPUT_LEFT)
+    controls = 0
+    for tick in range(ticks):
+        if tick % 40 == 0:
+            controls = inputs.choice(moves) | (INPUT_FEED if inputs.random() < 0.3 else 0)
+        for sim in (scheduled, reference):
+            vampire = sim.vampire
+            vampire.blood, vampire.health = vampire.max_blood, vampire.max_health
+            sim.step(controls)
+        if visible_state(scheduled, *view) != visible_state(reference, *view):
+            return tick
+    return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Check that level-of-detail scheduling doesn't change on-screen play")
+    parser.add_argument("--seeds", type=int, default=5, help="worlds to check (seeds 0..N-1)")
+    parser.add_argument("--ticks", type=int, default=3000, help="ticks per world")
+    parser.add_argument("--motion", choices=("tick", "event"), default="tick",
+                        help="human motion of the checked worlds")
+    parser.add_argument("--against", choices=("unscheduled", "event"), default="unscheduled",
+                        help="reference world: the same without a scheduler, or with "
+                             "event-driven humans")
+    args = parser.parse_args(argv)
+
+    failed = 0
+    for seed in range(args.seeds):
+        tick = first_mismatch(seed, args.ticks, args.motion, args.against)
+        if tick is None:
+            print(f"seed {seed}: identical")
+        else:
+            print(f"seed {seed}: differs from tick {tick}")
+            failed += 1
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Vampire Survival - flow-field navigation for hunters
+
+NavGrid divides the map into square cells with a travel cost each: open
+ground costs 1, the sun zone costs SUN_COST during the day and obstacle
+cells can't be entered. Navigator runs one Dijkstra search over that grid
+from the vampire's cell and turns it into a per-cell steering table, so
+every chasing hunter steers by a single lookup and pathfinding cost
+doesn't grow with the number of hunters. A field depends only on the
+vampire's cell, day or night and the obstacles, so each one is built once
+and kept until an obstacle is added.
+
+Cells whose cheapest path costs no more than a straight run over the same
+kind of ground are "direct": hunters there just head straight for the
+vampire. Elsewhere they follow the field around obstacles and out of the
+sun. A second field
+leads hunters that are patrolling in the sun back into the shade.
+"""
+
+import heapq
+import math
+
+SUN_COST = 8.0              # Daytime cost of crossing a sun cell (open ground is 1)
+DIRECT_SLACK = 1e-6         # Rounding allowed when comparing path costs
+DIAGONAL_EXTRA = math.sqrt(2) - 1   # Octile distance: straight steps + this per diagonal
+
+# (column step, row step, length) to the 8 neighbours of a cell
+STEPS = [(dx, dy, math.hypot(dx, dy)) for dy in (-1, 0, 1) for dx in (-1, 0, 1) if dx or dy]
+
+
+class NavGrid:
+    """Travel costs over a width x height area in cell_size squares
+
+    The area's top-left corner is at (left, top) in world coordinates, so a
+    grid can cover just part of a large world. Cells left of world x
+    `sun_width` are the sun zone.
+    """
+
+    def __init__(self, width, height, cell_size, sun_width, left=0, top=0):
+        self.cell_size = cell_size
+        self.left = left
+        self.top = top
+        self.cols = max(1, math.ceil(width / cell_size))
+        self.rows = max(1, math.ceil(height / cell_size))
+        count = self.cols * self.rows
+        self.sun = [left + (i % self.cols + 0.5) * cell_size < sun_width for i in range(count)]
+        self.blocked = [False] * count
+        self.version = 0    # Bumped whenever obstacles change
+        self.edge_cache = {}
+        self.uniform_cache = (None, False, False)   # (version, at night, by day)
+
+    def cell(self, x, y):
+        """Cell number containing world point (x, y), clamped to the grid"""
+        size, cols, rows = self.cell_size, self.cols, self.rows
+        col = int((x - self.left) // size)
+        row = int((y - self.top) // size)
+        if not (0 <= col < cols):
+            col = 0 if col < 0 else cols - 1
+        if not (0 <= row < rows):
+            row = 0 if row < 0 else rows - 1
+        return row * cols + col
+
+    def block(self, x, y, width, height):
+        """Mark every cell overlapping a world rectangle as impassable"""
+        size = self.cell_size
+        x -= self.left
+        y -= self.top
+        for row in range(max(0, int(y // size)), min(self.rows, math.ceil((y + height) / size))):
+            for col in range(max(0, int(x // size)), min(self.cols, math.ceil((x + width) / size))):
+                self.blocked[row * self.cols + col] = True
+        self.version += 1
+
+    def costs(self, daytime):
+        """Per-cell travel cost (None for blocked cells)"""
+        return [None if blocked else SUN_COST if daytime and sun else 1.0
+                for blocked, sun in zip(self.blocked, self.sun)]
+
+    def uniform(self, daytime):
+        """True when every cell costs the same, so every path is straight"""
+        if self.uniform_cache[0] != self.version:
+            open_map = not any(self.blocked)
+            self.uniform_cache = (self.version, open_map,
+                                  open_map and (any(self.sun) == all(self.sun)))
+        return self.uniform_cache[2 if daytime else 1]
+
+    def edges(self, daytime):
+        """Per cell, (neighbour, edge cost, unit step) for every enterable neighbour
+
+        Cached until the obstacles change. Diagonal moves may not cut the
+        corner of a blocked cell.
+        """
+        key = (daytime, self.version)
+        if key not in self.edge_cache:
+            self.edge_cache = {k: v for k, v in self.edge_cache.items() if k[1] == self.version}
+            self.edge_cache[key] = self.build_edges(self.costs(daytime))
+        return self.edge_cache[key]
+
+    def build_edges(self, costs):
+        cols, rows = self.cols, self.rows
+        edges = []
+        for cell, here in enumerate(costs):
+            col, row = cell % cols, cell // cols
+            out = []
+            if here is not None:
+                for dx, dy, length in STEPS:
+                    c, r = col + dx, row + dy
+                    if not (0 <= c < cols and 0 <= r < rows):
+                        continue
+                    there = costs[r * cols + c]
+                    if there is None:
+                        continue
+                    corner_a, corner_b = costs[row * cols + c], costs[r * cols + col]
+                    if dx and dy and (corner_a is None or corner_b is None):
+                        continue
+                    step = (dx / length, dy / length)
+                    out.append((r * cols + c, length * (here + there) / 2, step))
+            edges.append(out)
+        return edges
+
+    def flow_field(self, goals, daytime):
+        """Cheapest path cost from every cell to the nearest goal cell
+
+        Returns (cost, steer): steer[cell] is the unit (dx, dy) toward the
+        next cell on that path, or None at a goal or an unreachable cell.
+        """
+        edges = self.edges(daytime)
+        distance = [math.inf] * len(edges)
+        heap = []
+        for goal in goals:
+            if not self.blocked[goal]:
+                distance[goal] = 0.0
+                heap.append((0.0, goal))
+        heapq.heapify(heap)
+
+        pop, push = heapq.heappop, heapq.heappush
+        while heap:
+            dist, cell = pop(heap)
+            if dist > distance[cell]:
+                continue
+            for other, edge, _ in edges[cell]:
+                candidate = dist + edge
+                if candidate < distance[other]:
+                    distance[other] = candidate
+                    push(heap, (candidate, other))
+
+        # Steer along the first edge of each cell's cheapest path
+        steer = [None] * len(edges)
+        for cell, out in enumerate(edges):
+            if distance[cell] == 0.0:
+                continue
+            best, best_step = math.inf, None
+            for other, edge, step in out:
+                total = distance[other] + edge
+                if total < best:
+                    best, best_step = total, step
+            steer[cell] = best_step
+        return distance, steer
+
+
+class Navigator:
+    """Shared chase and sun-escape steering tables for every hunter"""
+
+    def __init__(self, grid):
+        self.grid = grid
+        self.goal = None        # (x, y, is_night) of the vampire
+        self.chase_key = None
+        self.chase = None       # cell -> steer, or None to head straight at the vampire
+        self.chase_cache = {}   # chase_key -> table; a map has only 2 x cells of them
+        self.cache_version = grid.version
+        self.shade_key = None
+        self.shade = None       # cell -> steer out of the sun, None when already in shade
+        self.rebuilds = 0
+
+    def set_goal(self, x, y, is_night):
+        """Track the vampire; its chase field is looked up when a chasing hunter next steers"""
+        self.goal = (x, y, is_night)
+        self.chase = None
+
+    def chase_table(self):
+        """Per-cell chase steering for the current goal, rebuilt lazily if the goal moved"""
+        if self.chase is None:
+            x, y, is_night = self.goal
+            grid = self.grid
+            self.chase_key = key = (grid.cell(x, y), not is_night, grid.version)
+            self.chase = self.chase_cache.get(key)
+        if self.chase is None:
+            goal, daytime, _ = self.chase_key
+            grid = self.grid
+            if grid.uniform(daytime):
+                steer = [None] * len(grid.blocked)
+            else:
+                distance, steer = grid.flow_field([goal], daytime)
+                # Cells whose cheapest path is no dearer than a straight run
+                # over ground like their own keep the exact straight chase
+                costs = grid.costs(daytime)
+                goal_cost = costs[goal] or math.inf
+                cols = grid.cols
+                goal_col, goal_row = goal % cols, goal // cols
+                for cell, cost in enumerate(distance):
+                    if cost == math.inf:
+                        continue
+                    dx = abs(cell % cols - goal_col)
+                    dy = abs(cell // cols - goal_row)
+                    if dx < dy:
+                        dx, dy = dy, dx
+                    ground = min(costs[cell], goal_cost)
+                    if cost <= (dx + DIAGONAL_EXTRA * dy) * ground + DIRECT_SLACK:
+                        steer[cell] = None
+                self.rebuilds += 1
+            if self.cache_version != grid.version:
+                self.chase_cache.clear()
+                self.cache_version = grid.version
+            self.chase = self.chase_cache[self.chase_key] = steer
+        return self.chase
+
+    def shade_table(self):
+        """Per-cell steering out of the sun (only meaningful by day)"""
+        grid = self.grid
+        if self.shade_key != grid.version:
+            shade = [cell for cell, sun in enumerate(grid.sun) if not sun]
+            self.shade = grid.flow_field(shade, True)[1]
+            self.shade_key = grid.version
+        return self.shade
+
+    def steer(self, x, y, chasing, is_night):
+        """Unit (dx, dy) for a hunter at (x, y), or None to head straight for its target"""
+        if chasing:
+            table = self.chase if self.chase is not None else self.chase_table()
+        elif not is_night:
+            table = self.shade if self.shade_key == self.grid.version else self.shade_table()
+        else:
+            return None
+        return table[self.grid.cell(x, y)]
@@ -0,0 +1,827 @@
+#!/usr/bin/env python3
+"""
+Vampire Survival - localhost client/server play
+
+GameServer runs the authoritative Simulation at the tick rate and streams
+it over UDP to any number of clients. The first client to join steers the
+vampire and everyone after it spectates. GameClient is a Game whose
+simulation is a MirrorSimulation filled in from that stream, so it renders
+with the regular draw code, interpolating between ticks.
+
+Every tick each client gets a snapshot of what the camera can see,
+quantized and delta-compressed:
+
+- positions go out in 1/POSITION_SCALE px, hunter health in
+  HEALTH_LEVELS steps and the vampire's resources in hundredths
+- each human and hunter is published as a record: its position and
+  per-tick velocity at an anchor tick, which clients extrapolate. A new
+  record is only published when an entity drifts POSITION_TOLERANCE from
+  its record's prediction or its look changes - for a walking human, at
+  its turns and bounces
+- a snapshot holds only the records published or dropped since the last
+  tick the client acknowledged, zlib-compressed, so bandwidth follows
+  how much changes on screen rather than how many entities there are
+
+Clients acknowledge the newest snapshot they hold with every input
+message. A client whose acknowledged snapshot is no longer in the
+server's history gets a full one. Messages bigger than FRAGMENT_SIZE go
+out in fragments.
+
+    python vampire_net.py serve [--world] [--motion event]
+    python vampire_net.py connect
+    python vampire_net.py bench
+
+bench runs a server and headless clients against 127.0.0.1 and reports
+the bytes each client receives and the server's cost per tick.
+"""
+
+import argparse
+import json
+import math
+import socket
+import struct
+import sys
+import time
+import zlib
+from itertools import compress
+from operator import is_not, ne
+
+from vampire_game import (
+    FPS, MAX_CATCH_UP_TICKS, RENDER_FPS, SCREEN_WIDTH, SCREEN_HEIGHT, SUN_ZONE_WIDTH,
+    Enemy, Game, GameState, Simulation, TimeOfDay, VampireForm, lazy_import, read_controls,
+)
+
+pygame = lazy_import("pygame")
+
+LOCALHOST = "127.0.0.1"
+DEFAULT_PORT = 47017
+PROTOCOL_VERSION = 1
+
+POSITION_SCALE = 16         # Positions are sent in 1/16 px
+VELOCITY_SCALE = 4096       # Velocities in 1/4096 px per tick
+POSITION_TOLERANCE = POSITION_SCALE // 2    # Drift (in 1/16 px) before a record is republished
+HEALTH_LEVELS = 63          # Hunter health steps (the look keeps 6 bits for it)
+HISTORY_TICKS = FPS // 2    # Published snapshots the server keeps as delta bases
+FRAGMENT_SIZE = 1200        # Message bytes per datagram
+RECEIVE_BUFFER = 1 << 20    # Socket receive buffer, room for full snapshots of big crowds
+INTERP_DELAY_TICKS = 2      # Clients show the world this many ticks behind the newest snapshot
+MAX_PLAYBACK_DRIFT = 8      # ...and jump back to that delay when further off
+MAX_INTERP_JUMP = 40        # Moves longer than this (px) in a tick are respawns: no interpolation
+CLIENT_TIMEOUT = 3.0        # Seconds of silence before the server drops a client
+HELLO_INTERVAL = 0.5        # Seconds between a client's join requests until it is answered
+REPORT_SECONDS = 5.0        # How often a running server prints its stats
+
+ROLE_PLAYER = 0
+ROLE_SPECTATOR = 1
+INPUT_RESTART = 1           # Input flags: start a new game once this one is over,
+INPUT_WAITING = 2           # hold the game (the player is on the menu)
+
+# Messages, told apart by their first byte. Clients send HELLO to join,
+# INPUT every tick and BYE on leaving; the server answers HELLO with
+# WELCOME and sends each tick's snapshot as one or more FRAGMENTs.
+HELLO = struct.Struct("<cB")            # b"H", protocol version
+WELCOME = struct.Struct("<cBIIIB")      # b"W", protocol version, width, height, sun width, role
+INPUT = struct.Struct("<cBBi")          # b"I", INPUT_* controls, input flags, acked tick (-1: none)
+BYE = b"B"
+FRAGMENT = struct.Struct("<cIHH")       # b"S", tick, fragment number, fragment count
+
+# A reassembled snapshot is this header and a zlib-compressed varint body:
+# base tick (-1: full snapshot), game time, flags (game over, bat form,
+# night), score, human and hunter counts, vampire x and y (1/16 px), then
+# blood, energy and health in hundredths
+SNAPSHOT = struct.Struct("<iIBIIIiihhh")
+FLAG_GAME_OVER = 1
+FLAG_BAT = 2
+FLAG_NIGHT = 4
+
+
+# Records and snapshot bodies
+
+def predict(record, now):
+    """Quantized (x, y) a record extrapolates to at game time `now`"""
+    anchor, x, y, vx, vy, _ = record
+    age = (now - anchor) * POSITION_SCALE
+    return x + vx * age // VELOCITY_SCALE, y + vy * age // VELOCITY_SCALE
+
+
+def zigzag(value):
+    return value << 1 if value >= 0 else (~value << 1) | 1
+
+
+def unzigzag(value):
+    return ~(value >> 1) if value & 1 else value >> 1
+
+
+def pack_varints(values):
+    """Unsigned LEB128 varints, one after another"""
+    out = bytearray()
+    append = out.append
+    for value in values:
+        while value > 0x7F:
+            append(value & 0x7F | 0x80)
+            value >>= 7
+        append(value)
+    return bytes(out)
+
+
+def unpack_varints(data):
+    """Every varint in a pack_varints() string, in order"""
+    values = []
+    value = shift = 0
+    for byte in data:
+        value |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+        else:
+            values.append(value)
+            value = shift = 0
+    return values
+
+
+def encode_body(now, removed, changed, records):
+    """Varint body: dropped ids, then the changed records, ids gap-coded
+
+    Each record is its id gap, then zigzagged age at game time `now`, x,
+    y, vx and vy, then its look.
+    """
+    values = [len(removed)]
+    previous = 0
+    for record_id in removed:
+        values.append(record_id - previous)
+        previous = record_id
+    values.append(len(changed))
+    previous = 0
+    for record_id in changed:
+        anchor, x, y, vx, vy, look = records[record_id]
+        values += (record_id - previous, zigzag(now - anchor),
+                   zigzag(x), zigzag(y), zigzag(vx), zigzag(vy), look)
+        previous = record_id
+    return zlib.compress(pack_varints(values))
+
+
+def decode_body(now, body, base):
+    """Records at game time `now`: a copy of `base` with an encode_body() body applied
+
+    Dropped ids may include records the client never got.
+    """
+    values = unpack_varints(zlib.decompress(body))
+    records = dict(base)
+    count = values[0]
+    record_id = 0
+    for gap in values[1:count + 1]:
+        record_id += gap
+        records.pop(record_id, None)
+    i = count + 1
+    count = values[i]
+    record_id = 0
+    for i in range(i + 1, i + 1 + 7 * count, 7):
+        gap, age, x, y, vx, vy, look = values[i:i + 7]
+        record_id += gap
+        records[record_id] = (now - unzigzag(age), unzigzag(x), unzigzag(y),
+                              unzigzag(vx), unzigzag(vy), look)
+    return records
+
+
+def hunter_look(enemy):
+    """Look of a hunter record: a hunter bit, chasing and quantized health"""
+    health = max(0, min(HEALTH_LEVELS, round(enemy.health / enemy.max_health * HEALTH_LEVELS)))
+    return 1 | enemy.chasing << 1 | health << 2
+
+
+# Server side
+
+class StatePublisher:
+    """Quantized records of everything on screen, and deltas between ticks
+
+    publish() is called once per tick however many clients there are;
+    message() encodes a snapshot against a client's acknowledged tick,
+    once per distinct base. Ticks count publishes, while record anchors
+    are in game time (Simulation.total_time), which stands still while
+    the game waits or is over.
+    """
+
+    def __init__(self):
+        self.tick = -1
+        self.ids = {}           # entity -> record id (pooled entities keep theirs)
+        self.records = {}       # record id -> (anchor time, x, y, vx, vy, look)
+        self.leg_humans = []    # Humans published by their legs last tick, in list order
+        self.headings = []      # ...and their headings
+        self.positions = {}     # drift-checked entity -> (x, y) last tick
+        self.history = {}       # tick -> (republished record ids, dropped record ids)
+        self.header = None
+        self.messages = {}      # base tick -> message, for the current tick
+
+    def record_id(self, entity):
+        record_id = self.ids.get(entity)
+        if record_id is None:
+            record_id = self.ids[entity] = len(self.ids)
+        return record_id
+
+    def publish(self, sim):
+        """Record the simulation's visible state as the next tick"""
+        self.tick = tick = self.tick + 1
+        now = sim.total_time
+        left, top = sim.camera()
+        humans, enemies = sim.visible_entities(left, top)
+        records, changed = self.records, []
+        scale = POSITION_SCALE
+
+        # A walking human's record is its leg, so only a new leg is news,
+        # and every new leg (a turn, a bounce, a respawn) changes the
+        # heading. Lists keep their order from tick to tick apart from
+        # swap-removes, so headings are compared position by position in
+        # C. Humans stepped at a reduced rate (see vampire_lod) lag their
+        # legs, so they are drift-checked like hunters instead.
+        if sim.motion == "event" or sim.lod is None:
+            on_legs, drifting = humans, ()
+        else:
+            on_legs, drifting = (), humans
+        headings = [human.direction for human in on_legs]
+        old_humans = self.leg_humans
+        shared = range(min(len(on_legs), len(old_humans)))
+        swapped = list(compress(shared, map(is_not, on_legs, old_humans)))
+        renewed = set(compress(shared, map(ne, headings, self.headings)))
+        renewed.update(swapped, range(len(shared), len(on_legs)))
+        for i in renewed:
+            human = on_legs[i]
+            record_id = self.record_id(human)
+            record = (now - human.leg_ticks, round(human.leg_x * scale),
+                      round(human.leg_y * scale), round(human.step_x * VELOCITY_SCALE),
+                      round(human.step_y * VELOCITY_SCALE), 0)
+            if records.get(record_id) != record:    # Not just shuffled along the list
+                records[record_id] = record
+                changed.append(record_id)
+        left_behind = [old_humans[i] for i in swapped] + old_humans[len(shared):]
+        gone = set(left_behind) - set(on_legs) if left_behind else set()
+        self.leg_humans, self.headings = list(on_legs), headings
+
+        # Everything else is republished once it drifts from its record
+        ids, last, positions = self.ids, self.positions, {}
+        tolerance = POSITION_TOLERANCE
+        for entities, hunters in ((drifting, False), (enemies, True)):
+            for entity in entities:
+                x, y = entity.x, entity.y
+                positions[entity] = (x, y)
+                look = hunter_look(entity) if hunters else 0
+                record = records.get(ids.get(entity))
+                if record is not None and record[5] == look:
+                    predicted_x, predicted_y = predict(record, now)
+                    if (abs(predicted_x - x * scale) <= tolerance
+                            and abs(predicted_y - y * scale) <= tolerance):
+                        continue
+                prior = last.get(entity)
+                vx, vy = (x - prior[0], y - prior[1]) if prior is not None else (0.0, 0.0)
+                record_id = self.record_id(entity)
+                records[record_id] = (now, round(x * scale), round(y * scale),
+                                      round(vx * VELOCITY_SCALE), round(vy * VELOCITY_SCALE),
+                                      look)
+                changed.append(record_id)
+        gone |= last.keys() - positions.keys()
+        self.positions = positions
+
+        dropped = [ids[entity] for entity in gone]
+        for record_id in dropped:
+            del records[record_id]
+        self.history[tick] = (changed, dropped)
+        self.history.pop(tick - HISTORY_TICKS, None)
+        self.messages = {}
+
+        vampire = sim.vampire
+        flags = (sim.game_over * FLAG_GAME_OVER | (vampire.form == VampireForm.BAT) * FLAG_BAT
+                 | (sim.time_of_day == TimeOfDay.NIGHT) * FLAG_NIGHT)
+        self.header = (now, flags, sim.score, sim.human_count, sim.enemy_count,
+                       round(vampire.x * scale), round(vampire.y * scale),
+                       round(vampire.blood * 100), round(vampire.energy * 100),
+                       round(vampire.health * 100))
+
+    def message(self, base):
+        """This tick's snapshot as a delta against tick `base` (full if it is gone)"""
+        if base not in self.history:
+            base = -1
+        message = self.messages.get(base)
+        if message is None:
+            records = self.records
+            if base == -1:
+                removed, changed = [], sorted(records)
+            else:
+                republished, dropped = set(), set()
+                for tick in range(base + 1, self.tick + 1):
+                    changed, gone = self.history[tick]
+                    republished.update(changed)
+                    dropped.update(gone)
+                changed = sorted(republished & records.keys())
+                removed = sorted(dropped - records.keys())
+            message = self.messages[base] = (SNAPSHOT.pack(base, *self.header)
+                                             + encode_body(self.header[0], removed, changed,
+                                                           records))
+        return message
+
+
+class Peer:
+    """A client as the server sees it"""
+
+    __slots__ = ("address", "role", "controls", "flags", "ack", "last_heard", "bytes_sent")
+
+    def __init__(self, address, role, now):
+        self.address = address
+        self.role = role
+        self.controls = 0       # Latest INPUT_* controls and input flags, held
+        self.flags = INPUT_WAITING  # until the next input
+        self.ack = -1           # Newest tick the client holds
+        self.last_heard = now
+        self.bytes_sent = 0
+
+
+class GameServer:
+    """Runs a Simulation for networked clients at the tick rate
+
+    update() is one tick, in the same order as Game.update: read the
+    player's input, step, then send every client its snapshot. The
+    simulation waits while nobody is steering, and a finished game is
+    restarted when the player asks.
+    """
+
+    def __init__(self, sim, host=LOCALHOST, port=DEFAULT_PORT):
+        self.sim = sim
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.bind((host, port))
+        self.socket.setblocking(False)
+        self.address = self.socket.getsockname()
+        self.publisher = StatePublisher()
+        self.peers = {}         # address -> Peer
+        self.player = None      # Address of the peer steering the vampire
+        self.ticks = 0
+        self.step_seconds = 0.0     # Simulation time, summed over ticks
+        self.send_seconds = 0.0     # Publishing, encoding and sending, summed over ticks
+
+    def poll(self):
+        """Handle every datagram waiting on the socket"""
+        now = time.perf_counter()
+        while True:
+            try:
+                data, address = self.socket.recvfrom(65536)
+            except (BlockingIOError, ConnectionError):
+                break
+            tag = data[:1]
+            peer = self.peers.get(address)
+            if tag == b"H" and len(data) == HELLO.size:
+                if peer is None:
+                    role = ROLE_SPECTATOR if self.player in self.peers else ROLE_PLAYER
+                    peer = self.peers[address] = Peer(address, role, now)
+                    if role == ROLE_PLAYER:
+                        self.player = address
+                sim = self.sim
+                self.socket.sendto(WELCOME.pack(b"W", PROTOCOL_VERSION, sim.width, sim.height,
+                                                sim.sun_width, peer.role), address)
+            elif peer is None:
+                continue    # Has to say hello first
+            elif tag == b"I" and len(data) == INPUT.size:
+                _, peer.controls, peer.flags, ack = INPUT.unpack(data)
+                peer.ack = max(peer.ack, ack)
+                peer.last_heard = now
+            elif tag == BYE:
+                del self.peers[address]
+        for address in [a for a, p in self.peers.items() if now - p.last_heard > CLIENT_TIMEOUT]:
+            del self.peers[address]
+        if self.player not in self.peers and self.peers:
+            # The player left: the longest-connected spectator takes over
+            self.player, peer = next(iter(self.peers.items()))
+            peer.role = ROLE_PLAYER
+
+    def update(self):
+        """Simulate one tick and send it to every client"""
+        clock = time.perf_counter
+        self.poll()
+        sim = self.sim
+        player = self.peers.get(self.player)
+        started = clock()
+        if player is not None and not player.flags & INPUT_WAITING:
+            if sim.game_over and player.flags & INPUT_RESTART:
+                sim.reset()
+            sim.step(player.controls)
+        stepped = clock()
+
+        publisher = self.publisher
+        publisher.publish(sim)
+        tick = publisher.tick
+        for peer in self.peers.values():
+            self.send(peer, tick, publisher.message(peer.ack))
+        self.step_seconds += stepped - started
+        self.send_seconds += clock() - stepped
+        self.ticks += 1
+
+    def send(self, peer, tick, message):
+        """Send a snapshot message to a client, in fragments"""
+        count = max(1, -(-len(message) // FRAGMENT_SIZE))
+        for i in range(count):
+            datagram = (FRAGMENT.pack(b"S", tick, i, count)
+                        + message[i * FRAGMENT_SIZE:(i + 1) * FRAGMENT_SIZE])
+            try:
+                self.socket.sendto(datagram, peer.address)
+            except (BlockingIOError, ConnectionError):
+                return  # Dropped, like any lost datagram: the next delta covers it
+            peer.bytes_sent += len(datagram)
+
+    def stats(self):
+        """Per-tick averages since the last reset_stats(), and per-client traffic"""
+        ticks = max(1, self.ticks)
+        return {
+            "ticks": self.ticks,
+            "step_ms": self.step_seconds / ticks * 1000,
+            "send_ms": self.send_seconds / ticks * 1000,
+            "clients": [{"role": "player" if p.role == ROLE_PLAYER else "spectator",
+                         "bytes_per_tick": p.bytes_sent / ticks} for p in self.peers.values()],
+        }
+
+    def reset_stats(self):
+        self.ticks = 0
+        self.step_seconds = self.send_seconds = 0.0
+        for peer in self.peers.values():
+            peer.bytes_sent = 0
+
+    def run(self):
+        """Serve at FPS ticks a second until interrupted, printing stats now and then"""
+        tick_seconds = 1.0 / FPS
+        next_tick = report_at = time.perf_counter()
+        try:
+            while True:
+                now = time.perf_counter()
+                if now < next_tick:
+                    time.sleep(next_tick - now)
+                    continue
+                self.update()
+                next_tick += tick_seconds
+                if now - next_tick > MAX_CATCH_UP_TICKS * tick_seconds:
+                    next_tick = now     # Fell too far behind: drop the backlog
+                if now - report_at >= REPORT_SECONDS:
+                    print(format_stats(self.stats()), flush=True)
+                    self.reset_stats()
+                    report_at = now
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.close()
+
+    def close(self):
+        self.socket.close()
+
+
+def format_stats(stats):
+    clients = ", ".join(f"{c['role']} {c['bytes_per_tick'] * FPS / 1024:.1f} KB/s"
+                        for c in stats["clients"]) or "no clients"
+    return (f"step {stats['step_ms']:.2f} ms/tick, send {stats['send_ms']:.2f} ms/tick; "
+            f"{clients}")
+
+
+# Client side
+
+class NetClient:
+    """Socket end of a client: joins a server and collects its snapshots
+
+    states maps each reconstructed tick to its (header, records); the
+    newest is acknowledged with every send_input().
+    """
+
+    def __init__(self, host=LOCALHOST, port=DEFAULT_PORT):
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, RECEIVE_BUFFER)
+        self.socket.connect((host, port))
+        self.socket.setblocking(False)
+        self.world = None       # (width, height, sun width) once the server answers
+        self.role = None
+        self.hello_sent = -math.inf
+        self.states = {}
+        self.latest = None
+        self.fragments = {}     # tick -> {fragment number: bytes}
+        self.bytes_received = 0
+
+    def poll(self):
+        """Join if not in yet, then take in every waiting datagram"""
+        now = time.perf_counter()
+        if self.world is None and now - self.hello_sent >= HELLO_INTERVAL:
+            self.send(HELLO.pack(b"H", PROTOCOL_VERSION))
+            self.hello_sent = now
+        while True:
+            try:
+                data = self.socket.recv(65536)
+            except (BlockingIOError, ConnectionError):
+                return
+            self.bytes_received += len(data)
+            tag = data[:1]
+            if tag == b"S":
+                self.receive_fragment(data)
+            elif tag == b"W" and len(data) == WELCOME.size:
+                _, version, width, height, sun_width, self.role = WELCOME.unpack(data)
+                if version != PROTOCOL_VERSION:
+                    raise ConnectionError(f"Server speaks protocol {version}, "
+                                          f"this client {PROTOCOL_VERSION}")
+                self.world = (width, height, sun_width)
+
+    def receive_fragment(self, data):
+        _, tick, number, count = FRAGMENT.unpack_from(data)
+        if self.latest is not None and tick <= self.latest:
+            return  # Late: a newer snapshot is already in
+        pieces = self.fragments.setdefault(tick, {})
+        pieces[number] = data[FRAGMENT.size:]
+        if len(pieces) == count:
+            del self.fragments[tick]
+            self.receive(tick, b"".join(pieces[i] for i in range(count)))
+
+    def receive(self, tick, message):
+        """Reconstruct a snapshot from its base; dropped if the base is gone"""
+        header = SNAPSHOT.unpack_from(message)
+        base = header[0]
+        if base == -1:
+            base_records = {}
+        elif base in self.states:
+            base_records = self.states[base][1]
+        else:
+            return
+        self.states[tick] = (header, decode_body(header[1], message[SNAPSHOT.size:],
+                                                 base_records))
+        self.latest = tick
+        for old in [t for t in self.states if t <= tick - HISTORY_TICKS]:
+            del self.states[old]
+        for old in [t for t in self.fragments if t < tick]:
+            del self.fragments[old]
+
+    def state_at(self, tick):
+        """(header, records) of the newest snapshot at or before `tick`, or None"""
+        held = [t for t in self.states if t <= tick]
+        return self.states[max(held)] if held else None
+
+    def send_input(self, controls, flags=0):
+        self.send(INPUT.pack(b"I", controls, flags, -1 if self.latest is None else self.latest))
+
+    def send(self, data):
+        try:
+            self.socket.send(data)
+        except (BlockingIOError, ConnectionError):
+            pass    # Server not up (yet): HELLO is retried, inputs go every tick
+
+    def close(self):
+        self.send(BYE)
+        self.socket.close()
+
+
+class MirrorSimulation(Simulation):
+    """Stand-in for a server's simulation, filled in from its snapshots
+
+    Holds only what the server sends - the vampire, the HUD numbers and
+    the humans and hunters on screen - so Game can draw it. It is never
+    stepped.
+    """
+
+    def __init__(self, width=SCREEN_WIDTH, height=SCREEN_HEIGHT, sun_width=SUN_ZONE_WIDTH):
+        super().__init__(0, 0, 0, 0, index="brute")
+        self.width, self.height, self.sun_width = width, height, sun_width
+        self.entities = {}      # record id -> Human or Enemy
+        self.populations = (0, 0)
+
+    @property
+    def human_count(self):
+        return self.populations[0]
+
+    @property
+    def enemy_count(self):
+        return self.populations[1]
+
+    def camera(self, alpha=1.0):
+        """Screen's top-left in the world, centered on the vampire where possible"""
+        x, y = self.draw_position(self.vampire, alpha)
+        left = max(0, min(x - SCREEN_WIDTH // 2, self.width - SCREEN_WIDTH))
+        top = max(0, min(y - SCREEN_HEIGHT // 2, self.height - SCREEN_HEIGHT))
+        return left, top
+
+    def apply(self, header, records):
+        """Show a snapshot's state
+
+        Call save_positions() first to interpolate from the state shown
+        before.
+        """
+        (_, self.total_time, flags, self.score, humans, hunters,
+         x, y, blood, energy, health) = header
+        self.populations = (humans, hunters)
+        self.game_over = bool(flags & FLAG_GAME_OVER)
+        self.time_of_day = TimeOfDay.NIGHT if flags & FLAG_NIGHT else TimeOfDay.DAY
+        vampire = self.vampire
+        vampire.form = VampireForm.BAT if flags & FLAG_BAT else VampireForm.HUMAN
+        vampire.blood, vampire.energy, vampire.health = blood / 100, energy / 100, health / 100
+        previous = self.previous_positions or {}
+        self.place(vampire, x / POSITION_SCALE, y / POSITION_SCALE, previous)
+
+        old, entities = self.entities, {}
+        human_list, enemy_list = [], []
+        for record_id, record in records.items():
+            x, y = predict(record, self.total_time)
+            x, y = x / POSITION_SCALE, y / POSITION_SCALE
+            look = record[5]
+            entity = old.pop(record_id, None)
+            if look & 1:
+                if entity is None:
+                    entity = self.enemy_pool.acquire(x, y, x, y, False, self.rng)
+                entity.chasing = bool(look & 2)
+                entity.health = (look >> 2) / HEALTH_LEVELS * entity.max_health
+                enemy_list.append(entity)
+            else:
+                if entity is None:
+                    entity = self.human_pool.acquire(x, y, self.rng, 0.0)
+                human_list.append(entity)
+            self.place(entity, x, y, previous)
+            entities[record_id] = entity
+        for entity in old.values():
+            (self.enemy_pool if type(entity) is Enemy else self.human_pool).release(entity)
+        self.entities = entities
+        self.human_index.rebuild(human_list)
+        self.enemy_index.rebuild(enemy_list)
+
+    def place(self, entity, x, y, previous):
+        """Move an entity, dropping its interpolation if it jumped (a respawn)"""
+        entity.x, entity.y = x, y
+        before = previous.get(entity)
+        if before is not None and abs(x - before[0]) + abs(y - before[1]) > MAX_INTERP_JUMP:
+            del previous[entity]
+
+
+class GameClient(Game):
+    """Game showing a GameServer's simulation instead of running its own
+
+    The keyboard steers the vampire when this client is the server's
+    player, whose game is held while it is on the menu. Snapshots are
+    played back INTERP_DELAY_TICKS behind the newest one, one per tick,
+    so every frame interpolates between two received ticks and a late
+    datagram doesn't stall the picture. SPACE after a game over asks the
+    server for a new game.
+    """
+
+    def __init__(self, host=LOCALHOST, port=DEFAULT_PORT, render_fps=RENDER_FPS, controls=None,
+                 profile_path=None):
+        self.net = NetClient(host, port)
+        self.playback = None            # Tick being shown
+        self.restart_requested = False
+        super().__init__(MirrorSimulation(), render_fps, controls, rewind_seconds=0,
+                         profile_path=profile_path)
+
+    def reset(self):
+        """Ask for a new game (the server only starts one once this one is over)"""
+        self.restart_requested = True
+
+    def update(self):
+        """Send this tick's input and show the next tick of the server's game"""
+        net = self.net
+        net.poll()
+        controls = 0
+        if self.game_state == GameState.PLAYING:
+            if self.controls is not None:
+                controls = self.controls(self.sim)
+            else:
+                controls = read_controls(pygame.key.get_pressed())
+        flags = INPUT_RESTART if self.restart_requested else 0
+        if self.game_state == GameState.MENU:
+            flags |= INPUT_WAITING
+        net.send_input(controls, flags)
+        if net.latest is None or net.world is None:
+            return
+
+        target = net.latest - INTERP_DELAY_TICKS
+        if self.playback is None or abs(target - self.playback) > MAX_PLAYBACK_DRIFT:
+            self.playback = target
+        elif self.playback < net.latest:
+            self.playback += 1
+        state = net.state_at(self.playback)
+        if state is None:
+            return
+        sim = self.sim
+        sim.width, sim.height, sim.sun_width = net.world
+        sim.save_positions()
+        sim.apply(*state)
+
+        if not sim.game_over:
+            self.restart_requested = False
+        if self.game_state == GameState.MENU:
+            return
+        if sim.game_over and not self.restart_requested:
+            self.game_state = GameState.GAME_OVER
+        elif not sim.game_over:
+            self.game_state = GameState.PLAYING
+
+    def run(self):
+        try:
+            super().run()
+        finally:
+            self.net.close()
+
+
+# Benchmark
+
+BENCH_SCENARIOS = ("default", "crowd-1k", "crowd-10k", "events-10k", "world")
+
+
+def bench_scenario(name, ticks, clients):
+    """Serve one vampire_bench scenario to headless clients on 127.0.0.1
+
+    The first client steers with the cautious bot policy and restarts the
+    game whenever it ends; the rest spectate.
+    """
+    from vampire_batch import cautious
+    from vampire_bench import scenario_setup
+    from vampire_replay import build_simulation
+
+    sim = build_simulation(scenario_setup(name))
+    server = GameServer(sim, port=0)
+    host, port = server.address
+    viewers = [NetClient(host, port) for _ in range(clients)]
+    try:
+        for viewer in viewers:      # Join in order: the first one is the player
+            while viewer.world is None:
+                viewer.poll()
+                server.poll()
+            viewer.bytes_received = 0
+        server.reset_stats()
+        received = 0
+        for _ in range(ticks):
+            server.update()
+            for i, viewer in enumerate(viewers):
+                viewer.poll()
+                controls = cautious(sim) if i == 0 else 0
+                viewer.send_input(controls, INPUT_RESTART if i == 0 else 0)
+        for viewer in viewers:
+            viewer.poll()
+            received += viewer.bytes_received
+        stats = server.stats()
+        publisher = server.publisher
+        left, top = sim.camera()
+        visible = sum(map(len, sim.visible_entities(left, top)))
+        return {
+            "entities": sim.human_count + sim.enemy_count,
+            "visible": visible,
+            "step_ms": stats["step_ms"],
+            "send_ms": stats["send_ms"],
+            "bytes_per_tick": received / ticks / clients,
+            "full_bytes": len(publisher.message(-1)),
+            "raw_snapshot_bytes": len(sim.snapshot()),
+        }
+    finally:
+        for viewer in viewers:
+            viewer.close()
+        server.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Play Vampire Survival over local sockets")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve = commands.add_parser("serve", help="run the game for networked clients")
+    serve.add_argument("--host", default=LOCALHOST)
+    serve.add_argument("--port", type=int, default=DEFAULT_PORT)
+    serve.add_argument("--world", action="store_true",
+                       help="a large scrolling world instead of a single screen")
+    serve.add_argument("--motion", choices=("tick", "event"), default="tick",
+                       help="how humans are moved (see Simulation)")
+    serve.add_argument("--seed", type=int, default=None, help="default: random")
+
+    connect = commands.add_parser("connect", help="join a server (the first client steers)")
+    connect.add_argument("--host", default=LOCALHOST)
+    connect.add_argument("--port", type=int, default=DEFAULT_PORT)
+    connect.add_argument("--profile", metavar="PATH",
+                         help="profile every frame and write the trace (.csv or .json) on exit")
+
+    bench = commands.add_parser("bench", help="measure bandwidth and server cost on 127.0.0.1")
+    bench.add_argument("--scenarios", default=",".join(BENCH_SCENARIOS),
+                       help="comma-separated vampire_bench scenario names")
+    bench.add_argument("--ticks", type=int, default=FPS * 10)
+    bench.add_argument("--clients", type=int, default=4)
+    bench.add_argument("--json", metavar="PATH", help="write the results here")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        if args.world:
+            from vampire_world import WorldSimulation
+            sim = WorldSimulation(seed=args.seed, motion=args.motion)
+        else:
+            sim = Simulation(seed=args.seed, motion=args.motion)
+        server = GameServer(sim, args.host, args.port)
+        print(f"Serving on {server.address[0]}:{server.address[1]} (Ctrl+C to stop)", flush=True)
+        server.run()
+        return 0
+
+    if args.command == "connect":
+        GameClient(args.host, args.port, profile_path=args.profile).run()
+        return 0
+
+    results = {}
+    print(f"{args.clients} clients, {args.ticks} ticks:")
+    for name in [name.strip() for name in args.scenarios.split(",") if name.strip()]:
+        r = results[name] = bench_scenario(name, args.ticks, args.clients)
+        print(f"  {name:<12}{r['entities']:>7} entities {r['visible']:>7} on screen"
+              f"  {r['bytes_per_tick']:>8.0f} B/tick/client (full {r['full_bytes']:>7})"
+              f"  step {r['step_ms']:>7.2f} ms  send {r['send_ms']:>6.2f} ms")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,408 @@
+#!/usr/bin/env python3
+"""
+Vampire Survival - threaded render pipeline
+
+Game.run does events, simulation ticks and drawing one after another, so
+a slow frame (text, overlays, display.flip) holds up the next tick.
+ThreadedGame splits the loop in two:
+
+- the main thread handles events and runs the fixed-rate simulation, and
+  after every tick captures a RenderFrame: an immutable copy of what
+  Game.draw shows (entity positions at both ends of the tick, sprite
+  colors, HUD values, the game state)
+- a render thread takes the newest frame, draws it through the regular
+  Game.draw interpolated by how far real time is into the next tick, and
+  flips
+
+pygame releases the GIL while it fills, blits and flips, so the two
+overlap, and a slow frame only delays the frames after it, never a tick.
+Both games keep PacingStats: frame times, spacing between ticks, the
+share of ticks that reached the screen and input latency (reading a
+tick's controls to the first flip showing it), printed on exit.
+
+    python vampire_pipeline.py
+    python vampire_pipeline.py --compare --scenario crowd-1k --seconds 5
+
+--compare plays the same bot in the serial and threaded loops
+(headless unless a video driver is set) and prints both reports;
+--draw-delay adds that many milliseconds of GIL-free wait to every
+flip, like a slow display. SDL on macOS only draws from the main thread,
+so ThreadedGame refuses to run there.
+"""
+
+import argparse
+import copy
+import os
+import sys
+import threading
+import time
+from collections import deque
+
+from vampire_game import (
+    FPS, MAX_CATCH_UP_TICKS, GameState, Game,
+    human_sprite, hunter_sprite, vampire_sprite, lazy_import,
+)
+from vampire_profile import percentile
+
+# Loaded once a game opens its window, so --help doesn't start pygame
+pygame = lazy_import("pygame")
+
+PACING_WINDOW = 3000        # Recent frames, ticks and latencies kept for the report
+IDLE_POLL_SECONDS = 0.1     # Render thread wakes this often while no frame arrives
+
+
+class RenderFrame:
+    """Everything Game.draw shows of one tick, copied for another thread
+
+    Duck-types the parts of Simulation that Game.draw, draw_hud and
+    draw_game_over read. Nothing in a frame changes after capture.
+    """
+
+    __slots__ = ("state", "captured", "time_of_day", "sun_width", "cameras", "backdrop",
+                 "vampire", "vampire_positions", "humans", "hunters",
+                 "score", "human_count", "enemy_count", "total_time")
+
+    def __init__(self, sim, state):
+        self.state = state
+        self.captured = time.perf_counter()
+        self.time_of_day = sim.time_of_day
+        self.sun_width = sim.sun_width
+        self.cameras = sim.camera(0.0) + sim.camera(1.0)
+        self.backdrop = sim.backdrop
+        vampire = sim.vampire
+        self.vampire = copy.copy(vampire)   # Form, size and resources for the HUD
+        self.vampire_positions = sim.draw_position(vampire, 0.0) + sim.draw_position(vampire, 1.0)
+        if state == GameState.MENU:
+            self.humans, self.hunters = (), ()
+        else:
+            self.humans, self.hunters = sim.render_entities()
+        self.score = sim.score
+        self.human_count = sim.human_count
+        self.enemy_count = sim.enemy_count
+        self.total_time = sim.total_time
+
+    def camera(self, alpha=1.0):
+        x0, y0, x1, y1 = self.cameras
+        return int(x0 + (x1 - x0) * alpha), int(y0 + (y1 - y0) * alpha)
+
+    def draw_entities(self, screen, sprites, alpha=1.0, camera=(0, 0)):
+        """Blit every entity `alpha` of the way through the tick (sprites only)"""
+        left, top = camera
+        if self.backdrop is not None:
+            self.backdrop(screen, camera, self.time_of_day)
+
+        surface, offset = human_sprite(sprites)
+        dx, dy = offset - left, offset - top
+        batch = [(surface, (int(x0 + (x1 - x0) * alpha) + dx, int(y0 + (y1 - y0) * alpha) + dy))
+                 for x0, y0, x1, y1 in self.humans]
+
+        for x0, y0, x1, y1, color, chasing in self.hunters:
+            surface, offset = hunter_sprite(sprites, color, chasing)
+            batch.append((surface, (int(x0 + (x1 - x0) * alpha) + offset - left,
+                                    int(y0 + (y1 - y0) * alpha) + offset - top)))
+
+        surface, offset = vampire_sprite(sprites, self.vampire)
+        x0, y0, x1, y1 = self.vampire_positions
+        batch.append((surface, (int(x0 + (x1 - x0) * alpha) + offset - left,
+                                int(y0 + (y1 - y0) * alpha) + offset - top)))
+
+        screen.blits(batch, False)
+
+
+class FrameBuffer:
+    """Hands RenderFrames from the simulation thread to the render thread
+
+    Frames are immutable, so double or triple buffering comes down to
+    swapping which frame is newest: the simulation builds the next frame
+    while the renderer draws the last one, neither ever waits for the
+    other, and frames the renderer was too slow for are skipped rather
+    than queued.
+    """
+
+    def __init__(self):
+        self.frame = None
+        self.published = 0
+        self.closed = False
+        self.ready = threading.Condition()
+
+    def publish(self, frame):
+        with self.ready:
+            self.frame = frame
+            self.published += 1
+            self.ready.notify()
+
+    def latest(self, seen=None, timeout=None):
+        """Newest frame; when it is `seen`, first wait up to `timeout` for a newer one"""
+        with self.ready:
+            if seen is not None and self.frame is seen and not self.closed:
+                self.ready.wait(timeout)
+            return self.frame
+
+    def close(self):
+        with self.ready:
+            self.closed = True
+            self.ready.notify_all()
+
+
+def spread(values):
+    """{"p50", "p95", "p99", "max"} of some millisecond values"""
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    return {"p50": percentile(ordered, 50), "p95": percentile(ordered, 95),
+            "p99": percentile(ordered, 99), "max": ordered[-1]}
+
+
+class PacingStats:
+    """Frame pacing and input latency of a game loop
+
+    ticked() is called when a tick has been simulated, with the time its
+    controls were read; flipped() after every display flip, with the
+    newest tick on screen. Safe to call from different threads.
+    """
+
+    def __init__(self, window=PACING_WINDOW):
+        self.input_times = {}               # tick -> when its controls were read
+        self.frame_ms = deque(maxlen=window)
+        self.tick_ms = deque(maxlen=window)
+        self.latency_ms = deque(maxlen=window)
+        self.started = time.perf_counter()
+        self.last_flip = None
+        self.last_tick = None
+        self.last_shown = None
+        self.frames = 0
+        self.ticks = 0
+        self.shown = 0
+
+    def ticked(self, tick, input_time):
+        if self.last_tick is not None:
+            self.tick_ms.append((input_time - self.last_tick) * 1000)
+        self.last_tick = input_time
+        self.input_times[tick] = input_time
+        self.ticks += 1
+
+    def flipped(self, tick):
+        now = time.perf_counter()
+        if self.last_flip is not None:
+            self.frame_ms.append((now - self.last_flip) * 1000)
+        self.last_flip = now
+        self.frames += 1
+        if tick != self.last_shown:
+            self.last_shown = tick
+            input_time = self.input_times.pop(tick, None)
+            if input_time is not None:
+                self.latency_ms.append((now - input_time) * 1000)
+                self.shown += 1
+        if len(self.input_times) > PACING_WINDOW:
+            # Ticks that never made it to the screen
+            for stale in sorted(self.input_times)[:-PACING_WINDOW // 2]:
+                self.input_times.pop(stale, None)
+
+    def summary(self):
+        elapsed = time.perf_counter() - self.started
+        return {
+            "fps": self.frames / elapsed if elapsed > 0 else 0.0,
+            "tps": self.ticks / elapsed if elapsed > 0 else 0.0,
+            "ticks_shown": self.shown / self.ticks if self.ticks else 0.0,
+            "frame_ms": spread(self.frame_ms),
+            "tick_ms": spread(self.tick_ms),
+            "latency_ms": spread(self.latency_ms),
+        }
+
+
+def format_pacing(summary, title="pacing"):
+    """Multi-line report of a PacingStats summary"""
+    lines = [f"{title}: {summary['fps']:.1f} fps, {summary['tps']:.1f} ticks/s, "
+             f"{summary['ticks_shown']:.0%} of ticks shown"]
+    for key, label in (("frame_ms", "frame time"), ("tick_ms", "tick spacing"),
+                       ("latency_ms", "input latency")):
+        s = summary[key]
+        if s is not None:
+            lines.append(f"  {label:<14} p50 {s['p50']:6.2f}  p95 {s['p95']:6.2f}  "
+                         f"p99 {s['p99']:6.2f}  max {s['max']:6.2f} ms")
+    return "\n".join(lines)
+
+
+class PacedGame(Game):
+    """The regular serial Game, keeping PacingStats and reporting them on exit"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.pacing = PacingStats()
+
+    def update(self):
+        started = time.perf_counter()
+        tick = self.sim.total_time
+        super().update()
+        if self.sim.total_time == tick + 1:
+            self.pacing.ticked(self.sim.total_time, started)
+
+    def draw(self, alpha=1.0, view=None, state=None):
+        super().draw(alpha, view, state)
+        self.pacing.flipped((self.sim if view is None else view).total_time)
+
+    def report(self):
+        print(format_pacing(self.pacing.summary(), type(self).__name__))
+
+    def run(self):
+        try:
+            super().run()
+        finally:
+            self.report()
+
+
+class ThreadedGame(PacedGame):
+    """Game that draws RenderFrames on a render thread (see the module docstring)"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.frames = FrameBuffer()
+        self.stopping = threading.Event()
+        self.render_error = None
+
+    def publish(self):
+        self.frames.publish(RenderFrame(self.sim, self.game_state))
+
+    def render_loop(self):
+        """Draw frames until stopped (runs on the render thread)
+
+        A new frame is drawn as soon as it is published; in between, the
+        latest one is redrawn further interpolated at up to render_fps.
+        """
+        interval = 1.0 / self.render_fps if self.render_fps else 0.0
+        tick_seconds = 1.0 / FPS
+        frame = None
+        settled = False     # The frame is on screen as it will stay; wait for a new one
+        next_draw = 0.0
+        try:
+            while not self.stopping.is_set():
+                wait = IDLE_POLL_SECONDS if settled else next_draw - time.perf_counter()
+                newest = self.frames.latest(frame, max(0.0, wait))
+                if newest is None or (newest is frame and settled):
+                    continue
+                frame = newest
+                now = time.perf_counter()
+                next_draw = now + interval
+                alpha = min(1.0, (now - frame.captured) / tick_seconds)
+                self.draw(alpha, frame, frame.state)
+                settled = alpha >= 1.0 and (frame.state != GameState.MENU
+                                            or "menu" in self.cache.layers)
+                if self.profiling:
+                    self.profiler.end_frame(0, frame.human_count, frame.enemy_count,
+                                            self.sim.entity_updates)
+        except BaseException as error:
+            self.render_error = error
+            self.stopping.set()
+
+    def run(self):
+        """Events and fixed-rate ticks here, drawing on the render thread"""
+        if sys.platform == "darwin":
+            raise RuntimeError("SDL on macOS can't draw off the main thread; use Game.run")
+        tick_seconds = 1.0 / FPS
+        next_tick = time.perf_counter()
+        self.publish()
+        renderer = threading.Thread(target=self.render_loop, name="render", daemon=True)
+        renderer.start()
+
+        try:
+            while not self.stopping.is_set():
+                state = self.game_state
+                if not self.handle_events():
+                    break
+
+                ticks = 0
+                now = time.perf_counter()
+                while now >= next_tick and ticks < MAX_CATCH_UP_TICKS:
+                    self.update()
+                    next_tick += tick_seconds
+                    ticks += 1
+                if now >= next_tick:
+                    next_tick = now     # Too far behind: drop the backlog, slow down
+                if ticks or self.game_state != state:
+                    self.publish()
+
+                self.stopping.wait(max(0.0, next_tick - time.perf_counter()))
+        except Exception:
+            self.dump_history()
+            raise
+        finally:
+            self.stopping.set()
+            self.frames.close()
+            renderer.join()
+            self.close()
+            self.report()
+        if self.render_error is not None:
+            raise self.render_error
+
+
+class Measured:
+    """Mixin for --compare: starts playing, plays forever, can slow down flips"""
+
+    draw_delay = 0.0    # Seconds added after every flip
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.game_state = GameState.PLAYING
+        self.start_state = self.sim.snapshot()
+
+    def update(self):
+        super().update()
+        if self.game_state == GameState.GAME_OVER:
+            self.sim.restore(self.start_state)
+            self.game_state = GameState.PLAYING
+
+    def draw(self, alpha=1.0, view=None, state=None):
+        super().draw(alpha, view, state)
+        if self.draw_delay:
+            time.sleep(self.draw_delay)
+
+
+class MeasuredSerialGame(Measured, PacedGame):
+    pass
+
+
+class MeasuredThreadedGame(Measured, ThreadedGame):
+    pass
+
+
+def measure(game_class, scenario, seconds, draw_delay):
+    """Play the forager bot in `scenario` for `seconds` with one kind of game loop"""
+    from vampire_batch import forager
+    from vampire_bench import scenario_setup
+    from vampire_replay import build_simulation
+
+    game = game_class(build_simulation(scenario_setup(scenario)), controls=forager,
+                      rewind_seconds=0)
+    game.draw_delay = draw_delay / 1000
+    pygame.time.set_timer(pygame.QUIT, int(seconds * 1000), 1)
+    game.run()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Vampire Survival with a render thread")
+    parser.add_argument("--world", action="store_true", help="play in the large scrolling world")
+    parser.add_argument("--compare", action="store_true",
+                        help="measure the serial and threaded loops with a bot")
+    parser.add_argument("--scenario", default="default",
+                        help="vampire_bench scenario for --compare (default: default)")
+    parser.add_argument("--seconds", type=float, default=5.0, help="time per loop for --compare")
+    parser.add_argument("--draw-delay", type=float, default=0.0, metavar="MS",
+                        help="extra GIL-free time per flip for --compare, like a slow display")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+        for game_class in (MeasuredSerialGame, MeasuredThreadedGame):
+            measure(game_class, args.scenario, args.seconds, args.draw_delay)
+        return 0
+
+    sim = None
+    if args.world:
+        from vampire_world import WorldSimulation
+        sim = WorldSimulation()
+    ThreadedGame(sim).run()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
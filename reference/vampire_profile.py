@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Vampire Survival - frame profiler
+
+FrameProfiler times the phases of each frame: event handling, the
+simulation phases (chunk streaming, vampire, humans, enemies, collisions,
+feeding, the day/night population swap) and the draw functions. It keeps rolling
+p50/p95/p99 timings, entity counts and entity updates per tick, draws an
+overlay graph in-game and dumps the per-frame trace to JSON or CSV.
+
+Phases are timed by wrapping the Game's and Simulation's phase methods on
+the instances while the profiler is attached; detach() removes the
+wrappers, so a game that isn't being profiled runs the plain methods at
+no cost. Toggle it in-game with F3, or start with it on:
+
+    python vampire_game.py --profile trace.csv
+"""
+
+import csv
+import json
+import time
+from collections import deque
+
+from vampire_game import FPS, lazy_import
+
+# Only the overlay needs pygame; dumping and reading traces don't
+pygame = lazy_import("pygame")
+
+# method name -> phase name, for the Game and its Simulation
+GAME_PHASES = {
+    "handle_events": "events",
+    "update": "update",
+    "draw": "draw",
+    "draw_menu": "draw_menu",
+    "draw_hud": "draw_hud",
+    "draw_game_over": "draw_game_over",
+}
+SIM_PHASES = {
+    "update_vampire": "vampire",
+    "update_humans": "humans",
+    "update_enemies": "enemies",
+    "resolve_collisions": "collisions",
+    "feed": "feeding",
+    "spawn_day": "day_night",
+    "spawn_night": "day_night",
+    "stream_chunks": "streaming",
+    "draw_entities": "draw_entities",
+}
+PHASES = ("events", "update", "streaming", "vampire", "humans", "enemies", "collisions",
+          "feeding", "day_night", "draw", "draw_entities", "draw_hud", "draw_menu",
+          "draw_game_over")
+
+# Overlay graph: top-level phases stacked per frame, in these colors
+GRAPH_PHASES = (("events", (120, 120, 255)), ("update", (100, 255, 100)),
+                ("draw", (255, 160, 60)))
+GRAPH_FRAMES = 120
+GRAPH_HEIGHT = 80
+GRAPH_MS = 20.0                 # Frame time at the top of the graph
+OVERLAY_REFRESH_FRAMES = 15     # Percentile text is re-rendered this often
+OVERLAY_COLUMNS = (10, 130, 190, 250)   # x of the phase, p50, p95 and p99 columns
+
+
+def percentile(ordered, p):
+    """Nearest-rank percentile of an already sorted list"""
+    return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))]
+
+
+class FrameProfiler:
+    """Per-phase frame timings with rolling percentiles and a trace"""
+
+    def __init__(self, window=300, max_trace=100000):
+        self.window = deque(maxlen=window)      # Recent frames, for percentiles
+        self.trace = deque(maxlen=max_trace)    # Every frame, for dumps
+        self.current = {}                       # phase -> seconds so far this frame
+        self.frame_start = None
+        self.frames = 0
+        self.attached = []                      # (instance, method names) we wrapped
+        self.overlay = None
+        self.font = None
+
+    # Instrumentation
+
+    def timed(self, phase, method):
+        """Wrap a bound method so its run time is added to `phase`"""
+        clock = time.perf_counter
+        current = self.current
+
+        def wrapper(*args, **kwargs):
+            start = clock()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                current[phase] = current.get(phase, 0.0) + clock() - start
+        return wrapper
+
+    def wrap(self, instance, phases):
+        names = [name for name in phases if hasattr(instance, name)]
+        for name in names:
+            setattr(instance, name, self.timed(phases[name], getattr(instance, name)))
+        self.attached.append((instance, names))
+
+    def attach(self, game):
+        """Start timing a Game and its Simulation"""
+        self.detach()
+        self.wrap(game, GAME_PHASES)
+        self.wrap(game.sim, SIM_PHASES)
+        self.frame_start = time.perf_counter()
+
+    def detach(self):
+        """Remove every wrapper, restoring the plain methods"""
+        for instance, names in self.attached:
+            for name in names:
+                instance.__dict__.pop(name, None)
+        self.attached = []
+
+    def end_frame(self, ticks, humans, hunters, updates=0):
+        """Close the current frame and record it
+
+        `updates` is the simulation's entity_updates for its latest tick.
+        """
+        now = time.perf_counter()
+        if self.frame_start is None:
+            self.frame_start = now
+            return
+        record = {phase: seconds * 1000 for phase, seconds in self.current.items()}
+        record["frame"] = (now - self.frame_start) * 1000
+        record["ticks"] = ticks
+        record["human_count"] = humans
+        record["hunter_count"] = hunters
+        record["entity_updates"] = updates
+        self.current.clear()
+        self.frame_start = now
+        self.frames += 1
+        self.window.append(record)
+        self.trace.append(record)
+
+    # Reporting
+
+    def stats(self):
+        """{phase: {"p50", "p95", "p99", "max"}} in ms over the recent frames it ran in"""
+        stats = {}
+        for phase in ("frame",) + PHASES:
+            ordered = sorted(r[phase] for r in self.window if phase in r)
+            if ordered:
+                stats[phase] = {"p50": percentile(ordered, 50), "p95": percentile(ordered, 95),
+                                "p99": percentile(ordered, 99), "max": ordered[-1]}
+        return stats
+
+    def dump(self, path):
+        """Write the per-frame trace as CSV (.csv) or JSON (anything else)"""
+        frames = list(self.trace)
+        if path.endswith(".csv"):
+            columns = ["frame", "ticks", "human_count", "hunter_count", "entity_updates"] + [
+                phase for phase in PHASES if any(phase in r for r in frames)]
+            with open(path, "w", newline="") as f:
+                writer = csv.DictWriter(f, columns, restval=0.0)
+                writer.writeheader()
+                writer.writerows(frames)
+        else:
+            with open(path, "w") as f:
+                json.dump({"stats": self.stats(), "frames": frames}, f)
+
+    def draw_overlay(self, screen):
+        """Stacked per-frame phase graph plus a percentile table, top left; the rect it covers"""
+        if self.overlay is None or self.frames % OVERLAY_REFRESH_FRAMES == 0:
+            self.overlay = self.build_overlay()
+        area = screen.blit(self.overlay, (10, 10))
+
+        # Graph is redrawn every frame so it scrolls smoothly
+        left, bottom = 20, 20 + GRAPH_HEIGHT
+        scale = GRAPH_HEIGHT / GRAPH_MS
+        frames = list(self.window)[-GRAPH_FRAMES:]
+        for i, record in enumerate(frames):
+            y = bottom
+            for phase, color in GRAPH_PHASES:
+                height = min(y - (bottom - GRAPH_HEIGHT), int(record.get(phase, 0.0) * scale))
+                if height > 0:
+                    y -= height
+                    screen.fill(color, (left + 2 * i, y, 2, height))
+        budget_y = bottom - int(1000 / FPS * scale)  # One tick's worth of time
+        pygame.draw.line(screen, (255, 60, 60), (left, budget_y),
+                         (left + 2 * GRAPH_FRAMES, budget_y))
+        return area
+
+    def build_overlay(self):
+        if self.font is None:
+            self.font = pygame.font.Font(None, 18)
+        stats = self.stats()
+        rows = [("phase (ms)", "p50", "p95", "p99")]
+        for phase in ("frame",) + PHASES:
+            if phase in stats:
+                s = stats[phase]
+                rows.append((phase, f"{s['p50']:.2f}", f"{s['p95']:.2f}", f"{s['p99']:.2f}"))
+        footer = ""
+        if self.window:
+            last = self.window[-1]
+            footer = (f"humans {last['human_count']}  hunters {last['hunter_count']}  "
+                      f"updates {last['entity_updates']}  ticks {last['ticks']}")
+
+        line_height = self.font.get_linesize()
+        panel = pygame.Surface((2 * GRAPH_FRAMES + 70, GRAPH_HEIGHT + 30 + line_height * (len(rows) + 1)))
+        panel.set_alpha(200)
+        panel.fill((0, 0, 0))
+        y = GRAPH_HEIGHT + 20
+        for row in rows:
+            for x, cell in zip(OVERLAY_COLUMNS, row):
+                panel.blit(self.font.render(cell, True, (230, 230, 230)), (x, y))
+            y += line_height
+        panel.blit(self.font.render(footer, True, (230, 230, 230)), (OVERLAY_COLUMNS[0], y))
+        return panel
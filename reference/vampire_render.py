@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Vampire Survival - render caches
+
+Rendering text and allocating surfaces every frame is most of the frame
+time on low-power machines. RenderCache keeps:
+  - an LRU cache of rendered text surfaces keyed by (font, text, color,
+    antialias), so unchanged labels are blitted instead of re-rendered
+  - named static layers (menu page, overlays, hints) that are built once
+    by a callback and reused until invalidated
+
+SpriteCache rasterizes each visual variant of an entity once into a
+transparent sprite, so a frame becomes one Surface.blits() call instead
+of several draw calls per entity.
+
+DirtyScreen stands in for the display surface in dirty-rect mode: it
+notes the rect of everything blitted through it, so the next frame can
+restore just those rects from a saved background and push only them to
+the display with pygame.display.update(rects).
+
+pygame is only imported once a sprite is painted, so headless code can
+import this module for free.
+"""
+
+import time
+from collections import OrderedDict
+
+
+class RenderCache:
+    """LRU text-surface cache plus build-once static layers"""
+
+    def __init__(self, max_text=256):
+        self.max_text = max_text
+        self.text_surfaces = OrderedDict()
+        self.layers = {}
+        self.partial = {}   # name -> (build generator, surface so far)
+        self.hits = 0
+        self.misses = 0
+
+    def text(self, font, text, color, antialias=True):
+        """Rendered surface for a string, re-rendered only on a cache miss"""
+        key = (font, text, color, antialias)
+        surface = self.text_surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.text_surfaces.move_to_end(key)
+            return surface
+
+        self.misses += 1
+        surface = font.render(text, antialias, color)
+        self.text_surfaces[key] = surface
+        if len(self.text_surfaces) > self.max_text:
+            self.text_surfaces.popitem(last=False)
+        return surface
+
+    def layer(self, name, build):
+        """Static surface `name`, built by calling build() the first time"""
+        surface = self.layers.get(name)
+        if surface is None:
+            surface = self.layers[name] = build()
+        return surface
+
+    def layer_in_steps(self, name, build, budget):
+        """Static surface `name`, built a piece at a time across calls
+
+        build() returns a generator yielding the surface after each piece.
+        Each call runs it for up to `budget` seconds (at least one piece)
+        and returns the surface so far; once the generator finishes the
+        surface is cached like layer().
+        """
+        surface = self.layers.get(name)
+        if surface is not None:
+            return surface
+
+        steps, surface = self.partial.pop(name, (None, None))
+        if steps is None:
+            steps = build()
+        deadline = time.perf_counter() + budget
+        for surface in steps:
+            if time.perf_counter() >= deadline:
+                self.partial[name] = (steps, surface)
+                return surface
+        self.layers[name] = surface
+        return surface
+
+    def invalidate(self, name=None):
+        """Forget one static layer, or every cached surface"""
+        if name is None:
+            self.layers.clear()
+            self.partial.clear()
+            self.text_surfaces.clear()
+        else:
+            self.layers.pop(name, None)
+            self.partial.pop(name, None)
+
+
+# Transparent sprite background - no entity is ever drawn in this color
+SPRITE_COLORKEY = (255, 0, 255)
+
+
+class SpriteCache:
+    """Pre-rasterized entity sprites keyed by visual variant
+
+    Entities are hard-edged circles, so transparency is a colorkey rather
+    than per-pixel alpha: RLE-accelerated colorkey blits give the same
+    pixels several times faster than alpha blending them.
+    """
+
+    def __init__(self):
+        self.sprites = {}
+
+    def get(self, key, radius, paint, *args):
+        """(surface, offset) for a variant, painting it on first use
+
+        paint(surface, center, *args) draws the variant around `center`;
+        blit the surface at (x + offset, y + offset) to center it on (x, y).
+        `radius` must cover everything paint() draws.
+        """
+        sprite = self.sprites.get(key)
+        if sprite is None:
+            import pygame
+            margin = radius + 1
+            surface = pygame.Surface((2 * margin + 1, 2 * margin + 1))
+            surface.fill(SPRITE_COLORKEY)
+            paint(surface, (margin, margin), *args)
+            if pygame.display.get_surface() is not None:
+                surface = surface.convert()
+            surface.set_colorkey(SPRITE_COLORKEY, pygame.RLEACCEL)
+            sprite = self.sprites[key] = (surface, -margin)
+        return sprite
+
+
+# More rects than this drawn in a frame and a full redraw is cheaper
+DIRTY_RECT_LIMIT = 300
+
+
+class DirtyScreen:
+    """Display surface wrapper that tracks what changed between frames
+
+    A full redraw calls start() once the background is on the screen (it
+    is copied), then draws entities through this object with blit() and
+    blits(). A later frame showing the same background calls erase(),
+    draws the entities the same way and the HUD over them, then pushes
+    updates(). Anything drawn straight onto the screen (pygame.draw, fill)
+    is not tracked.
+    """
+
+    def __init__(self, screen, limit=DIRTY_RECT_LIMIT):
+        self.screen = screen
+        self.limit = limit
+        self.background = None  # Screen under the entities, from the last full redraw
+        self.key = None         # What the background shows; None until start()
+        self.rects = []         # Rects drawn through this object since start() or erase()
+        self.erased = []        # Rects drawn the frame before, erased by erase()
+        self.hud = []           # (surface, position) of the elements drawn over the entities
+        self.hud_changed = []   # HUD rects, old and new, of elements that changed in erase()
+
+    def __getattr__(self, name):
+        return getattr(self.screen, name)
+
+    def blit(self, source, dest, area=None, special_flags=0):
+        rect = self.screen.blit(source, dest, area, special_flags)
+        self.rects.append(rect)
+        return rect
+
+    def blits(self, blit_sequence, doreturn=True):
+        rects = self.screen.blits(blit_sequence, True)
+        self.rects.extend(rects)
+        return rects if doreturn else None
+
+    def current(self, key):
+        """Can a frame showing `key` be drawn over the last one by erasing?"""
+        return self.key is not None and self.key == key and len(self.rects) <= self.limit
+
+    def start(self, key):
+        """Keep the screen as drawn so far as the background of `key`"""
+        self.background = self.screen.copy()
+        self.key = key
+        self.rects = []
+
+    def invalidate(self):
+        """Make the next frame a full redraw (another screen was shown, the window was exposed)"""
+        self.background = self.key = None
+        self.rects = []
+
+    def erase(self, hud):
+        """Restore the background under the last frame's rects and every HUD element
+
+        `hud` is this frame's (surface, position) list. HUD text is alpha
+        blended, so all of it is redrawn on fresh background every frame,
+        but updates() only pushes the elements that changed or that an
+        entity moved under.
+        """
+        changed = []
+        for (surface, position), (old_surface, old_position) in zip(hud, self.hud):
+            if surface is not old_surface or position != old_position:
+                changed.append(old_surface.get_rect(topleft=old_position))
+                changed.append(surface.get_rect(topleft=position))
+        self.hud_changed = changed
+        self.hud = hud
+
+        erased = self.rects + [surface.get_rect(topleft=position) for surface, position in hud]
+        background = self.background
+        self.screen.blits([(background, rect, rect) for rect in erased + changed], False)
+        self.erased = self.rects
+        self.rects = []
+
+    def updates(self):
+        """Rects that may differ on screen from the last frame, for pygame.display.update()"""
+        moved = self.erased + self.rects
+        covered = [rect for rect in (surface.get_rect(topleft=position)
+                                     for surface, position in self.hud)
+                   if rect.collidelist(moved) != -1]
+        return moved + self.hud_changed + covered
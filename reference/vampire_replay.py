@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+Vampire Survival - deterministic recording and replay
+
+A recording holds the simulation setup (including its RNG seed), one
+input byte per tick (the INPUT_* bitmask for W/A/S/D/E/F) and a full-state
+keyframe every keyframe_interval ticks. Because the simulation is seeded
+and driven only by those inputs, replaying them reproduces the session
+exactly, and seeking to any tick only re-simulates from the nearest
+keyframe before it.
+
+File layout (little-endian): the magic b"VAMPREPL", a uint32 length and a
+JSON header, then a stream of blocks. Each block is a one-byte tag, a
+uint32 tick and a uint32 payload length. Tag I carries that many input
+bytes starting at the tick; tag K carries a Simulation.snapshot() of the
+state before the tick is simulated; tag R (no payload) marks a rewind to
+the tick, dropping the inputs and keyframes after it. Blocks are flushed
+as they are written, so a recording cut short by a crash is still
+readable up to its last block.
+
+Usage:
+  python vampire_replay.py record session.vrep [--seed N]
+  python vampire_replay.py play session.vrep [--tick N] [--headless]
+  python vampire_replay.py info session.vrep
+"""
+
+import argparse
+import json
+import random
+import struct
+import sys
+import time
+
+from vampire_game import (
+    FPS, GameState, Game, Simulation, lazy_import, read_controls,
+    INPUT_UP, INPUT_DOWN, INPUT_LEFT, INPUT_RIGHT, INPUT_BAT, INPUT_FEED,
+)
+
+# Only playing with a window touches pygame; headless replays never load it
+pygame = lazy_import("pygame")
+
+MAGIC = b"VAMPREPL"
+FORMAT_VERSION = 8  # Bumped whenever the simulation rules or the block format change
+KEYFRAME_INTERVAL = FPS * 10    # One keyframe per 10 seconds of game time
+INPUT_BITS = INPUT_UP | INPUT_DOWN | INPUT_LEFT | INPUT_RIGHT | INPUT_BAT | INPUT_FEED
+
+BLOCK = struct.Struct("<cII")   # tag, tick, payload length
+BLOCK_INPUTS = b"I"
+BLOCK_KEYFRAME = b"K"
+BLOCK_REWIND = b"R"
+
+
+def describe_simulation(sim):
+    """JSON-able setup needed to rebuild a simulation like `sim`"""
+    setup = {
+        "backend": sim.backend,
+        "seed": sim.seed,
+        "day_humans": sim.day_humans,
+        "day_hunters": sim.day_hunters,
+        "night_humans": sim.night_humans,
+        "night_hunters": sim.night_hunters,
+        "index": sim.index,
+        "motion": sim.motion,
+    }
+    if sim.backend == "world":
+        setup["world"] = [sim.width, sim.height]
+    if sim.backend == "sharded":
+        setup["shards"] = sim.shards
+    return setup
+
+
+def build_simulation(setup):
+    """Simulation matching a describe_simulation() dict"""
+    populations = (setup["day_humans"], setup["day_hunters"],
+                   setup["night_humans"], setup["night_hunters"])
+    if setup["backend"] == "crowd":
+        from vampire_crowd import CrowdSimulation  # Needs numpy
+        return CrowdSimulation(*populations, seed=setup["seed"])
+    if setup["backend"] == "sharded":
+        from vampire_shard import ShardedSimulation  # Needs numpy
+        return ShardedSimulation(*populations, seed=setup["seed"], shards=setup.get("shards"))
+    if setup["backend"] == "world":
+        from vampire_world import WorldSimulation
+        width, height = setup["world"]
+        return WorldSimulation(*populations, width=width, height=height,
+                               index=setup["index"], seed=setup["seed"], motion=setup["motion"])
+    return Simulation(*populations, index=setup["index"], seed=setup["seed"],
+                      motion=setup["motion"])
+
+
+class Recorder:
+    """Streams a seeded simulation's inputs and keyframes to a file
+
+    Call record(sim, controls) once per tick, before stepping. A rewind
+    (Game holding R) drops the inputs after the tick it went back to and
+    carries on in the same file. If the simulation jumps anywhere else,
+    e.g. a game loaded mid-way, the file is restarted, so it always holds
+    the latest game.
+    """
+
+    def __init__(self, path, keyframe_interval=KEYFRAME_INTERVAL):
+        self.path = path
+        self.keyframe_interval = keyframe_interval
+        self.file = None
+        self.ticks = 0
+        self.start_time = 0
+        self.pending = bytearray()
+
+    def start(self, sim):
+        if sim.seed is None:
+            raise ValueError("Recording needs a seeded Simulation (Simulation(seed=...))")
+        self.close()
+        self.file = open(self.path, "wb")
+        self.ticks = 0
+        self.start_time = sim.total_time
+        header = dict(describe_simulation(sim), version=FORMAT_VERSION,
+                      start_time=self.start_time, keyframe_interval=self.keyframe_interval)
+        header = json.dumps(header).encode()
+        self.file.write(MAGIC + struct.pack("<I", len(header)) + header)
+
+    def write_block(self, tag, tick, payload):
+        self.file.write(BLOCK.pack(tag, tick, len(payload)))
+        self.file.write(payload)
+        self.file.flush()
+
+    def flush_inputs(self):
+        if self.pending:
+            self.write_block(BLOCK_INPUTS, self.ticks - len(self.pending), bytes(self.pending))
+            self.pending.clear()
+
+    def rewind(self, tick):
+        """Forget the inputs from `tick` on, to record them again"""
+        first_pending = self.ticks - len(self.pending)
+        if tick >= first_pending:
+            del self.pending[tick - first_pending:]
+        else:
+            self.pending.clear()
+            self.write_block(BLOCK_REWIND, tick, b"")
+        self.ticks = tick
+
+    def record(self, sim, controls):
+        """Log the input for the tick `sim` is about to simulate"""
+        tick = sim.total_time - self.start_time
+        if self.file is None or not 0 <= tick <= self.ticks:
+            self.start(sim)  # First tick, or a game this recording didn't lead to
+        elif tick < self.ticks:
+            # Rewound. A reset reseeds, so it lands on tick 0 the same way
+            self.rewind(tick)
+        if self.ticks % self.keyframe_interval == 0:
+            self.flush_inputs()
+            self.write_block(BLOCK_KEYFRAME, self.ticks, sim.snapshot())
+        self.pending.append(controls & INPUT_BITS)
+        self.ticks += 1
+
+    def recording(self, source):
+        """Wrap a controls callable so every tick it returns is recorded"""
+        def controls(sim):
+            flags = source(sim)
+            self.record(sim, flags)
+            return flags
+        return controls
+
+    def close(self):
+        if self.file is not None:
+            self.flush_inputs()
+            self.file.close()
+            self.file = None
+
+
+class Replay:
+    """A loaded recording that can rebuild, seek and drive a simulation"""
+
+    def __init__(self, path):
+        self.inputs = bytearray()
+        self.keyframes = {}     # tick -> state blob
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} is not a Vampire Survival recording")
+            (length,) = struct.unpack("<I", f.read(4))
+            self.header = json.loads(f.read(length))
+            if self.header["version"] != FORMAT_VERSION:
+                raise ValueError(f"Unsupported recording version {self.header['version']}")
+
+            while True:
+                raw = f.read(BLOCK.size)
+                if len(raw) < BLOCK.size:
+                    break
+                tag, tick, length = BLOCK.unpack(raw)
+                payload = f.read(length)
+                if len(payload) < length:
+                    break  # Truncated by a crash - keep what we have
+                if tag == BLOCK_INPUTS and tick == len(self.inputs):
+                    self.inputs += payload
+                elif tag == BLOCK_KEYFRAME:
+                    self.keyframes[tick] = payload
+                elif tag == BLOCK_REWIND and tick <= len(self.inputs):
+                    del self.inputs[tick:]
+                    for later in [t for t in self.keyframes if t > tick]:
+                        del self.keyframes[later]
+
+        self.start_time = self.header["start_time"]
+        self.keyframe_ticks = sorted(self.keyframes)
+
+    def __len__(self):
+        return len(self.inputs)
+
+    def simulation(self, tick=0):
+        """New simulation positioned at `tick` of the recording"""
+        sim = build_simulation(self.header)
+        return self.seek(sim, tick)
+
+    def seek(self, sim, tick):
+        """Move `sim` to `tick` by restoring the nearest earlier keyframe"""
+        tick = max(0, min(tick, len(self)))
+        keyframe = max(t for t in self.keyframe_ticks if t <= tick)
+        sim.restore(self.keyframes[keyframe])
+        controls = self.controls
+        for _ in range(tick - keyframe):
+            sim.step(controls(sim))
+        return sim
+
+    def controls(self, sim):
+        """Recorded input for the tick `sim` is about to simulate"""
+        tick = sim.total_time - self.start_time
+        return self.inputs[tick] if 0 <= tick < len(self.inputs) else 0
+
+    def play(self, sim):
+        """Run `sim` headlessly to the end of the recording"""
+        remaining = len(self) - (sim.total_time - self.start_time)
+        return sim.fast_forward(max(0, remaining), policy=self.controls)
+
+
+def keyboard(sim):
+    return read_controls(pygame.key.get_pressed())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Record and replay Vampire Survival sessions")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    record = commands.add_parser("record", help="play the game and record it")
+    record.add_argument("path")
+    record.add_argument("--seed", type=int, default=None, help="default: random")
+    record.add_argument("--keyframe-interval", type=int, default=KEYFRAME_INTERVAL,
+                        help="ticks between keyframes")
+
+    play = commands.add_parser("play", help="replay a recording")
+    play.add_argument("path")
+    play.add_argument("--tick", type=int, default=0, help="start from this tick")
+    play.add_argument("--headless", action="store_true", help="simulate without a window")
+
+    info = commands.add_parser("info", help="describe a recording")
+    info.add_argument("path")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "record":
+        seed = args.seed if args.seed is not None else random.randrange(2 ** 32)
+        recorder = Recorder(args.path, args.keyframe_interval)
+        game = Game(Simulation(seed=seed), controls=recorder.recording(keyboard))
+        try:
+            game.run()
+        finally:
+            recorder.close()
+        print(f"Recorded {recorder.ticks} ticks (seed {seed}) to {args.path}")
+        return 0
+
+    replay = Replay(args.path)
+
+    if args.command == "info":
+        print(json.dumps(replay.header, indent=2))
+        print(f"Ticks: {len(replay)} ({len(replay) / FPS:.1f} s), keyframes: {len(replay.keyframes)}")
+        return 0
+
+    started = time.perf_counter()
+    sim = replay.simulation(args.tick)
+    print(f"Seeked to tick {args.tick} in {(time.perf_counter() - started) * 1000:.1f} ms")
+
+    if args.headless:
+        replay.play(sim)
+        print(f"Tick {sim.total_time}: score {sim.score}, health {sim.vampire.health:.1f}, "
+              f"blood {sim.vampire.blood:.1f}, game over: {sim.game_over} ({sim.cause_of_death})")
+    else:
+        game = Game(sim, controls=replay.controls)
+        game.game_state = GameState.GAME_OVER if sim.game_over else GameState.PLAYING
+        game.run()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
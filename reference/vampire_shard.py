@@ -0,0 +1,592 @@
+#!/usr/bin/env python3
+"""
+Vampire Survival - crowd simulation sharded across worker processes
+(experimental)
+
+ShardedSimulation splits the crowd playfield into vertical strips, one
+per shard, and steps each strip's humans and hunters in its own worker
+process with the NumPy crowd rules (EntityStore). Entity state lives in
+one multiprocessing.shared_memory block: per shard, a fixed-capacity
+column for every EntityStore array plus the positions before the latest
+tick, and an outbox of the same columns. Nothing is pickled per tick.
+
+A tick goes:
+
+1. the main process runs the vampire (Simulation.update_vampire), writes
+   its position and the time of day into the control block and meets
+   the workers at the tick barrier
+2. each worker steps its entities, then moves the ones that walked out
+   of its strip into its outbox, tagged with the shard they belong to
+3. after the workers' exchange barrier, each worker appends the outbox
+   rows addressed to it: the halo of entities crossing strip borders
+4. the workers meet the main process at the tick barrier again, and it
+   resolves collisions and feeding (CrowdSimulation rules) against the
+   shared arrays of the strips around the vampire only
+
+Crowd entities never interact with each other, only with the vampire,
+so crossing entities are handed over outright; no shard needs read-only
+copies of its neighbours' rows. Drawing, telemetry and snapshots gather
+the shards' columns when they are asked for.
+
+Every worker has its own random generator (seeded from the simulation
+seed and its shard), so runs differ from CrowdSimulation and from other
+shard counts. Snapshots carry every worker's generator state, passed
+through the shared block, so restore, rewind and replay seeking continue
+exactly; restore into a simulation with the same shard count.
+
+Experimental: scaling with cores is unmeasured. The main process meets
+the workers at the tick barrier twice a tick (once to start them, once
+to collect the result), and the workers meet each other once more for
+the exchange, which a single shard skips. On a single-CPU machine, at
+200k humans and 20k hunters, one shard runs at about 0.8x the plain
+NumPy crowd (136 vs 166 ticks/s) and two shards at about 0.5x.
+`python vampire_shard.py` on a machine with more cores is what decides
+whether sharding pays off there.
+
+Columns are sized for the whole population in every shard (hunters all
+crowd into the vampire's strip), but shared memory pages are only
+backed once touched, so unused capacity costs address space, not RAM.
+
+    sim = ShardedSimulation(day_humans=200000, day_hunters=20000, seed=1, shards=4)
+    sim.fast_forward(600)
+    sim.close()
+
+    python vampire_game.py --shards 4
+    python vampire_shard.py --humans 200000 --hunters 20000 --shards 1,2,4
+"""
+
+import argparse
+import multiprocessing
+import multiprocessing.connection
+import os
+import sys
+import threading
+import time
+import traceback
+import weakref
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+from vampire_game import (
+    SCREEN_WIDTH, SCREEN_HEIGHT, FEED_RANGE, ENEMY_RADIUS, NAV_CELL_SIZE, SUN_ZONE_WIDTH,
+    INPUT_RIGHT, INPUT_FEED, TimeOfDay, VampireForm,
+)
+from vampire_crowd import HUMAN_SPEED, STORE_ARRAYS, EntityStore, CrowdSimulation
+from vampire_nav import NavGrid, Navigator
+
+# Shard columns: the EntityStore arrays plus positions before the latest tick
+HUMAN_COLUMNS = tuple((name, dtype) for name, dtype in STORE_ARRAYS if name.startswith("h")) + (
+    ("hpx", np.float64), ("hpy", np.float64))
+HUNTER_COLUMNS = tuple((name, dtype) for name, dtype in STORE_ARRAYS if name.startswith("e")) + (
+    ("epx", np.float64), ("epy", np.float64))
+OUTBOX_DEST = ("dest", np.int32)    # Extra outbox column: the shard a row moves to
+PREVIOUS_OF = {"hpx": "hx", "hpy": "hy", "epx": "ex", "epy": "ey"}
+
+# Control block: the command and tick inputs the main process hands the workers
+COMMAND, VAMPIRE_X, VAMPIRE_Y, NIGHT = range(4)
+CONTROL_SIZE = 4
+STEP, STOP, SAVE_RNG, LOAD_RNG = 1.0, 0.0, 2.0, 3.0
+
+# Per shard generator state in the block: PCG64 state and increment as
+# (low, high) 64-bit halves, then has_uint32 and uinteger
+RNG_WORDS = 6
+
+# Rows of the counts block, one column per shard
+HUMANS, HUNTERS, HUMANS_OUT, HUNTERS_OUT = range(4)
+
+WORKER_TIMEOUT = 60.0   # Seconds to wait at a barrier before giving up on the workers
+FIELD_ALIGNMENT = 64    # Arrays in the block start on cache lines
+
+
+class SharedState:
+    """Control block, entity counts and every shard's columns and outbox in one SharedMemory
+
+    The main process creates the block (name=None); workers attach to it
+    by name. humans[s]/hunters[s] map column names to shard s's
+    full-capacity arrays; its live rows are the first counts[HUMANS, s]
+    (counts[HUNTERS, s]). human_outbox[s]/hunter_outbox[s] add the "dest"
+    column. rng[s] holds shard s's generator state while a snapshot is
+    taken or restored.
+    """
+
+    def __init__(self, shards, human_capacity, hunter_capacity, name=None):
+        fields = [("control", np.float64, CONTROL_SIZE), ("counts", np.int64, 4 * shards),
+                  ("rng", np.uint64, RNG_WORDS * shards)]
+        for shard in range(shards):
+            for kind, columns, capacity in (("humans", HUMAN_COLUMNS, human_capacity),
+                                            ("hunters", HUNTER_COLUMNS, hunter_capacity)):
+                fields += [((kind, shard, name), dtype, capacity) for name, dtype in columns]
+                fields += [(("out", kind, shard, name), dtype, capacity)
+                           for name, dtype in columns + (OUTBOX_DEST,)]
+        offsets = []
+        size = 0
+        for _, dtype, count in fields:
+            size += -size % FIELD_ALIGNMENT
+            offsets.append(size)
+            size += np.dtype(dtype).itemsize * count
+
+        if name is None:
+            self.memory = SharedMemory(create=True, size=max(size, 1))
+        else:
+            # Spawned workers share the main process's resource tracker, so
+            # attaching re-registers the same name and the owner's unlink
+            # clears it; workers must not unregister it themselves
+            self.memory = SharedMemory(name)
+        self.name = self.memory.name
+
+        views = {key: np.ndarray(count, dtype, self.memory.buf, offset)
+                 for (key, dtype, count), offset in zip(fields, offsets)}
+        self.control = views.pop("control")
+        self.counts = views.pop("counts").reshape(4, shards)
+        self.rng = views.pop("rng").reshape(shards, RNG_WORDS)
+        self.humans, self.hunters, self.human_outbox, self.hunter_outbox = (
+            [{} for _ in range(shards)] for _ in range(4))
+        for key, view in views.items():
+            if key[0] == "out":
+                _, kind, shard, column = key
+                outboxes = self.human_outbox if kind == "humans" else self.hunter_outbox
+                outboxes[shard][column] = view
+            else:
+                kind, shard, column = key
+                (self.humans if kind == "humans" else self.hunters)[shard][column] = view
+
+    def close(self, unlink=False):
+        """Drop the views and detach (and with `unlink`, free the block)"""
+        self.control = self.counts = self.rng = None
+        self.humans = self.hunters = self.human_outbox = self.hunter_outbox = None
+        try:
+            self.memory.close()
+        except BufferError:
+            pass    # Someone still holds a view; the mapping goes away with it
+        if unlink:
+            self.memory.unlink()
+
+
+def generator_words(rng):
+    """A NumPy PCG64 generator's state as RNG_WORDS unsigned 64-bit words"""
+    state = rng.bit_generator.state
+    value, increment = state["state"]["state"], state["state"]["inc"]
+    mask = (1 << 64) - 1
+    return np.array([value & mask, value >> 64, increment & mask, increment >> 64,
+                     state["has_uint32"], state["uinteger"]], dtype=np.uint64)
+
+
+def set_generator_words(rng, words):
+    """Put a generator back into a generator_words() state"""
+    value_low, value_high, increment_low, increment_high, has_uint32, uinteger = (
+        int(word) for word in words)
+    bit_generator = rng.bit_generator
+    bit_generator.state = {
+        "bit_generator": bit_generator.state["bit_generator"],
+        "state": {"state": value_high << 64 | value_low,
+                  "inc": increment_high << 64 | increment_low},
+        "has_uint32": has_uint32,
+        "uinteger": uinteger,
+    }
+
+
+def strip_of(x, shards):
+    """Shard owning each x position: vertical strips of equal width"""
+    # floor(x * shards / SCREEN_WIDTH) exactly as // would give it, at a
+    # quarter of the cost: the division can only round up onto the next strip
+    scaled = x * shards
+    owner = (scaled / SCREEN_WIDTH).astype(np.intp)
+    owner -= owner * SCREEN_WIDTH > scaled
+    return np.clip(owner, 0, shards - 1, out=owner)
+
+
+def compact(columns, count, keep):
+    """Keep the rows flagged in boolean `keep` among the first `count`, in order; the new count"""
+    kept = int(keep.sum())
+    if kept < count:
+        for column in columns.values():
+            column[:kept] = column[:count][keep]
+    return kept
+
+
+def append_rows(columns, count, source, rows):
+    """Copy `rows` of another set of columns after the first `count`; the new count"""
+    end = count + len(rows)
+    for name, column in columns.items():
+        column[count:end] = source[name][rows]
+    return end
+
+
+def bind(store, columns, count):
+    """Point an EntityStore's arrays at the live rows of shard columns"""
+    for name, column in columns.items():
+        setattr(store, name, column[:count])
+
+
+def run_worker(shard, name, shards, human_capacity, hunter_capacity, seed,
+               tick_barrier, exchange_barrier):
+    """Worker process: attach to the shared block and step one shard until told to stop"""
+    state = SharedState(shards, human_capacity, hunter_capacity, name)
+    try:
+        step_shard(state, shard, seed, tick_barrier, exchange_barrier)
+    except threading.BrokenBarrierError:
+        pass    # Another worker failed or the main process gave up
+    except BaseException:
+        traceback.print_exc()
+        tick_barrier.abort()
+        exchange_barrier.abort()
+    finally:
+        state.close()
+
+
+def step_shard(state, shard, seed, tick_barrier, exchange_barrier):
+    """Tick loop of one shard (see the module docstring)"""
+    shards = len(state.humans)
+    store = EntityStore(np.random.default_rng(None if seed is None else (seed, shard)))
+    nav = Navigator(NavGrid(SCREEN_WIDTH, SCREEN_HEIGHT, NAV_CELL_SIZE, SUN_ZONE_WIDTH))
+    control, counts = state.control, state.counts
+    humans, hunters = state.humans[shard], state.hunters[shard]
+    kinds = ((HUMANS, HUMANS_OUT, "hx", state.humans, state.human_outbox),
+             (HUNTERS, HUNTERS_OUT, "ex", state.hunters, state.hunter_outbox))
+    while True:
+        tick_barrier.wait()
+        command = control[COMMAND]
+        if command == STOP:
+            return
+        if command != STEP:
+            # A snapshot being taken or restored, between ticks
+            if command == SAVE_RNG:
+                state.rng[shard] = generator_words(store.rng)
+            else:
+                set_generator_words(store.rng, state.rng[shard])
+            tick_barrier.wait()
+            continue
+        vampire_x, vampire_y = control[VAMPIRE_X], control[VAMPIRE_Y]
+        is_night = bool(control[NIGHT])
+
+        human_count, hunter_count = counts[HUMANS, shard], counts[HUNTERS, shard]
+        humans["hpx"][:human_count] = humans["hx"][:human_count]
+        humans["hpy"][:human_count] = humans["hy"][:human_count]
+        hunters["epx"][:hunter_count] = hunters["ex"][:hunter_count]
+        hunters["epy"][:hunter_count] = hunters["ey"][:hunter_count]
+        bind(store, humans, human_count)
+        bind(store, hunters, hunter_count)
+        store.update_humans()
+        nav.set_goal(vampire_x, vampire_y, is_night)
+        store.update_hunters(vampire_x, vampire_y, is_night, nav)
+        hunters["echasing"][:hunter_count] = store.echasing   # Rebound, not updated in place
+        if shards == 1:
+            tick_barrier.wait()     # A single strip has no borders to hand anything over
+            continue
+
+        # Hand entities that left the strip to the shards they walked into
+        for count_row, out_row, x_name, shard_columns, outboxes in kinds:
+            columns, outbox = shard_columns[shard], outboxes[shard]
+            count = counts[count_row, shard]
+            dest = strip_of(columns[x_name][:count], shards)
+            leaving = dest != shard
+            moved = int(leaving.sum())
+            if moved:
+                rows = np.flatnonzero(leaving)
+                for column_name, column in columns.items():
+                    outbox[column_name][:moved] = column[rows]
+                outbox["dest"][:moved] = dest[rows]
+                counts[count_row, shard] = compact(columns, count, ~leaving)
+            counts[out_row, shard] = moved
+        exchange_barrier.wait()
+
+        for count_row, out_row, _, shard_columns, outboxes in kinds:
+            columns = shard_columns[shard]
+            for other in range(shards):
+                moved = counts[out_row, other]
+                if other == shard or not moved:
+                    continue
+                rows = np.flatnonzero(outboxes[other]["dest"][:moved] == shard)
+                if len(rows):
+                    counts[count_row, shard] = append_rows(
+                        columns, counts[count_row, shard], outboxes[other], rows)
+        tick_barrier.wait()
+
+
+def watch_workers(workers, tick_barrier, stopping):
+    """Break the tick barrier as soon as a worker dies, so the main process can't hang on it"""
+    multiprocessing.connection.wait([worker.sentinel for worker in workers])
+    if not stopping.is_set():
+        tick_barrier.abort()
+
+
+def stop_workers(state, tick_barrier, workers, stopping):
+    """Tell the workers to exit, wait for them and free the shared block"""
+    stopping.set()
+    if any(worker.is_alive() for worker in workers):
+        state.control[COMMAND] = STOP
+        try:
+            tick_barrier.wait(WORKER_TIMEOUT)
+        except threading.BrokenBarrierError:
+            pass
+    for worker in workers:
+        worker.join(WORKER_TIMEOUT)
+        if worker.is_alive():
+            worker.terminate()
+    state.close(unlink=True)
+
+
+class ShardedSimulation(CrowdSimulation):
+    """CrowdSimulation whose humans and hunters are stepped by one worker process per strip
+
+    Experimental (see the module docstring): runs don't match
+    CrowdSimulation's, and scaling with cores is unmeasured. `shards`
+    defaults to one per CPU. Call close() (or let the object be
+    collected) to stop the workers and free the shared memory.
+    """
+
+    backend = "sharded"
+
+    # Columns gathered for drawing and telemetry
+    VIEW_COLUMNS = ("hx", "hy", "hpx", "hpy", "ex", "ey", "epx", "epy", "ehealth", "echasing")
+
+    def __init__(self, day_humans=10, day_hunters=3, night_humans=4, night_hunters=6,
+                 seed=None, shards=None):
+        self.shards = shards or os.cpu_count() or 1
+        human_capacity = max(day_humans, night_humans)
+        hunter_capacity = max(day_hunters, night_hunters)
+        self.state = SharedState(self.shards, human_capacity, hunter_capacity)
+        context = multiprocessing.get_context("spawn")
+        self.tick_barrier = context.Barrier(self.shards + 1)
+        self.exchange_barrier = context.Barrier(self.shards)
+        self.workers = [
+            context.Process(target=run_worker, name=f"vampire-shard-{shard}", daemon=True,
+                            args=(shard, self.state.name, self.shards, human_capacity,
+                                  hunter_capacity, seed, self.tick_barrier,
+                                  self.exchange_barrier))
+            for shard in range(self.shards)]
+        for worker in self.workers:
+            worker.start()
+        stopping = threading.Event()
+        threading.Thread(target=watch_workers, args=(self.workers, self.tick_barrier, stopping),
+                         name="shard-watch", daemon=True).start()
+        self.finalizer = weakref.finalize(self, stop_workers, self.state, self.tick_barrier,
+                                          self.workers, stopping)
+        self.gathered = set()   # VIEW_COLUMNS (or all) currently copied into self.store
+        super().__init__(day_humans, day_hunters, night_humans, night_hunters, seed=seed)
+
+    def close(self):
+        self.finalizer()
+
+    @property
+    def human_count(self):
+        return int(self.state.counts[HUMANS].sum())
+
+    @property
+    def enemy_count(self):
+        return int(self.state.counts[HUNTERS].sum())
+
+    def changed(self):
+        """Shard columns were written; gathered copies are stale"""
+        self.gathered = set()
+
+    def gather(self, names=VIEW_COLUMNS):
+        """Copy shard columns into self.store (and previous positions into previous_arrays)"""
+        state = self.state
+        for name in names:
+            if name in self.gathered:
+                continue
+            kind, row = (state.humans, HUMANS) if name[0] == "h" else (state.hunters, HUNTERS)
+            value = np.concatenate([kind[shard][name][:state.counts[row, shard]]
+                                    for shard in range(self.shards)])
+            setattr(self.store, name, value)
+            self.gathered.add(name)
+        if "hpx" in names:
+            store = self.store
+            self.previous_arrays = (store.hpx, store.hpy, store.epx, store.epy)
+
+    def scatter(self):
+        """Deal self.store's entities out to the shards owning their positions"""
+        state, store = self.state, self.store
+        for kind, row, x, columns in ((state.humans, HUMANS, store.hx, HUMAN_COLUMNS),
+                                      (state.hunters, HUNTERS, store.ex, HUNTER_COLUMNS)):
+            owners = strip_of(x, self.shards)
+            for shard in range(self.shards):
+                rows = np.flatnonzero(owners == shard)
+                for name, _ in columns:
+                    # Dealt entities start still: their previous position is the current one
+                    kind[shard][name][:len(rows)] = getattr(store, PREVIOUS_OF.get(name, name))[rows]
+                state.counts[row, shard] = len(rows)
+        self.changed()
+
+    def spawn_day(self):
+        super().spawn_day()
+        self.scatter()
+
+    def spawn_night(self):
+        self.gather([name for name, _ in STORE_ARRAYS if name[0] == "h"])
+        super().spawn_night()
+        self.scatter()
+
+    def update_humans(self):
+        """Nothing here: workers step humans together with the hunters (update_enemies)"""
+
+    def update_enemies(self):
+        vampire = self.vampire
+        control = self.state.control
+        control[VAMPIRE_X], control[VAMPIRE_Y] = vampire.x, vampire.y
+        control[NIGHT] = self.time_of_day == TimeOfDay.NIGHT
+        self.command(STEP)
+        self.changed()
+        self.entity_updates += self.human_count + self.enemy_count
+
+    def command(self, command):
+        """Have every worker carry out `command` (STEP, SAVE_RNG or LOAD_RNG)"""
+        self.state.control[COMMAND] = command
+        self.wait()     # Workers start on it...
+        self.wait()     # ...and are done with it (a tick's exchange included)
+
+    def wait(self):
+        try:
+            self.tick_barrier.wait(WORKER_TIMEOUT)
+        except threading.BrokenBarrierError:
+            raise RuntimeError("A shard worker stopped; see its traceback above") from None
+
+    def strips_near(self, x, reach):
+        """Shards whose strips come within `reach` of x"""
+        first, last = strip_of(np.array([x - reach, x + reach]), self.shards).tolist()
+        return range(first, last + 1)
+
+    def resolve_collisions(self):
+        state = self.state
+        vampire = self.vampire
+        reach = vampire.radius + ENEMY_RADIUS
+        damage = 2 if vampire.form == VampireForm.BAT else 0.5
+        hit_count = kills = 0
+        for shard in self.strips_near(vampire.x, reach):
+            hunters, count = state.hunters[shard], state.counts[HUNTERS, shard]
+            hits = np.hypot(hunters["ex"][:count] - vampire.x,
+                            hunters["ey"][:count] - vampire.y) < reach
+            hits_here = int(hits.sum())
+            if not hits_here:
+                continue
+            # Same per-collision damage as Simulation.hit_enemy, applied at once
+            hit_count += hits_here
+            health = hunters["ehealth"][:count]
+            health[hits] -= damage
+            dead = hits & (health <= 0)
+            if dead.any():
+                state.counts[HUNTERS, shard] = compact(hunters, count, ~dead)
+                kills += count - state.counts[HUNTERS, shard]
+            self.changed()
+        if not hit_count:
+            return
+        vampire.health -= 0.5 * hit_count
+        if kills:
+            self.score += 50 * kills
+            self.hunters_killed += kills
+
+    def feed(self):
+        state, store = self.state, self.store
+        vampire = self.vampire
+        for shard in self.strips_near(vampire.x, FEED_RANGE):
+            humans, count = state.humans[shard], state.counts[HUMANS, shard]
+            near = np.flatnonzero(np.hypot(humans["hx"][:count] - vampire.x,
+                                           humans["hy"][:count] - vampire.y) < FEED_RANGE)
+            if not len(near):
+                continue
+            vampire.feed(self.FEED_BLOOD)
+            self.score += 10
+            # Respawn in the same slot, like EntityStore.respawn_human; if the
+            # new spot is in another strip the owner hands it over next tick
+            i = near[0]
+            x, y = store.random_positions(1)
+            direction = store.rng.uniform(0, 2 * np.pi)
+            humans["hx"][i] = humans["hpx"][i] = x[0]
+            humans["hy"][i] = humans["hpy"][i] = y[0]
+            humans["hdir"][i] = direction
+            humans["hstep_x"][i] = np.cos(direction) * HUMAN_SPEED
+            humans["hstep_y"][i] = np.sin(direction) * HUMAN_SPEED
+            humans["htimer"][i] = 0
+            self.changed()
+            return
+
+    def save_positions(self):
+        # Workers keep every entity's previous position; only the vampire's is ours
+        self.previous_positions = {self.vampire: (self.vampire.x, self.vampire.y)}
+
+    def interpolated(self, alpha):
+        self.gather()
+        return super().interpolated(alpha)
+
+    def entity_columns(self):
+        self.gather()
+        return super().entity_columns()
+
+    def pack_entities(self):
+        # The crowd section, then every worker's generator state
+        self.gather([name for name, _ in STORE_ARRAYS])
+        self.command(SAVE_RNG)
+        return super().pack_entities() + [self.state.rng.tobytes()]
+
+    def unpack_entities(self, view, offset, human_count, enemy_count):
+        offset = super().unpack_entities(view, offset, human_count, enemy_count)
+        rng = self.state.rng
+        end = offset + rng.nbytes
+        if end != len(view):
+            raise ValueError(f"Snapshot is not from a {self.shards}-shard simulation")
+        rng[:] = np.frombuffer(view, np.uint64, rng.size, offset).reshape(rng.shape)
+        self.command(LOAD_RNG)
+        self.scatter()
+        return end
+
+
+def measure(humans, hunters, shards, seconds, seed=1):
+    """Ticks/second of a sharded (or, with shards=0, plain crowd) simulation"""
+    from vampire_bench import BENCH_HEALTH
+    if shards:
+        sim = ShardedSimulation(humans, hunters, humans, hunters, seed=seed, shards=shards)
+    else:
+        sim = CrowdSimulation(humans, hunters, humans, hunters, seed=seed)
+    try:
+        sim.step(INPUT_RIGHT)   # Workers are up and warmed before timing
+        # Kept alive so ticks are measured rather than restarts (see vampire_bench)
+        vampire = sim.vampire
+        vampire.max_health = BENCH_HEALTH
+        clock = time.perf_counter
+        started = clock()
+        untimed = 0.0
+        ticks = 0
+        while ticks < 3 or clock() - started - untimed < seconds:
+            sim.step(INPUT_RIGHT | INPUT_FEED if ticks % 2 else INPUT_RIGHT)
+            vampire.blood, vampire.health = vampire.max_blood, vampire.max_health
+            if sim.game_over:
+                reset = clock()
+                sim.reset()
+                vampire = sim.vampire
+                vampire.max_health = BENCH_HEALTH
+                untimed += clock() - reset
+            ticks += 1
+        return ticks / (clock() - started - untimed)
+    finally:
+        if shards:
+            sim.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Sharded crowd simulation throughput (experimental; see the module docstring)")
+    parser.add_argument("--humans", type=int, default=200000)
+    parser.add_argument("--hunters", type=int, default=20000)
+    parser.add_argument("--shards", default=None,
+                        help="comma-separated shard counts to measure (default: 1,2,4... up to the CPUs)")
+    parser.add_argument("--seconds", type=float, default=3.0, help="time per measurement")
+    args = parser.parse_args(argv)
+
+    if args.shards:
+        counts = [int(count) for count in args.shards.split(",")]
+    else:
+        cpus = os.cpu_count() or 1
+        counts = [1 << i for i in range(cpus.bit_length()) if 1 << i <= cpus]
+    print(f"{args.humans} humans, {args.hunters} hunters, {os.cpu_count()} CPUs")
+    baseline = measure(args.humans, args.hunters, 0, args.seconds)
+    print(f"  crowd (1 process) {baseline:>8.1f} ticks/s")
+    for count in counts:
+        tps = measure(args.humans, args.hunters, count, args.seconds)
+        print(f"  {count:>2} shards        {tps:>8.1f} ticks/s  ({tps / baseline:.2f}x)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+Vampire Survival - spatial indexes
+
+SpatialGrid is a uniform grid over the playfield that is kept up to date
+as entities move (move() only touches the grid when an entity changes
+cell) and answers radius and pairwise-overlap queries by looking at the
+few cells around a point instead of every entity. Only occupied cells are
+stored, so a grid over a huge world costs no more than its entities.
+
+BruteForceIndex has the same interface and scans everything. It is the
+reference the grid is checked against: both read positions from the
+entities' x/y attributes, use the same distance test and return results
+in the order of their `items` list, so they give identical answers.
+
+Each index owns the ordered list of its entities (`items`), which the
+simulation uses as its entity list. Inserts append; remove() is an O(1)
+swap-remove, the last item moving into the removed item's place.
+
+TrajectoryIndex wraps either one for entities that move on their own
+between events (LazyHuman): it is their clock, and steps them only on the
+ticks their next turn or bounce is due.
+"""
+
+import heapq
+import math
+
+
+def within(item, x, y, radius):
+    """Same distance test the game has always used for range checks"""
+    return math.sqrt((item.x - x) ** 2 + (item.y - y) ** 2) < radius
+
+
+def swap_remove(items, position, item):
+    """Remove `item` from a list in O(1) by moving the last item into its slot
+
+    `position` maps every item to its index in `items` and is kept in step.
+    """
+    i = position.pop(item)
+    last = items.pop()
+    if last is not item:
+        items[i] = last
+        position[last] = i
+
+
+class BruteForceIndex:
+    """Reference index - linear scans over every entity"""
+
+    tracks_moves = False    # move() does nothing, so callers may skip it
+
+    def __init__(self):
+        self.items = []
+        self.position = {}  # item -> index in self.items
+
+    def __len__(self):
+        return len(self.items)
+
+    def rebuild(self, items):
+        """Replace the contents with `items`, in order"""
+        self.items = list(items)
+        self.position = {item: i for i, item in enumerate(self.items)}
+
+    def insert(self, item):
+        self.position[item] = len(self.items)
+        self.items.append(item)
+
+    def remove(self, item):
+        swap_remove(self.items, self.position, item)
+
+    def move(self, item):
+        pass  # Positions are read at query time
+
+    def query_radius(self, x, y, radius):
+        """Entities strictly closer than radius to (x, y), in list order"""
+        sqrt = math.sqrt    # within(), inlined
+        return [item for item in self.items if sqrt((item.x - x) ** 2 + (item.y - y) ** 2) < radius]
+
+    def overlapping_pairs(self, radius):
+        """(a, b) pairs of entities closer than radius, a listed before b"""
+        items = self.items
+        return [(a, b) for i, a in enumerate(items) for b in items[i + 1:]
+                if within(b, a.x, a.y, radius)]
+
+    def overlapping_pairs_with(self, other, radius):
+        """(a, b) pairs with a from this index and b from `other`"""
+        return [(a, b) for a in self.items for b in other.query_radius(a.x, a.y, radius)]
+
+
+class SpatialGrid:
+    """Uniform-grid spatial hash over a width x height field
+
+    Items are bucketed by their position at insert() or move(). `reach` is
+    how far an item may have moved since then; queries look that much
+    further out.
+    """
+
+    tracks_moves = True
+
+    def __init__(self, width, height, cell_size, reach=0):
+        self.cell_size = cell_size
+        self.reach = reach
+        self.cols = max(1, math.ceil(width / cell_size))
+        self.rows = max(1, math.ceil(height / cell_size))
+        self.clear()
+
+    def __len__(self):
+        return len(self.items)
+
+    def clear(self):
+        self.cells = {}     # cell number -> {item: None}, occupied cells only
+        self.cell_of = {}   # item -> cell number
+        self.items = []
+        self.position = {}  # item -> index in self.items
+
+    def rebuild(self, items):
+        """Replace the contents with `items`, in order"""
+        self.clear()
+        for item in items:
+            self.insert(item)
+
+    def col(self, x):
+        return min(self.cols - 1, max(0, int(x // self.cell_size)))
+
+    def row(self, y):
+        return min(self.rows - 1, max(0, int(y // self.cell_size)))
+
+    def cell(self, x, y):
+        col = int(x // self.cell_size)
+        row = int(y // self.cell_size)
+        if 0 <= col < self.cols and 0 <= row < self.rows:
+            return row * self.cols + col
+        return self.row(y) * self.cols + self.col(x)  # Clamp strays to the border
+
+    def insert(self, item):
+        cell = self.cell(item.x, item.y)
+        bucket = self.cells.get(cell)
+        if bucket is None:
+            bucket = self.cells[cell] = {}
+        bucket[item] = None
+        self.cell_of[item] = cell
+        self.position[item] = len(self.items)
+        self.items.append(item)
+
+    def remove(self, item):
+        self.leave(self.cell_of.pop(item), item)
+        swap_remove(self.items, self.position, item)
+
+    def leave(self, cell, item):
+        bucket = self.cells[cell]
+        del bucket[item]
+        if not bucket:
+            del self.cells[cell]
+
+    def move(self, item):
+        """Re-bucket an entity after its position changed"""
+        cell = self.cell(item.x, item.y)
+        old = self.cell_of[item]
+        if cell != old:
+            self.leave(old, item)
+            bucket = self.cells.get(cell)
+            if bucket is None:
+                bucket = self.cells[cell] = {}
+            bucket[item] = None
+            self.cell_of[item] = cell
+
+    def query_radius(self, x, y, radius):
+        """Entities strictly closer than radius to (x, y), in list order"""
+        reach = radius + self.reach
+        col_lo, col_hi = self.col(x - reach), self.col(x + reach)
+        row_lo, row_hi = self.row(y - reach), self.row(y + reach)
+
+        # With few entities or a huge radius, visiting the cells costs more
+        # than testing everything in list order
+        if (col_hi - col_lo + 1) * (row_hi - row_lo + 1) >= len(self.items):
+            return [item for item in self.items if within(item, x, y, radius)]
+
+        bucket_at = self.cells.get
+        cols = self.cols
+        found = []
+        for row in range(row_lo, row_hi + 1):
+            base = row * cols
+            for cell in range(base + col_lo, base + col_hi + 1):
+                bucket = bucket_at(cell)
+                if bucket:
+                    for item in bucket:
+                        if within(item, x, y, radius):
+                            found.append(item)
+        if len(found) > 1:
+            found.sort(key=self.position.__getitem__)
+        return found
+
+    def overlapping_pairs(self, radius):
+        """(a, b) pairs of entities closer than radius, a listed before b"""
+        position = self.position
+        pairs = []
+        for rank, a in enumerate(self.items):
+            for b in self.query_radius(a.x, a.y, radius):
+                if position[b] > rank:
+                    pairs.append((a, b))
+        return pairs
+
+    def overlapping_pairs_with(self, other, radius):
+        """(a, b) pairs with a from this grid and b from `other`"""
+        return [(a, b) for a in self.items for b in other.query_radius(a.x, a.y, radius)]
+
+
+class TrajectoryIndex:
+    """Index and clock for entities that only need stepping at their events
+
+    Wraps a BruteForceIndex or SpatialGrid (which must have a `reach` of
+    at least how far an entity moves between events) and keeps a priority
+    queue of (tick, sequence, entity) for the next event of every entity.
+    advance() moves the clock one tick and calls advance() on just the
+    entities due, in list order - the order a per-tick loop would have
+    visited them, so their random draws happen in the same order too.
+
+    Entities provide rebase(clock), next_event(width, height) and
+    advance(width, height), and an `event` attribute holding the sequence
+    number of their queued event; queue entries that no longer match it
+    are stale and skipped.
+    """
+
+    tracks_moves = False
+
+    def __init__(self, index, width, height):
+        self.index = index
+        self.width = width
+        self.height = height
+        self.now = 0
+        self.events = []
+        self.sequence = 0
+
+    def __len__(self):
+        return len(self.index.items)
+
+    @property
+    def items(self):
+        return self.index.items
+
+    @property
+    def position(self):
+        return self.index.position
+
+    def schedule(self, item):
+        self.sequence += 1
+        item.event = self.sequence
+        heapq.heappush(self.events, (item.next_event(self.width, self.height), self.sequence, item))
+
+    def rebuild(self, items):
+        """Replace the contents with `items`, in order"""
+        items = list(items)
+        for item in items:
+            item.rebase(self)
+        self.index.rebuild(items)
+        self.events = []
+        for item in items:
+            self.schedule(item)
+
+    def insert(self, item):
+        item.rebase(self)
+        self.index.insert(item)
+        self.schedule(item)
+
+    def remove(self, item):
+        self.index.remove(item)
+        item.event = None
+
+    def move(self, item):
+        pass    # Entities move along their trajectories without being stepped
+
+    def query_radius(self, x, y, radius):
+        """Entities strictly closer than radius to (x, y), in list order"""
+        return self.index.query_radius(x, y, radius)
+
+    def advance(self):
+        """Move the clock one tick and step the entities due; returns how many were"""
+        self.now += 1
+        events = self.events
+        due = []
+        while events and events[0][0] <= self.now:
+            _, sequence, item = heapq.heappop(events)
+            if item.event == sequence:
+                due.append(item)
+        if len(due) > 1:
+            due.sort(key=self.index.position.__getitem__)
+        width, height, move = self.width, self.height, self.index.move
+        for item in due:
+            item.advance(width, height)
+            move(item)
+            self.schedule(item)
+        return len(due)
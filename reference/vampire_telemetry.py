@@ -0,0 +1,687 @@
+#!/usr/bin/env python3
+"""
+Vampire Survival - per-tick telemetry traces
+
+TelemetryWriter records the whole simulation after every tick: the
+vampire (position, blood, energy, health, form), the clock and score,
+and every human's and hunter's position and state. Rows go into
+preallocated NumPy columns; every chunk_ticks ticks the filled chunk is
+handed to a background thread that compresses and appends it while the
+game keeps writing into the next free buffer. A fixed pool of buffers
+bounds memory however long the session runs; if the disk can't keep up,
+record() waits for a buffer instead of queueing more.
+
+Recording is far from free, which is why it only runs when asked for
+(Game's telemetry_path, `vampire_game.py --telemetry`). On a single
+core, `bench` measures the following:
+- Object backend, 10k entities: record() costs about 1.1 ms of a 15 ms
+  tick (+7%), and the writer thread 0.8 ms of CPU (+5%). The
+  free-running loop is about 20% slower.
+- Event-driven motion: every lazy position has to be evaluated, so
+  record() alone adds about +30% and the loop about +50%.
+- Default population: fixed costs dominate a 24 us tick, and the loop
+  runs about 55% slower.
+- NumPy backend: ticks are so cheap that compressing 10k positions a
+  tick costs several times the tick.
+The "raw" codec takes almost all of the writer thread's share away (the
+loop is +9% at 10k objects) at about four times the disk space.
+
+Columns are stored in three tables: TICK_COLUMNS (one row per tick),
+HUMAN_COLUMNS and HUNTER_COLUMNS (one row per entity per tick, in the
+order of the tick's `humans`/`hunters` counts). Positions are float32.
+Rows are numbered in recording order: the `tick` column starts over when
+a game restarts and steps back after a rewind, so readers seek by row.
+
+File layout (little-endian): the magic b"VAMPTELE", a uint32 length and a
+JSON header (simulation setup, codec, column names and dtypes), then
+chunks. A chunk is CHUNK (tag, first row, tick rows, human rows, hunter
+rows), a uint32 stored length per column and the columns, each starting
+on an 8-byte boundary. close() appends an index of the chunks and a
+TRAILER; a trace cut short by a crash has neither and is read by walking
+the chunks up to the last complete one.
+
+The "zlib" codec byte-shuffles each column (all first bytes, then all
+second bytes...) before compressing, which groups the slowly changing
+high bytes together. Entity positions are first turned into fixed point
+(1/POSITION_SCALE pixel) and, while a population keeps its size, into
+differences from the same row a tick earlier: a few pixels at most, so
+after zigzag encoding nearly every high byte is zero. Float noise in the
+low bits of positions would otherwise leave them barely compressible.
+"raw" stores columns as they are, so TelemetryReader hands them out as
+read-only views of the memory-mapped file without copying anything.
+
+    python vampire_game.py --telemetry session.vtel
+    python vampire_telemetry.py info session.vtel
+    python vampire_telemetry.py bench --scenario crowd-10k --seconds 5
+
+Reading streams chunk by chunk, decoding only the columns asked for:
+
+    with TelemetryReader("session.vtel") as trace:
+        for chunk in trace.chunks(columns={"ticks": ["score"]}):
+            ...
+        for row, tick, humans, hunters in trace.frames(start=3600):
+            ...
+"""
+
+import argparse
+import itertools
+import json
+import mmap
+import queue
+import struct
+import sys
+import threading
+import time
+import zlib
+
+import numpy as np
+
+from vampire_game import FPS, VampireForm, TimeOfDay
+from vampire_replay import describe_simulation
+
+MAGIC = b"VAMPTELE"
+FORMAT_VERSION = 1
+CHUNK_TICKS = FPS * 2       # Ticks per chunk: about 2 seconds of play
+BUFFER_COUNT = 3            # Chunks in memory: one filling, the rest queued or being written
+COMPRESSION_LEVEL = 1       # zlib level; higher barely shrinks float columns and costs much more
+ALIGNMENT = 8               # Column payloads start on multiples of this in the file
+POSITION_SCALE = 256        # zlib codec: entity positions are kept to 1/256 pixel
+STAGED_ROWS = 4096          # Entity rows record() stages before copying them into the columns
+
+CHUNK = struct.Struct("<4sQIII")    # tag, first row, tick rows, human rows, hunter rows
+CHUNK_TAG = b"CHNK"
+INDEX_ENTRY = struct.Struct("<QQI")  # chunk offset, first row, tick rows
+TRAILER = struct.Struct("<QI8s")     # index offset, chunk count, end magic
+TRAILER_MAGIC = b"VTELEND\0"
+
+TICK_COLUMNS = (
+    ("tick", "<u4"), ("night", "u1"), ("game_over", "u1"),
+    ("x", "<f4"), ("y", "<f4"), ("blood", "<f4"), ("energy", "<f4"), ("health", "<f4"),
+    ("bat", "u1"), ("bat_duration", "<u2"), ("score", "<i4"),
+    ("humans", "<u4"), ("hunters", "<u4"),
+)
+HUMAN_COLUMNS = (("x", "<f4"), ("y", "<f4"))
+HUNTER_COLUMNS = (("x", "<f4"), ("y", "<f4"), ("health", "<f4"), ("chasing", "u1"))
+TABLES = (("ticks", TICK_COLUMNS), ("humans", HUMAN_COLUMNS), ("hunters", HUNTER_COLUMNS))
+POSITION_COLUMNS = ("x", "y")   # Entity columns the zlib codec delta-encodes
+# Tick columns holding each entity table's rows per tick
+COUNT_COLUMNS = {table: [name for name, _ in TICK_COLUMNS].index(table)
+                 for table in ("humans", "hunters")}
+CODECS = ("zlib", "raw")
+
+
+def padding(offset):
+    """Bytes needed after `offset` to reach the next ALIGNMENT boundary"""
+    return -offset % ALIGNMENT
+
+
+def count_runs(counts):
+    """(first row, ticks, count) of each run of ticks with the same entity count
+
+    Within a run, rows line up tick to tick: the run is a (ticks, count)
+    block with one column per entity slot.
+    """
+    counts = counts.tolist()
+    start = i = 0
+    while i < len(counts):
+        j = i + 1
+        while j < len(counts) and counts[j] == counts[i]:
+            j += 1
+        yield start, j - i, counts[i]
+        start += (j - i) * counts[i]
+        i = j
+
+
+def encode_positions(values, counts, scale):
+    """Fixed-point positions as zigzagged differences from the row a tick earlier"""
+    fixed = np.rint(values * scale).astype(np.int32)
+    deltas = fixed.copy()
+    for start, ticks, count in count_runs(counts):
+        block = fixed[start:start + ticks * count].reshape(ticks, count)
+        np.subtract(block[1:], block[:-1],
+                    out=deltas[start + count:start + ticks * count].reshape(ticks - 1, count))
+    return ((deltas << 1) ^ (deltas >> 31)).view(np.uint32)
+
+
+def decode_positions(zigzag, counts, scale):
+    """Inverse of encode_positions, as float32"""
+    fixed = (zigzag >> 1).view(np.int32) ^ -(zigzag & 1).view(np.int32)
+    for start, ticks, count in count_runs(counts):
+        block = fixed[start:start + ticks * count].reshape(ticks, count)
+        np.cumsum(block, axis=0, out=block)
+    return (fixed / scale).astype(np.float32)
+
+
+class EntityTable:
+    """One chunk's growable columns of an entity table
+
+    record() only stages each tick's lists of Python values; fill() copies
+    what is staged into the columns with one struct.pack_into per column,
+    which converts floats about 1.5 times faster than assigning a list to
+    an array and pays the per-call cost once for many ticks. The game
+    thread fills once STAGED_ROWS rows are waiting, so staging keeps few
+    objects alive; the writer thread fills the rest after the hand-off.
+    Arrays (from the NumPy backends) are copied right away. Columns start
+    empty and double whenever a chunk needs more rows, then keep their
+    size, so a table stops allocating once it has seen the biggest
+    population.
+    """
+
+    def __init__(self, columns):
+        self.columns = [np.empty(0, dtype) for _, dtype in columns]
+        self.staged = []    # One tick's values (a list per column) per entry
+        self.rows = 0       # Rows so far, staged ones included
+        self.filled = 0     # Rows already in the columns
+
+    def clear(self):
+        self.staged.clear()
+        self.rows = self.filled = 0
+
+    def reserve(self, rows):
+        """Grow the columns to hold at least `rows` rows"""
+        columns = self.columns
+        if rows > len(columns[0]):
+            size = max(rows, 2 * len(columns[0]))
+            for i, column in enumerate(columns):
+                grown = np.empty(size, column.dtype)
+                grown[:self.filled] = column[:self.filled]
+                columns[i] = grown
+
+    def append(self, values):
+        """Add one tick's rows (a list or array per column)"""
+        if isinstance(values[0], list):
+            self.staged.append(values)
+            self.rows += len(values[0])
+            if self.rows - self.filled > STAGED_ROWS:
+                self.fill()
+        else:
+            self.fill()
+            end = self.rows + len(values[0])
+            self.reserve(end)
+            for column, value in zip(self.columns, values):
+                column[self.rows:end] = value
+            self.rows = self.filled = end
+
+    def fill(self):
+        """Copy the staged rows into the columns"""
+        if not self.staged:
+            return
+        self.reserve(self.rows)
+        count = self.rows - self.filled
+        for column, lists in zip(self.columns, zip(*self.staged)):
+            values = lists[0] if len(lists) == 1 else list(itertools.chain.from_iterable(lists))
+            struct.pack_into(f"<{count}{column.dtype.char}", column,
+                             self.filled * column.itemsize, *values)
+        self.staged.clear()
+        self.filled = self.rows
+
+
+class ChunkBuffer:
+    """Preallocated columns for one chunk of ticks
+
+    Tick columns hold chunk_ticks rows. The game thread only appends each
+    tick's values to `rows` as a tuple, and to the EntityTables; fill()
+    finishes the columns on the writer thread.
+    """
+
+    def __init__(self, chunk_ticks):
+        self.ticks = [np.empty(chunk_ticks, dtype) for _, dtype in TICK_COLUMNS]
+        self.rows = []          # Tick values, one tuple per tick, until fill()
+        self.humans = EntityTable(HUMAN_COLUMNS)
+        self.hunters = EntityTable(HUNTER_COLUMNS)
+        self.clear(0)
+
+    def clear(self, first_row):
+        self.first_row = first_row
+        self.rows.clear()
+        self.count = 0          # Tick rows
+        self.humans.clear()
+        self.hunters.clear()
+
+    def fill(self):
+        """Copy everything staged into the columns (on the writer thread)"""
+        if self.rows:
+            for column, values in zip(self.ticks, zip(*self.rows)):
+                column[:self.count] = values
+        self.humans.fill()
+        self.hunters.fill()
+
+    def tables(self):
+        """(rows, columns) of each table, in TABLES order"""
+        return ((self.count, self.ticks), (self.humans.rows, self.humans.columns),
+                (self.hunters.rows, self.hunters.columns))
+
+
+class TelemetryWriter:
+    """Records a simulation's state after every tick to a chunked columnar file"""
+
+    def __init__(self, path, sim, chunk_ticks=CHUNK_TICKS, codec="zlib",
+                 level=COMPRESSION_LEVEL, buffers=BUFFER_COUNT):
+        if codec not in CODECS:
+            raise ValueError(f"Unknown telemetry codec: {codec}")
+        if buffers < 2:
+            raise ValueError("TelemetryWriter needs at least two buffers")
+        self.path = path
+        self.chunk_ticks = chunk_ticks
+        self.codec = codec
+        self.level = level
+        self.rows = 0               # Tick rows recorded so far
+        self.index = []             # INDEX_ENTRY fields of every written chunk
+        self.raw_bytes = 0
+        self.stored_bytes = 0
+        self.write_seconds = 0.0    # CPU time the background thread spent encoding and writing
+        self.wait_seconds = 0.0     # Time record() spent waiting for the writer to free a buffer
+        self.error = None
+
+        header = json.dumps({
+            "format": FORMAT_VERSION,
+            "setup": describe_simulation(sim),
+            "chunk_ticks": chunk_ticks,
+            "codec": codec,
+            "position_scale": POSITION_SCALE,
+            "tables": {name: [list(column) for column in columns] for name, columns in TABLES},
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        }).encode()
+        self.file = open(path, "wb")
+        self.offset = 0
+        self.write(MAGIC + struct.pack("<I", len(header)) + header)
+        self.write(bytes(padding(self.offset)))
+
+        self.free = queue.Queue()
+        for _ in range(buffers):
+            self.free.put(ChunkBuffer(chunk_ticks))
+        self.full = queue.Queue()
+        self.buffer = self.free.get()
+        self.thread = threading.Thread(target=self.write_loop, name="telemetry", daemon=True)
+        self.thread.start()
+
+    def record(self, sim):
+        """Append the simulation's current state as the next tick row"""
+        buffer = self.buffer
+        vampire = sim.vampire
+        human_x, human_y, hunter_x, hunter_y, hunter_health, hunter_chasing = sim.entity_columns()
+        buffer.rows.append((sim.total_time, sim.time_of_day == TimeOfDay.NIGHT, sim.game_over,
+                            vampire.x, vampire.y, vampire.blood, vampire.energy, vampire.health,
+                            vampire.form == VampireForm.BAT, vampire.bat_duration, sim.score,
+                            len(human_x), len(hunter_x)))
+        buffer.humans.append((human_x, human_y))
+        buffer.hunters.append((hunter_x, hunter_y, hunter_health, hunter_chasing))
+        buffer.count += 1
+        self.rows += 1
+        if buffer.count == self.chunk_ticks:
+            self.hand_off()
+
+    def hand_off(self):
+        """Queue the filled buffer for writing and continue in a free one"""
+        if self.error is not None:
+            raise self.error
+        self.full.put(self.buffer)
+        started = time.perf_counter()
+        self.buffer = self.free.get()   # Waits here only if the writer is BUFFER_COUNT behind
+        self.wait_seconds += time.perf_counter() - started
+        self.buffer.clear(self.rows)
+
+    def write(self, data):
+        self.file.write(data)
+        self.offset += len(data)
+
+    def encode(self, column):
+        """Stored bytes of a column (see the module docstring)"""
+        if self.codec == "raw":
+            return column.tobytes()
+        if column.itemsize > 1:
+            column = column.view(np.uint8).reshape(-1, column.itemsize).T
+        return zlib.compress(column.tobytes(), self.level)
+
+    def write_chunk(self, buffer):
+        started = time.thread_time()
+        buffer.fill()
+        payloads = []
+        for (table, table_columns), (rows, columns) in zip(TABLES, buffer.tables()):
+            for (name, _), column in zip(table_columns, columns):
+                column = column[:rows]
+                self.raw_bytes += column.nbytes
+                if self.codec == "zlib" and table != "ticks" and name in POSITION_COLUMNS:
+                    counts = buffer.ticks[COUNT_COLUMNS[table]][:buffer.count]
+                    column = encode_positions(column, counts, POSITION_SCALE)
+                payloads.append(self.encode(column))
+        offset = self.offset
+        self.write(CHUNK.pack(CHUNK_TAG, buffer.first_row, buffer.count,
+                              buffer.humans.rows, buffer.hunters.rows))
+        self.write(struct.pack(f"<{len(payloads)}I", *map(len, payloads)))
+        for payload in payloads:
+            self.write(bytes(padding(self.offset)))
+            self.write(payload)
+            self.stored_bytes += len(payload)
+        self.file.flush()
+        self.index.append((offset, buffer.first_row, buffer.count))
+        self.write_seconds += time.thread_time() - started
+
+    def write_loop(self):
+        """Write queued chunks until close() (runs on the telemetry thread)"""
+        while True:
+            buffer = self.full.get()
+            if buffer is None:
+                return
+            try:
+                if self.error is None:
+                    self.write_chunk(buffer)
+            except BaseException as error:
+                self.error = error
+            finally:
+                self.free.put(buffer)
+
+    def close(self):
+        """Write the last partial chunk and the index, and wait for the writer"""
+        if self.file.closed:
+            return
+        if self.buffer.count:
+            self.full.put(self.buffer)
+        self.full.put(None)
+        self.thread.join()
+        try:
+            if self.error is None:
+                index_offset = self.offset
+                for entry in self.index:
+                    self.write(INDEX_ENTRY.pack(*entry))
+                self.write(TRAILER.pack(index_offset, len(self.index), TRAILER_MAGIC))
+        finally:
+            self.file.close()
+        if self.error is not None:
+            raise self.error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class TelemetryChunk:
+    """Decoded columns of one chunk
+
+    `ticks`, `humans` and `hunters` map column names to arrays (only the
+    columns that were asked for; the tick table's humans/hunters counts
+    are always there). Entity rows of tick i are
+    human_starts[i]:human_starts[i + 1], and likewise for hunters.
+    """
+
+    def __init__(self, first_row, ticks, humans, hunters):
+        self.first_row = first_row
+        self.ticks = ticks
+        self.humans = humans
+        self.hunters = hunters
+        self.human_starts = np.concatenate(([0], np.cumsum(ticks["humans"], dtype=np.int64)))
+        self.hunter_starts = np.concatenate(([0], np.cumsum(ticks["hunters"], dtype=np.int64)))
+
+    def __len__(self):
+        return len(self.ticks["humans"])
+
+    def frame(self, i):
+        """(tick values, human columns, hunter columns) of the chunk's i-th tick"""
+        h0, h1 = self.human_starts[i], self.human_starts[i + 1]
+        e0, e1 = self.hunter_starts[i], self.hunter_starts[i + 1]
+        return ({name: column[i] for name, column in self.ticks.items()},
+                {name: column[h0:h1] for name, column in self.humans.items()},
+                {name: column[e0:e1] for name, column in self.hunters.items()})
+
+
+class TelemetryReader:
+    """Streams a TelemetryWriter file back without loading all of it
+
+    The file is memory-mapped and a chunk is only decoded when the
+    chunks()/frames() generators reach it. With the raw codec, columns
+    are views straight into the mapping.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, "rb")
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.data[:len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a telemetry trace")
+        (length,) = struct.unpack_from("<I", self.data, len(MAGIC))
+        start = len(MAGIC) + 4
+        self.header = json.loads(self.data[start:start + length])
+        if self.header["format"] != FORMAT_VERSION:
+            self.close()
+            raise ValueError(f"{path} has unsupported telemetry format {self.header['format']}")
+        self.setup = self.header["setup"]
+        self.codec = self.header["codec"]
+        self.tables = [(name, [(column, np.dtype(dtype))
+                               for column, dtype in self.header["tables"][name]])
+                       for name, _ in TABLES]
+        self.column_count = sum(len(columns) for _, columns in self.tables)
+        self.first_chunk = start + length + padding(start + length)
+        self.complete = False   # Closed properly, rather than cut short
+        self.index = self.read_index()
+
+    def read_index(self):
+        """INDEX_ENTRY fields of every chunk, from the file's index or by walking the chunks"""
+        data = self.data
+        if len(data) >= self.first_chunk + TRAILER.size:
+            index_offset, count, magic = TRAILER.unpack_from(data, len(data) - TRAILER.size)
+            if magic == TRAILER_MAGIC:
+                self.complete = True
+                return [INDEX_ENTRY.unpack_from(data, index_offset + i * INDEX_ENTRY.size)
+                        for i in range(count)]
+        index = []
+        offset = self.first_chunk
+        while offset + CHUNK.size + 4 * self.column_count <= len(data):
+            tag, first_row, ticks, _, _ = CHUNK.unpack_from(data, offset)
+            if tag != CHUNK_TAG:
+                break
+            end = self.chunk_end(offset)
+            if end > len(data):
+                break   # Cut off mid-chunk
+            index.append((offset, first_row, ticks))
+            offset = end
+        return index
+
+    def column_spans(self, offset):
+        """(start, stored length) of every column of the chunk at `offset`"""
+        lengths = struct.unpack_from(f"<{self.column_count}I", self.data, offset + CHUNK.size)
+        position = offset + CHUNK.size + 4 * self.column_count
+        spans = []
+        for length in lengths:
+            position += padding(position)
+            spans.append((position, length))
+            position += length
+        return spans
+
+    def chunk_end(self, offset):
+        start, length = self.column_spans(offset)[-1]
+        return start + length
+
+    def __len__(self):
+        """Tick rows in the trace"""
+        if not self.index:
+            return 0
+        _, first_row, ticks = self.index[-1]
+        return first_row + ticks
+
+    def decode(self, start, length, dtype, rows, counts=None):
+        """Column array from its stored bytes (`counts`: the table's rows per tick, for positions)"""
+        if self.codec == "raw":
+            return np.frombuffer(self.data, dtype, rows, start)
+        if counts is not None:
+            zigzag = self.decode(start, length, np.dtype("<u4"), rows)
+            return decode_positions(zigzag, counts, self.header["position_scale"])
+        with memoryview(self.data) as view:
+            data = zlib.decompress(view[start:start + length])
+        if dtype.itemsize == 1:
+            return np.frombuffer(data, dtype)
+        shuffled = np.frombuffer(data, np.uint8).reshape(dtype.itemsize, rows)
+        return shuffled.T.copy().view(dtype).reshape(rows)
+
+    def read_chunk(self, entry, columns=None):
+        """TelemetryChunk for an index entry, decoding `columns` (table -> names, None: all)"""
+        offset, first_row, _ = entry
+        _, _, *counts = CHUNK.unpack_from(self.data, offset)
+        spans = iter(self.column_spans(offset))
+        decoded = []
+        for (table, table_columns), rows in zip(self.tables, counts):
+            wanted = None if columns is None else columns.get(table, ())
+            arrays = {}
+            for (name, dtype), (start, length) in zip(table_columns, spans):
+                if table == "ticks":
+                    if wanted is None or name in wanted or name in COUNT_COLUMNS:
+                        arrays[name] = self.decode(start, length, dtype, rows)
+                elif wanted is None or name in wanted:
+                    counts = decoded[0][table] if name in POSITION_COLUMNS else None
+                    arrays[name] = self.decode(start, length, dtype, rows, counts)
+            decoded.append(arrays)
+        return TelemetryChunk(first_row, *decoded)
+
+    def chunk_position(self, row):
+        """Index of the chunk holding tick row `row`"""
+        low, high = 0, len(self.index)
+        while high - low > 1:
+            middle = (low + high) // 2
+            if self.index[middle][1] <= row:
+                low = middle
+            else:
+                high = middle
+        return low
+
+    def chunks(self, start=0, columns=None):
+        """Decoded chunks from the one holding row `start` on (see read_chunk)"""
+        for entry in self.index[self.chunk_position(start):]:
+            yield self.read_chunk(entry, columns)
+
+    def frames(self, start=0, columns=None):
+        """(row, tick values, human columns, hunter columns) for every tick row from `start`"""
+        for chunk in self.chunks(start, columns):
+            for i in range(max(0, start - chunk.first_row), len(chunk)):
+                yield (chunk.first_row + i, *chunk.frame(i))
+
+    def close(self):
+        try:
+            self.data.close()
+        except BufferError:
+            pass    # Raw columns still view the mapping; it closes once they're gone
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def info(path):
+    """Print a trace's setup, size and how its games went"""
+    with TelemetryReader(path) as trace:
+        raw = stored = 0
+        for offset, _, _ in trace.index:
+            _, _, *counts = CHUNK.unpack_from(trace.data, offset)
+            spans = iter(trace.column_spans(offset))
+            for (_, table_columns), rows in zip(trace.tables, counts):
+                for (_, dtype), (_, length) in zip(table_columns, spans):
+                    raw += rows * dtype.itemsize
+                    stored += length
+        print(f"{path}: {len(trace)} ticks in {len(trace.index)} chunks, "
+              f"codec {trace.codec}{'' if trace.complete else ' (cut short, no index)'}")
+        print(f"  setup: {json.dumps(trace.setup)}")
+        print(f"  columns: {raw / 1e6:.1f} MB raw, {stored / 1e6:.1f} MB stored"
+              f" ({stored / max(raw, 1):.0%})")
+        games = peak = entity_rows = 0
+        score = None
+        for chunk in trace.chunks(columns={"ticks": ["tick", "score", "game_over"]}):
+            ends = np.flatnonzero(chunk.ticks["game_over"])
+            games += len(ends)
+            if len(chunk):
+                score = int(chunk.ticks["score"][-1])
+            peak = max(peak, int((chunk.ticks["humans"] + chunk.ticks["hunters"]).max(initial=0)))
+            entity_rows += int(chunk.human_starts[-1] + chunk.hunter_starts[-1])
+        print(f"  {games} games ended, last score {score}, up to {peak} entities a tick, "
+              f"{entity_rows} entity rows")
+
+
+def bench(scenario, seconds, codec):
+    """Time ticks with and without telemetry, then read the trace back"""
+    import os
+    import tempfile
+    from vampire_batch import forager
+    from vampire_bench import BENCH_HEALTH, scenario_setup
+    from vampire_replay import build_simulation
+
+    def play(sim, writer):
+        """Seconds per tick of the whole loop and of record() alone"""
+        # Kept alive so ticks are measured rather than restores (see vampire_bench)
+        vampire = sim.vampire
+        vampire.max_health = vampire.health = BENCH_HEALTH
+        start_state = sim.snapshot()
+        clock = time.perf_counter
+        recording = untimed = 0.0
+        started = clock()
+        ticks = 0
+        while ticks < FPS or clock() - started - untimed < seconds:
+            sim.save_positions()
+            sim.step(forager(sim))
+            vampire.blood, vampire.health = vampire.max_blood, vampire.max_health
+            if writer is not None:
+                before = clock()
+                writer.record(sim)
+                recording += clock() - before
+            if sim.game_over:
+                before = clock()
+                sim.restore(start_state)
+                untimed += clock() - before
+            ticks += 1
+        if writer is not None:
+            writer.close()
+        return (clock() - started - untimed) / ticks, recording / ticks
+
+    tick_seconds, _ = play(build_simulation(scenario_setup(scenario)), None)
+    path = os.path.join(tempfile.mkdtemp(), f"{scenario}.vtel")
+    sim = build_simulation(scenario_setup(scenario))
+    writer = TelemetryWriter(path, sim, codec=codec)
+    logged_seconds, record_seconds = play(sim, writer)
+    rows = max(writer.rows, 1)
+    record_seconds -= writer.wait_seconds / rows
+    write_seconds = writer.write_seconds / rows
+
+    print(f"{scenario}: {sim.human_count + sim.enemy_count} entities, codec {codec}")
+    print(f"  tick {tick_seconds * 1000:.3f} ms; record() {record_seconds * 1000:.3f} ms"
+          f" ({record_seconds / tick_seconds:+.1%}) on the game thread, writer thread"
+          f" {write_seconds * 1000:.3f} ms CPU ({write_seconds / tick_seconds:+.1%})")
+    print(f"  free-running loop with telemetry {logged_seconds * 1000:.3f} ms/tick"
+          f" ({logged_seconds / tick_seconds - 1:+.1%}), {writer.wait_seconds / rows * 1000:.3f} ms"
+          f" of it waiting for the writer")
+    print(f"  {writer.raw_bytes / rows / 1e3:.1f} kB/tick raw, "
+          f"{writer.stored_bytes / rows / 1e3:.1f} kB/tick stored"
+          f" ({writer.stored_bytes / max(writer.raw_bytes, 1):.0%})"
+          f" = {writer.stored_bytes / rows * FPS * 3600 / 1e9:.2f} GB per hour of play")
+
+    started = time.perf_counter()
+    with TelemetryReader(path) as trace:
+        rows = sum(len(chunk) for chunk in trace.chunks())
+    elapsed = time.perf_counter() - started
+    print(f"  read back {rows} ticks in {elapsed:.2f} s ({rows / elapsed:.0f} ticks/s)")
+    os.remove(path)
+    os.rmdir(os.path.dirname(path))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Vampire Survival telemetry traces")
+    commands = parser.add_subparsers(dest="command", required=True)
+    info_parser = commands.add_parser("info", help="summarize a trace")
+    info_parser.add_argument("path")
+    bench_parser = commands.add_parser("bench", help="measure the cost of recording")
+    bench_parser.add_argument("--scenario", default="crowd-10k",
+                              help="vampire_bench scenario (default: crowd-10k)")
+    bench_parser.add_argument("--seconds", type=float, default=5.0, help="time per measurement")
+    bench_parser.add_argument("--codec", choices=CODECS, default="zlib")
+    args = parser.parse_args(argv)
+
+    if args.command == "info":
+        info(args.path)
+    else:
+        bench(args.scenario, args.seconds, args.codec)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,391 @@
+#!/usr/bin/env python3
+"""
+Vampire Survival - large scrolling world
+
+WorldSimulation plays the regular game on a world much bigger than the
+screen (50 screens' worth by default), split into CHUNK_SIZE square
+chunks. The camera follows the vampire and only the chunks around it -
+plus the ones next to any hunter that is chasing - are awake: their humans
+and hunters are live entities that move, collide and get drawn. Every
+other chunk sleeps:
+
+- a chunk nobody has been near yet holds nothing at all; its population
+  is generated from the world seed, the chunk's position and the current
+  day/night phase when it first wakes
+- a chunk that has been awake keeps its entities packed into flat arrays
+  of doubles (a DormantChunk), unpacked again when it wakes
+
+So memory and per-tick work follow the awake area, not the world size.
+Within it, awake entities off screen are updated less often by the
+Simulation's LodScheduler (see vampire_lod).
+Populations are per chunk, and each dawn and dusk regenerates the world
+(sleeping chunks are simply forgotten). Hunters patrol within
+PATROL_RANGE of where they stand, and their flow field covers just the
+chunks around the view.
+
+    sim = WorldSimulation(seed=1)
+    sim.fast_forward(600, controls=INPUT_LEFT)
+
+Play it with `python vampire_game.py --world`.
+"""
+
+import math
+import random
+import struct
+from array import array
+
+from vampire_game import (
+    SCREEN_WIDTH, SCREEN_HEIGHT, ENEMY_RADIUS,
+    EntityRandom, TimeOfDay, Simulation,
+)
+from vampire_nav import Navigator, NavGrid
+
+WORLD_WIDTH = 7000          # 50 screens of area (7 x 1000 by 7.1 x 700)
+WORLD_HEIGHT = 5000
+CHUNK_SIZE = 500            # Chunk edge, in pixels
+ACTIVE_MARGIN = 250         # Awake border around the camera's view, in pixels
+CHASE_WAKE_CHUNKS = 1       # Chunks around a chasing hunter kept awake
+SWEEP_TICKS = 30            # Entities that wandered into sleeping chunks are packed this often
+PATROL_RANGE = 400          # Hunters pick patrol points this close to themselves
+WORLD_NAV_CELL_SIZE = 100   # Flow field cells (coarser than one screen's, for a bigger area)
+DRAW_MARGIN = ENEMY_RADIUS + 3  # Sprites this far past a visible chunk still show
+
+# Chunks awake at once with the camera anywhere (sizes the spatial indexes)
+ACTIVE_CHUNKS = ((math.ceil((SCREEN_WIDTH + 2 * ACTIVE_MARGIN) / CHUNK_SIZE) + 1)
+                 * (math.ceil((SCREEN_HEIGHT + 2 * ACTIVE_MARGIN) / CHUNK_SIZE) + 1))
+
+COLOR_CHUNK_DAY = (185, 205, 240)       # Faint chunk borders, so scrolling shows
+COLOR_CHUNK_NIGHT = (35, 35, 60)
+
+# Packed dormant entities: doubles per entity, in this order
+HUMAN_VALUES = 5    # x, y, direction, change_direction_timer, random stream
+HUNTER_VALUES = 9   # x, y, target_x, target_y, patrol_x, patrol_y, health, patrol_timer,
+                    # random stream (48 bits, so a double holds it exactly)
+
+# Snapshot world section, after the regular entity section: this header,
+# the awake chunks as int32 (col, row) pairs, then per dormant chunk a
+# DORMANT_CHUNK record followed by its human and hunter doubles
+WORLD_SECTION = struct.Struct("<III")       # phase, awake chunks, dormant chunks
+DORMANT_CHUNK = struct.Struct("<ii?II")     # col, row, generated, human doubles, hunter doubles
+
+
+def draw_chunk_borders(screen, camera, time_of_day):
+    """Faint chunk grid for a view whose top-left is at world `camera`"""
+    import pygame
+    left, top = camera
+    color = COLOR_CHUNK_DAY if time_of_day == TimeOfDay.DAY else COLOR_CHUNK_NIGHT
+    for x in range(-left % CHUNK_SIZE, SCREEN_WIDTH, CHUNK_SIZE):
+        pygame.draw.line(screen, color, (x, 0), (x, SCREEN_HEIGHT))
+    for y in range(-top % CHUNK_SIZE, SCREEN_HEIGHT, CHUNK_SIZE):
+        pygame.draw.line(screen, color, (0, y), (SCREEN_WIDTH, y))
+
+
+class DormantChunk:
+    """A sleeping chunk's entities, packed into flat arrays of doubles
+
+    `generated` is False when the chunk only holds entities that wandered
+    in; its own population still has to be generated when it wakes.
+    """
+
+    __slots__ = ("generated", "humans", "hunters")
+
+    def __init__(self, generated):
+        self.generated = generated
+        self.humans = array("d")
+        self.hunters = array("d")
+
+
+class WorldSimulation(Simulation):
+    """Simulation over a chunked world larger than the screen
+
+    Population arguments are per chunk.
+    """
+
+    backend = "world"
+    backdrop = staticmethod(draw_chunk_borders)
+
+    def __init__(self, day_humans=4, day_hunters=1, night_humans=2, night_hunters=2,
+                 width=WORLD_WIDTH, height=WORLD_HEIGHT, index="auto", seed=None, motion="tick"):
+        self.width = width
+        self.height = height
+        self.sun_width = width // 2
+        self.patrol_range = PATROL_RANGE
+        self.chunk_cols = math.ceil(width / CHUNK_SIZE)
+        self.chunk_rows = math.ceil(height / CHUNK_SIZE)
+        self.obstacles = []     # World rectangles stamped into every flow field
+        self.active = set()
+        super().__init__(day_humans, day_hunters, night_humans, night_hunters,
+                         index=index, seed=seed, motion=motion)
+
+    def new_index(self, population, reach=0):
+        # Only awake chunks are indexed
+        return super().new_index(population * ACTIVE_CHUNKS, reach)
+
+    def new_navigator(self):
+        """Flow fields over the chunks around the camera's view"""
+        self.nav_view = view = self.view_chunks()
+        col_lo, col_hi, row_lo, row_hi = view
+        left, top = col_lo * CHUNK_SIZE, row_lo * CHUNK_SIZE
+        right = min(self.width, (col_hi + 1) * CHUNK_SIZE)
+        bottom = min(self.height, (row_hi + 1) * CHUNK_SIZE)
+        grid = NavGrid(right - left, bottom - top, WORLD_NAV_CELL_SIZE, self.sun_width, left, top)
+        for rect in self.obstacles:
+            grid.block(*rect)
+        return Navigator(grid)
+
+    def add_obstacle(self, x, y, width, height):
+        """Make a world rectangle impassable to hunter pathfinding"""
+        self.obstacles.append((x, y, width, height))
+        self.nav.grid.block(x, y, width, height)
+
+    def reset(self):
+        self.world_seed = random.Random(self.seed).getrandbits(32)
+        self.phase = 0          # Dawns and dusks so far; part of every chunk's seed
+        self.dormant = {}       # (col, row) -> DormantChunk
+        self.active = set()
+        self.stream_key = None  # (view chunks, chasers' chunks) the awake set was made for
+        self.nav_view = None    # View chunks the flow field covers
+        super().reset()
+
+    # Chunks
+
+    def chunk_of(self, x, y):
+        return int(x // CHUNK_SIZE), int(y // CHUNK_SIZE)
+
+    def view_chunks(self):
+        """(first col, last col, first row, last row) of chunks around the camera's view"""
+        left, top = self.camera()
+        return (max(0, int((left - ACTIVE_MARGIN) // CHUNK_SIZE)),
+                min(self.chunk_cols - 1, int((left + SCREEN_WIDTH + ACTIVE_MARGIN) // CHUNK_SIZE)),
+                max(0, int((top - ACTIVE_MARGIN) // CHUNK_SIZE)),
+                min(self.chunk_rows - 1, int((top + SCREEN_HEIGHT + ACTIVE_MARGIN) // CHUNK_SIZE)))
+
+    def wanted_chunks(self, view, chasers):
+        """Chunks that should be awake: around the view and the chasers' chunks"""
+        col_lo, col_hi, row_lo, row_hi = view
+        wanted = {(col, row) for col in range(col_lo, col_hi + 1)
+                  for row in range(row_lo, row_hi + 1)}
+        reach = CHASE_WAKE_CHUNKS
+        last_col, last_row = self.chunk_cols - 1, self.chunk_rows - 1
+        for col, row in chasers:
+            wanted.update((c, r) for c in range(max(0, col - reach), min(last_col, col + reach) + 1)
+                          for r in range(max(0, row - reach), min(last_row, row + reach) + 1))
+        return wanted
+
+    def chunk_rng(self, key):
+        """Generator for a chunk's population this phase"""
+        col, row = key
+        return random.Random(((self.world_seed * 1000003 + col) * 1000003 + row) * 1000003
+                             + self.phase)
+
+    def generate(self, key, is_night):
+        """Spawn a chunk's own population for this phase"""
+        rng = self.chunk_rng(key)
+        col, row = key
+        x_lo, x_hi = max(50, col * CHUNK_SIZE), min(self.width - 50, (col + 1) * CHUNK_SIZE)
+        y_lo, y_hi = max(50, row * CHUNK_SIZE), min(self.height - 50, (row + 1) * CHUNK_SIZE)
+        vampire = self.vampire
+
+        for _ in range(self.night_humans if is_night else self.day_humans):
+            self.wake_entity(self.human_index, self.human_pool.acquire(
+                rng.uniform(x_lo, x_hi), rng.uniform(y_lo, y_hi), EntityRandom.spawn(rng),
+                rng.uniform(0, 2 * math.pi)))
+        for _ in range(self.night_hunters if is_night else self.day_hunters):
+            self.wake_entity(self.enemy_index, self.enemy_pool.acquire(
+                rng.uniform(x_lo, x_hi), rng.uniform(y_lo, y_hi),
+                vampire.x, vampire.y, is_night, EntityRandom.spawn(rng)))
+
+    def wake_entity(self, index, entity):
+        index.insert(entity)
+        if self.previous_positions is not None:
+            # A recycled object must not interpolate from its old life
+            self.previous_positions.pop(entity, None)
+
+    def wake(self, key):
+        """Bring a sleeping chunk's entities to life"""
+        is_night = self.time_of_day == TimeOfDay.NIGHT
+        chunk = self.dormant.pop(key, None)
+        if chunk is None or not chunk.generated:
+            self.generate(key, is_night)
+        if chunk is None:
+            return
+
+        humans = chunk.humans
+        for i in range(0, len(humans), HUMAN_VALUES):
+            x, y, direction, timer, stream = humans[i:i + HUMAN_VALUES]
+            human = self.human_pool.acquire(x, y, EntityRandom(int(stream)), direction)
+            human.change_direction_timer = int(timer)
+            self.wake_entity(self.human_index, human)
+
+        hunters = chunk.hunters
+        for i in range(0, len(hunters), HUNTER_VALUES):
+            x, y, target_x, target_y, patrol_x, patrol_y, health, timer, stream = \
+                hunters[i:i + HUNTER_VALUES]
+            enemy = self.enemy_pool.acquire(x, y, target_x, target_y, is_night,
+                                            EntityRandom(int(stream)))
+            enemy.patrol_target = (patrol_x, patrol_y)
+            enemy.health = health
+            enemy.patrol_timer = int(timer)
+            self.wake_entity(self.enemy_index, enemy)
+
+    def sleep_strays(self):
+        """Pack every live entity standing in a sleeping chunk into that chunk"""
+        active = self.active
+        chunk_of = self.chunk_of
+        previous = self.previous_positions
+
+        for human in [h for h in self.humans if chunk_of(h.x, h.y) not in active]:
+            self.dormant_chunk(chunk_of(human.x, human.y)).humans.extend(
+                (human.x, human.y, human.direction, human.change_direction_timer,
+                 human.rng.state))
+            self.human_index.remove(human)
+            self.human_pool.release(human)
+            if previous is not None:
+                previous.pop(human, None)
+
+        for enemy in [e for e in self.enemies if chunk_of(e.x, e.y) not in active]:
+            self.dormant_chunk(chunk_of(enemy.x, enemy.y)).hunters.extend(
+                (enemy.x, enemy.y, enemy.target_x, enemy.target_y, *enemy.patrol_target,
+                 enemy.health, enemy.patrol_timer, enemy.rng.state))
+            self.enemy_index.remove(enemy)
+            self.enemy_pool.release(enemy)
+            if previous is not None:
+                previous.pop(enemy, None)
+
+    def dormant_chunk(self, key):
+        chunk = self.dormant.get(key)
+        if chunk is None:
+            chunk = self.dormant[key] = DormantChunk(False)
+        return chunk
+
+    def stream_chunks(self):
+        """Wake chunks the camera or a chasing hunter came near, put the rest to sleep"""
+        chunk_of = self.chunk_of
+        view = self.view_chunks()
+        chasers = {chunk_of(e.x, e.y) for e in self.enemies if e.chasing}
+        if (view, chasers) != self.stream_key:
+            self.stream_key = (view, chasers)
+            # Whatever moves now - into a sleeping chunk, or under a new
+            # flow field - must stand where tick-by-tick updates would have
+            # left it
+            self.flush_lod()
+            wanted = self.wanted_chunks(view, chasers)
+            if wanted != self.active:
+                for key in self.active - wanted:
+                    # Its population has been generated; only what's packed now remains
+                    self.dormant[key] = DormantChunk(True)
+                woken = sorted(wanted - self.active)
+                self.active = wanted
+                for key in woken:
+                    self.wake(key)
+                self.sleep_strays()
+            if view != self.nav_view:
+                self.nav = self.new_navigator()
+                return
+        if self.total_time % SWEEP_TICKS == 0:
+            self.flush_lod()
+            self.sleep_strays()
+
+    def flush_lod(self):
+        if self.lod is not None:
+            self.lod.flush(self, self.time_of_day == TimeOfDay.NIGHT)
+
+    # Simulation phases
+
+    def step(self, controls=0):
+        if not self.game_over:
+            self.stream_chunks()
+        super().step(controls)
+
+    def new_phase(self, is_night):
+        """Dawn or dusk: forget the sleeping world and repopulate the awake chunks"""
+        self.previous_positions = None
+        self.human_pool.release_all(self.humans)
+        self.enemy_pool.release_all(self.enemies)
+        self.human_index.rebuild([])
+        self.enemy_index.rebuild([])
+        self.dormant.clear()
+        self.phase += 1
+        self.stream_key = None
+        self.active = self.wanted_chunks(self.view_chunks(), ())
+        for key in sorted(self.active):
+            self.generate(key, is_night)
+        self.nav_view = None    # Re-anchored on the next step
+
+    def spawn_day(self):
+        self.new_phase(False)
+
+    def spawn_night(self):
+        self.new_phase(True)
+
+    def random_human(self):
+        """New human somewhere in a random awake chunk (replaces one eaten)"""
+        col, row = self.rng.choice(sorted(self.active))
+        x_lo, x_hi = max(50, col * CHUNK_SIZE), min(self.width - 50, (col + 1) * CHUNK_SIZE)
+        y_lo, y_hi = max(50, row * CHUNK_SIZE), min(self.height - 50, (row + 1) * CHUNK_SIZE)
+        return self.human_pool.acquire(self.rng.randint(x_lo, x_hi),
+                                       self.rng.randint(y_lo, y_hi),
+                                       EntityRandom.spawn(self.rng))
+
+    # Camera and drawing
+
+    def camera(self, alpha=1.0):
+        """Screen's top-left in the world, centered on the vampire where possible"""
+        x, y = self.draw_position(self.vampire, alpha)
+        left = max(0, min(x - SCREEN_WIDTH // 2, self.width - SCREEN_WIDTH))
+        top = max(0, min(y - SCREEN_HEIGHT // 2, self.height - SCREEN_HEIGHT))
+        return left, top
+
+    def visible_entities(self, left, top):
+        """Awake entities in the chunks the view overlaps"""
+        x_lo = left // CHUNK_SIZE * CHUNK_SIZE - DRAW_MARGIN
+        y_lo = top // CHUNK_SIZE * CHUNK_SIZE - DRAW_MARGIN
+        x_hi = -(-(left + SCREEN_WIDTH) // CHUNK_SIZE) * CHUNK_SIZE + DRAW_MARGIN
+        y_hi = -(-(top + SCREEN_HEIGHT) // CHUNK_SIZE) * CHUNK_SIZE + DRAW_MARGIN
+        return ([h for h in self.humans if x_lo <= h.x < x_hi and y_lo <= h.y < y_hi],
+                [e for e in self.enemies if x_lo <= e.x < x_hi and y_lo <= e.y < y_hi])
+
+    def draw_entities(self, screen, sprites=None, alpha=1.0, camera=(0, 0)):
+        """Chunk borders under the regular entity drawing"""
+        self.backdrop(screen, camera, self.time_of_day)
+        super().draw_entities(screen, sprites, alpha, camera)
+
+    # Snapshots
+
+    def pack_entities(self):
+        parts = super().pack_entities()
+        active = sorted(self.active)
+        parts.append(WORLD_SECTION.pack(self.phase, len(active), len(self.dormant)))
+        parts.append(array("i", [v for key in active for v in key]).tobytes())
+        for (col, row), chunk in sorted(self.dormant.items()):
+            parts.append(DORMANT_CHUNK.pack(col, row, chunk.generated,
+                                            len(chunk.humans), len(chunk.hunters)))
+            parts.append(chunk.humans.tobytes())
+            parts.append(chunk.hunters.tobytes())
+        return parts
+
+    def unpack_entities(self, view, offset, human_count, enemy_count):
+        offset = super().unpack_entities(view, offset, human_count, enemy_count)
+        self.phase, active_count, dormant_count = WORLD_SECTION.unpack_from(view, offset)
+        offset += WORLD_SECTION.size
+
+        keys = array("i")
+        end = offset + 2 * active_count * keys.itemsize
+        keys.frombytes(view[offset:end])
+        offset = end
+        self.active = set(zip(keys[0::2], keys[1::2]))
+
+        self.dormant = {}
+        for _ in range(dormant_count):
+            col, row, generated, human_values, hunter_values = \
+                DORMANT_CHUNK.unpack_from(view, offset)
+            offset += DORMANT_CHUNK.size
+            chunk = self.dormant[(col, row)] = DormantChunk(generated)
+            for values, count in ((chunk.humans, human_values), (chunk.hunters, hunter_values)):
+                end = offset + count * values.itemsize
+                values.frombytes(view[offset:end])
+                offset = end
+
+        self.stream_key = None
+        self.nav = self.new_navigator()
+        return offset